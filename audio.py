@@ -0,0 +1,144 @@
+"""Non-blocking Morse tone playback.
+
+AudioPlayer plays dots and dashes on a background worker thread so the Tk
+loop never waits on the sound device. Both tones are rendered once into
+in-memory WAV buffers and handed to a pluggable backend:
+
+- winsound: Windows, plays the WAV buffer from memory
+- aplay: Linux (ALSA), pipes the WAV buffer to `aplay`
+- null: silent, for headless machines and tests
+
+The backend is picked automatically unless MORSE_AUDIO_BACKEND is set.
+"""
+import io
+import math
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import wave
+
+TONE_FREQUENCY = 1000
+DOT_MS = 200
+DASH_MS = 600
+SAMPLE_RATE = 22050
+FADE_MS = 5
+DEFAULT_AUDIO_QUEUE_SIZE = 32
+
+
+def render_tone(frequency, duration_ms, sample_rate=SAMPLE_RATE, volume=0.5):
+    """Render a sine tone as a complete 16-bit mono WAV file in memory."""
+    count = int(sample_rate * duration_ms / 1000)
+    fade = max(int(sample_rate * FADE_MS / 1000), 1)
+    step = 2 * math.pi * frequency / sample_rate
+    amplitude = volume * 32767
+    samples = []
+    for i in range(count):
+        # Short fade in/out so the tone doesn't click
+        envelope = min(1.0, i / fade, (count - 1 - i) / fade)
+        samples.append(int(amplitude * envelope * math.sin(step * i)))
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(struct.pack(f'<{count}h', *samples))
+    return buffer.getvalue()
+
+
+class NullBackend:
+    """Plays nothing; used when no audio device is available."""
+    name = 'null'
+
+    def play(self, wav_data):
+        pass
+
+
+class WinsoundBackend:
+    """Plays WAV buffers from memory with the Windows winsound module."""
+    name = 'winsound'
+
+    def __init__(self):
+        import winsound
+        self.winsound = winsound
+
+    def play(self, wav_data):
+        self.winsound.PlaySound(wav_data, self.winsound.SND_MEMORY)
+
+
+class AplayBackend:
+    """Pipes WAV buffers to ALSA's aplay command."""
+    name = 'aplay'
+
+    def __init__(self):
+        self.command = shutil.which('aplay')
+        if self.command is None:
+            raise RuntimeError("aplay not found")
+
+    def play(self, wav_data):
+        subprocess.run([self.command, '-q', '-'], input=wav_data, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+BACKENDS = {
+    'null': NullBackend,
+    'winsound': WinsoundBackend,
+    'aplay': AplayBackend,
+}
+
+
+def default_backend():
+    """Return the backend named by MORSE_AUDIO_BACKEND, or the first one that works."""
+    name = os.getenv('MORSE_AUDIO_BACKEND')
+    if name:
+        return BACKENDS[name]()
+    for backend in (WinsoundBackend, AplayBackend):
+        try:
+            return backend()
+        except (ImportError, RuntimeError):
+            continue
+    return NullBackend()
+
+
+class AudioPlayer:
+    """Queue-based tone player; play() never blocks the caller."""
+
+    def __init__(self, backend=None, queue_size=DEFAULT_AUDIO_QUEUE_SIZE):
+        self.backend = backend or default_backend()
+        self.tones = {
+            '.': render_tone(TONE_FREQUENCY, DOT_MS),
+            '-': render_tone(TONE_FREQUENCY, DASH_MS),
+        }
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def play(self, symbol):
+        """Queue a symbol for playback; drop it if the player is far behind."""
+        try:
+            self.queue.put_nowait(symbol)
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        while True:
+            symbol = self.queue.get()
+            if symbol is None:
+                break
+            try:
+                tone = self.tones.get(symbol)
+                if tone is None:
+                    # Anything else is a pause of one dot
+                    time.sleep(DOT_MS / 1000)
+                else:
+                    self.backend.play(tone)
+            except Exception as e:
+                print(f"Sound error: {e}")
+
+    def close(self):
+        self.queue.put(None)
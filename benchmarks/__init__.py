@@ -0,0 +1,6 @@
+"""Benchmarks for the Morse socket communication system.
+
+Run individual benchmarks from the repository root, e.g.:
+
+    python -m benchmarks.server_load
+"""
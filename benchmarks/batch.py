@@ -0,0 +1,59 @@
+"""Batch translation throughput benchmark.
+
+Translates a synthetic archive of Morse messages with the scalar
+morse_to_text() loop and with morse_to_text_batch(), reporting messages/sec
+and MB/sec, and checks that every result matches the scalar translation.
+
+    python -m benchmarks.batch --messages 200000 --workers 4
+"""
+import argparse
+import random
+import time
+
+from morse_dict import MORSE_CODE_DICT, morse_to_text, morse_to_text_batch
+
+
+def synthetic_archive(count, words_per_message=8, seed=1):
+    rng = random.Random(seed)
+    codes = list(MORSE_CODE_DICT) + ['......', '.-.-.-.-']  # include unknown codes
+    messages = []
+    for _ in range(count):
+        words = [' '.join(rng.choice(codes) for _ in range(rng.randint(1, 6)))
+                 for _ in range(words_per_message)]
+        messages.append(' / '.join(words))
+    return messages
+
+
+def report(name, messages, size_mb, seconds):
+    print(f"{name:<22}{len(messages) / seconds:>14.0f}{size_mb / seconds:>10.2f}{seconds:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    messages = synthetic_archive(args.messages)
+    size_mb = sum(len(message) for message in messages) / 1e6
+    print(f"{len(messages)} messages, {size_mb:.1f} MB")
+    print(f"{'method':<22}{'msg/s':>14}{'MB/s':>10}{'seconds':>10}")
+
+    start = time.perf_counter()
+    expected = [morse_to_text(message) for message in messages]
+    report('scalar', messages, size_mb, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    result = morse_to_text_batch(messages)
+    report('batch', messages, size_mb, time.perf_counter() - start)
+    assert result == expected
+
+    if args.workers > 1:
+        start = time.perf_counter()
+        result = morse_to_text_batch(messages, workers=args.workers)
+        report(f'batch ({args.workers} processes)', messages, size_mb, time.perf_counter() - start)
+        assert result == expected
+
+
+if __name__ == '__main__':
+    main()
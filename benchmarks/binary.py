@@ -0,0 +1,70 @@
+"""Binary Morse encoding benchmark.
+
+Compares the text and the 2-bit binary wire encodings on a synthetic
+archive: bytes on the wire (including the frame header), the server's
+cost of translating a received payload (text: decode and morse_to_text;
+binary: binary_to_text straight from the packed elements, and for
+comparison unpacking to text Morse first), and the client-side packing
+cost. Also checks that every binary message translates exactly like its
+text form.
+
+    python -m benchmarks.binary --messages 100000
+"""
+import argparse
+import time
+
+from benchmarks.batch import synthetic_archive
+from framing import HEADER
+from morse_binary import binary_to_text, pack_morse, unpack_morse
+from morse_dict import morse_to_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=100000)
+    args = parser.parse_args()
+
+    # Messages where the '/' code appears as a letter are not canonical and
+    # stay text, as they would on a real binary connection
+    messages = synthetic_archive(args.messages)
+    text_payloads = [message.encode('utf-8') for message in messages]
+
+    start = time.perf_counter()
+    packed = [pack_morse(message) for message in messages]
+    pack_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    translated_text = [morse_to_text(payload.decode('utf-8')) for payload in text_payloads]
+    text_seconds = time.perf_counter() - start
+
+    binary_payloads = [payload for payload in packed if payload is not None]
+    start = time.perf_counter()
+    translated_binary = [binary_to_text(payload) for payload in binary_payloads]
+    binary_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for payload in binary_payloads:
+        morse_to_text(unpack_morse(payload))
+    unpack_seconds = time.perf_counter() - start
+
+    translated = iter(translated_binary)
+    for text, payload in zip(translated_text, packed):
+        if payload is not None:
+            assert text == next(translated)
+
+    text_bytes = sum(len(payload) + HEADER.size for payload in text_payloads)
+    binary_bytes = sum(len(binary if binary is not None else text) + HEADER.size
+                       for text, binary in zip(text_payloads, packed))
+    print(f"{len(messages)} messages, {len(binary_payloads)} packed as binary")
+    print(f"{'encoding':<10}{'wire MB':>10}{'bytes/msg':>12}{'translate msg/s':>17}")
+    print(f"{'text':<10}{text_bytes / 1e6:>10.2f}{text_bytes / len(messages):>12.1f}"
+          f"{len(messages) / text_seconds:>17.0f}")
+    print(f"{'binary':<10}{binary_bytes / 1e6:>10.2f}{binary_bytes / len(messages):>12.1f}"
+          f"{len(binary_payloads) / binary_seconds:>17.0f}")
+    print(f"binary via unpack_morse + morse_to_text: {len(binary_payloads) / unpack_seconds:.0f} msg/s")
+    print(f"binary is {binary_bytes / text_bytes:.0%} of the text size; "
+          f"packing runs at {len(messages) / pack_seconds:.0f} msg/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Client startup time benchmark.
+
+Measures, in fresh interpreters, how long it takes to import client.py
+(which no longer pulls in Tk, gui.py or pynput), to import the GUI stack
+for comparison, and to run a complete headless session: start, connect,
+send one message and exit.
+
+    python -m benchmarks.client_startup --runs 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.server_load import free_port, start_server_process
+
+CASES = {
+    'python -c pass': [sys.executable, '-c', 'pass'],
+    'import client': [sys.executable, '-c', 'import client'],
+    'import tkinter, gui': [sys.executable, '-c', 'import tkinter, gui'],
+}
+
+
+def time_command(command, runs):
+    """Median wall time of the command, or None if it fails (e.g. no display)."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return None
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    port = free_port()
+    process = start_server_process('asyncio', port, 128)
+    cases = dict(CASES)
+    cases['headless send'] = [sys.executable, 'client.py', '--headless', '--host', '127.0.0.1',
+                              '--port', str(port), '--send', '... --- ...']
+    try:
+        print(f"{'case':<22}{'median ms':>12}")
+        for name, command in cases.items():
+            median = time_command(command, args.runs)
+            value = f"{median * 1000:.1f}" if median is not None else 'failed'
+            print(f"{name:<22}{value:>12}")
+    finally:
+        process.kill()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
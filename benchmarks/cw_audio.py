@@ -0,0 +1,64 @@
+"""CW audio decoder benchmark.
+
+Synthesizes long CW recordings at several speeds and noise levels with
+the tone synthesizer, decodes them from disk through mmap and reports
+the realtime factor (seconds of audio decoded per second), the character
+accuracy and the peak memory the decoder allocated, which stays at a few
+chunks however long the recording is.
+
+    python -m benchmarks.cw_audio --minutes 10 --wpm 15 30 --noise 0 0.3
+"""
+import argparse
+import difflib
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cw_audio
+from benchmarks.keying import TEXT
+
+
+def measure(path, text, wpm, noise, chunk_seconds):
+    seconds = cw_audio.synthesize(text, path, wpm, noise=noise, seed=int(wpm))
+    tracemalloc.start()
+    start = time.perf_counter()
+    sample_rate, chunks = cw_audio.wav_chunks(path, chunk_seconds)
+    decoder = cw_audio.decode_chunks(sample_rate, chunks)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'seconds': seconds,
+        'realtime': seconds / elapsed,
+        'accuracy': difflib.SequenceMatcher(None, decoder.text, text, autojunk=False).ratio(),
+        'peak_mb': peak / 1e6,
+        'file_mb': os.path.getsize(path) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--minutes', type=float, default=10)
+    parser.add_argument('--wpm', type=float, nargs='+', default=[15, 30])
+    parser.add_argument('--noise', type=float, nargs='+', default=[0, 0.3])
+    parser.add_argument('--chunk-seconds', type=float, default=cw_audio.DEFAULT_CHUNK_SECONDS)
+    args = parser.parse_args()
+
+    print(f"{'wpm':>5}{'noise':>7}{'audio s':>9}{'file MB':>9}{'x realtime':>12}"
+          f"{'accuracy':>10}{'peak MB':>9}")
+    with tempfile.TemporaryDirectory(prefix='morse-cw-') as directory:
+        path = os.path.join(directory, 'cw.wav')
+        for wpm in args.wpm:
+            once = cw_audio.synthesize(TEXT, path, wpm)
+            repeats = math.ceil(args.minutes * 60 / once)
+            text = ' '.join([TEXT] * repeats)
+            for noise in args.noise:
+                result = measure(path, text, wpm, noise, args.chunk_seconds)
+                print(f"{wpm:>5.0f}{noise:>7.2f}{result['seconds']:>9.0f}{result['file_mb']:>9.1f}"
+                      f"{result['realtime']:>12.0f}{result['accuracy']:>10.1%}{result['peak_mb']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
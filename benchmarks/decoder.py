@@ -0,0 +1,65 @@
+"""Incremental decoder benchmark.
+
+Simulates an operator keying a long transmission symbol by symbol and
+compares re-translating the whole input with morse_to_text() after every
+symbol (what the GUI used to do) against feeding MorseDecoder one symbol
+at a time. Also checks that both produce identical translations.
+
+    python -m benchmarks.decoder --lengths 100 1000 10000
+"""
+import argparse
+import random
+import time
+
+from morse_dict import MORSE_CODE_DICT, MorseDecoder, morse_to_text
+
+
+def keyed_symbols(length, seed=1):
+    """Symbols as the GUI produces them: dots, dashes and ' / ' separators."""
+    rng = random.Random(seed)
+    codes = [code for code in MORSE_CODE_DICT if code != '/']
+    symbols = []
+    while len(symbols) < length:
+        symbols.extend(rng.choice(codes))
+        symbols.extend(' / ' if rng.random() < 0.2 else ' ')
+    return symbols[:length]
+
+
+def time_full_retranslation(symbols):
+    morse_code = ''
+    start = time.perf_counter()
+    for symbol in symbols:
+        morse_code += symbol
+        translation = morse_to_text(morse_code)
+    return time.perf_counter() - start, translation
+
+
+def time_incremental(symbols):
+    decoder = MorseDecoder()
+    translation = decoder.text
+    start = time.perf_counter()
+    for symbol in symbols:
+        retract, text = decoder.feed(symbol)
+        if retract:
+            translation = translation[:-retract]
+        translation += text
+    return time.perf_counter() - start, translation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lengths', type=int, nargs='+', default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'symbols':>8}{'full us/sym':>14}{'incremental us/sym':>20}{'speedup':>10}")
+    for length in args.lengths:
+        symbols = keyed_symbols(length)
+        full_time, full_text = time_full_retranslation(symbols)
+        incremental_time, incremental_text = time_incremental(symbols)
+        assert full_text == incremental_text == morse_to_text(''.join(symbols))
+        print(f"{length:>8}{full_time / length * 1e6:>14.2f}{incremental_time / length * 1e6:>20.2f}"
+              f"{full_time / incremental_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Text-to-Morse encoder throughput benchmark.
+
+Reports the encoding throughput of text_to_morse and of the streaming
+iter_text_to_morse on random text. The round-trip check lives in
+tests/test_morse_dict.py.
+
+    python -m benchmarks.encoder --size 1000000
+"""
+import argparse
+import random
+import time
+
+from morse_dict import TEXT_TO_MORSE_DICT, iter_text_to_morse, text_to_morse
+
+
+def random_text(rng, length):
+    alphabet = sorted(TEXT_TO_MORSE_DICT)
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000000, help='characters to encode')
+    args = parser.parse_args()
+
+    text = random_text(random.Random(2), args.size)
+    start = time.perf_counter()
+    morse = text_to_morse(text)
+    elapsed = time.perf_counter() - start
+    print(f"text_to_morse: {args.size / elapsed / 1e6:.1f} M chars/s, "
+          f"{len(morse) / elapsed / 1e6:.1f} MB/s of Morse")
+
+    chunks = [text[i:i + 4096] for i in range(0, len(text), 4096)]
+    start = time.perf_counter()
+    for _ in iter_text_to_morse(chunks):
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"iter_text_to_morse: {args.size / elapsed / 1e6:.1f} M chars/s")
+
+
+if __name__ == '__main__':
+    main()
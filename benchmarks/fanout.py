@@ -0,0 +1,78 @@
+"""Broadcast fan-out benchmark with stalled receivers.
+
+Connects one active reader and a growing number of receivers that never
+read, then measures how long broadcast() takes and how quickly the active
+reader gets each message. With per-client outbound queues neither number
+should grow with the number of stalled clients.
+
+    python -m benchmarks.fanout --clients 10 100 1000
+"""
+import argparse
+import socket
+import statistics
+import time
+
+import server
+from framing import FrameDecoder
+
+
+def measure(stalled_count, messages, queue_size, policy):
+    server.clients.clear()
+    server.rooms.clear()
+    peers = []
+    for _ in range(stalled_count):
+        server_side, peer = socket.socketpair()
+        connection = server.ClientConnection(server_side, 'stalled', queue_size, policy)
+        server.add_client(connection)
+        connection.start()
+        peers.append(peer)
+
+    server_side, reader = socket.socketpair()
+    active = server.ClientConnection(server_side, 'active', queue_size, policy)
+    server.add_client(active)
+    active.start()
+    decoder = FrameDecoder()
+    payload = 'SOS ' * 64
+
+    call_times = []
+    delivery_times = []
+    for _ in range(messages):
+        start = time.perf_counter()
+        server.broadcast(None, payload)
+        call_times.append(time.perf_counter() - start)
+        frames = []
+        while not frames:
+            frames = decoder.feed(reader.recv(65536))
+        delivery_times.append(time.perf_counter() - start)
+
+    dropped = sum(client.dropped for client in server.clients)
+    for client in list(server.clients):
+        client.close()
+    for peer in peers + [reader]:
+        peer.close()
+    return {
+        'broadcast_us': statistics.median(call_times) * 1e6,
+        'delivery_us': statistics.median(delivery_times) * 1e6,
+        'p99_delivery_us': sorted(delivery_times)[int(len(delivery_times) * 0.99) - 1] * 1e6,
+        'dropped': dropped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--queue-size', type=int, default=server.DEFAULT_OUTBOUND_QUEUE_SIZE)
+    parser.add_argument('--policy', default=server.DEFAULT_SLOW_CONSUMER_POLICY,
+                        choices=server.SLOW_CONSUMER_POLICIES)
+    args = parser.parse_args()
+
+    print(f"{'stalled':>8}{'broadcast us':>14}{'delivery us':>14}{'p99 us':>10}{'dropped':>10}")
+    for count in args.clients:
+        result = measure(count, args.messages, args.queue_size, args.policy)
+        print(f"{count:>8}{result['broadcast_us']:>14.1f}{result['delivery_us']:>14.1f}"
+              f"{result['p99_delivery_us']:>10.1f}{result['dropped']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Adaptive keying decoder benchmark.
+
+Decodes key-down/key-up timing traces with AdaptiveKeyer and with the
+GUI's old fixed 0.2 s dot/dash threshold (with gaps split at the same
+12 WPM speed), and reports the character accuracy of both and the cost
+per event. Traces are synthesized from text at several speeds with
+timing jitter, including one where the operator speeds up mid-message;
+recorded traces can be decoded instead with --traces.
+
+    python -m benchmarks.keying --wpm 5 12 20 30 40
+    python -m benchmarks.keying --save-traces traces.json
+    python -m benchmarks.keying --traces traces.json
+
+A trace file is a JSON list of {"name", "text", "events"} objects, where
+events are [kind, seconds] pairs (kind 1 = key down, 0 = key up).
+"""
+import argparse
+import difflib
+import json
+import random
+import time
+
+from keying import KEY_DOWN, KEY_UP, PARIS_UNIT, AdaptiveKeyer
+from morse_dict import morse_to_text, text_to_morse
+
+TEXT = ("CQ CQ DE W1AW W1AW K THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 1234567890 "
+        "SOS SOS WX HR IS SUNNY ES WARM 73 ES GUD DX")
+FIXED_THRESHOLD = 0.2
+
+
+def synthesize(text, wpm, jitter=0.15, end_wpm=None, seed=1):
+    """Key events for text sent at wpm (drifting to end_wpm), with relative timing jitter."""
+    rng = random.Random(seed)
+    morse = text_to_morse(text)
+    events = []
+    now = 0.0
+    total = len(morse)
+    for position, symbol in enumerate(morse.replace(' / ', '/')):
+        speed = wpm if end_wpm is None else wpm + (end_wpm - wpm) * position / total
+        unit = PARIS_UNIT / speed
+
+        def length(units):
+            return max(units * unit * rng.gauss(1, jitter), unit * 0.2)
+
+        if symbol in '.-':
+            if events and events[-1][0] == KEY_UP:
+                now += length(1)
+            events.append((KEY_DOWN, now))
+            now += length(1 if symbol == '.' else 3)
+            events.append((KEY_UP, now))
+        else:
+            # The element gap after the last mark is part of these
+            now += length(3 if symbol == ' ' else 7) - length(1)
+    return events
+
+
+def fixed_decode(events):
+    """The GUI's old fixed thresholds: 0.2 s marks, gaps scaled to match."""
+    parts = []
+    down_at = up_at = None
+    for kind, timestamp in events:
+        if kind == KEY_DOWN:
+            if up_at is not None:
+                gap = timestamp - up_at
+                parts.append('' if gap < FIXED_THRESHOLD else ' ' if gap < 2.5 * FIXED_THRESHOLD else ' / ')
+            down_at = timestamp
+        else:
+            parts.append('.' if timestamp - down_at < FIXED_THRESHOLD else '-')
+            up_at = timestamp
+    return ''.join(parts)
+
+
+def accuracy(decoded, text):
+    return difflib.SequenceMatcher(None, morse_to_text(decoded), text, autojunk=False).ratio()
+
+
+def synthetic_traces(speeds):
+    traces = [{'name': f'{wpm} wpm', 'text': TEXT, 'events': synthesize(TEXT, wpm, seed=wpm)}
+              for wpm in speeds]
+    traces.append({'name': '10->30 wpm', 'text': TEXT, 'events': synthesize(TEXT, 10, end_wpm=30)})
+    traces.append({'name': '30->10 wpm', 'text': TEXT, 'events': synthesize(TEXT, 30, end_wpm=10)})
+    return traces
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--wpm', type=int, nargs='+', default=[5, 12, 20, 30, 40])
+    parser.add_argument('--traces', help='decode recorded traces from this JSON file')
+    parser.add_argument('--save-traces', help='write the synthetic traces to this JSON file')
+    parser.add_argument('--repeat', type=int, default=50, help='decodes per trace when timing')
+    args = parser.parse_args()
+
+    if args.traces:
+        with open(args.traces) as f:
+            traces = json.load(f)
+    else:
+        traces = synthetic_traces(args.wpm)
+    if args.save_traces:
+        with open(args.save_traces, 'w') as f:
+            json.dump(traces, f)
+
+    print(f"{'trace':<14}{'events':>8}{'fixed':>8}{'adaptive':>10}{'est wpm':>9}{'ns/event':>10}")
+    for trace in traces:
+        events = [(kind, timestamp) for kind, timestamp in trace['events']]
+        keyer = AdaptiveKeyer()
+        decoded = keyer.feed_events(events) + keyer.end_message()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            AdaptiveKeyer().feed_events(events)
+        per_event = (time.perf_counter() - start) / (args.repeat * len(events))
+        print(f"{trace['name']:<14}{len(events):>8}{accuracy(fixed_decode(events), trace['text']):>8.1%}"
+              f"{accuracy(decoded, trace['text']):>10.1%}{keyer.wpm:>9.1f}{per_event * 1e9:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Message log benchmark.
+
+Appends a synthetic archive through the background writer and reports
+records per second and fsync count, then times reading the last N
+messages (of all rooms and of one room) as the log grows. Reads go
+through mmap and an offset index, so their time should not depend on the
+size of the log. The server replays from the in-memory ring of recent
+messages per room instead; its time is reported for a busy room and for
+a room with no messages, which the log reader has to scan for.
+
+    python -m benchmarks.message_log --messages 100000 200000 400000
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.batch import synthetic_archive
+from message_log import MessageLog
+
+ROOMS = ('main', 'ops', 'contest', 'emergency')
+
+
+def measure(directory, messages, replay, segment_size):
+    log = MessageLog(directory, segment_size=segment_size).start()
+    start = time.perf_counter()
+    for sequence, message in enumerate(messages):
+        log.append(ROOMS[sequence % len(ROOMS)], ('127.0.0.1', 5000), message)
+    enqueue_seconds = time.perf_counter() - start
+    log.close()
+    write_seconds = time.perf_counter() - start
+    fsyncs, dropped = log.fsyncs, log.dropped
+
+    log = MessageLog(directory, segment_size=segment_size, recent_size=replay)
+    times = {}
+    for name, room in (('all', None), ('room', 'ops')):
+        samples = []
+        for _ in range(200):
+            start = time.perf_counter()
+            records = log.tail(replay, room)
+            samples.append(time.perf_counter() - start)
+        assert len(records) == replay
+        times[name] = statistics.median(samples)
+    for name, room in (('recent', 'ops'), ('quiet', 'quiet')):
+        samples = []
+        for _ in range(200):
+            start = time.perf_counter()
+            log.recent_messages(room, replay)
+            samples.append(time.perf_counter() - start)
+        times[name] = statistics.median(samples)
+    start = time.perf_counter()
+    log.tail(replay, 'quiet')
+    times['quiet_tail'] = time.perf_counter() - start
+    log.close()
+    return {
+        'append_per_sec': len(messages) / enqueue_seconds,
+        'write_per_sec': len(messages) / write_seconds,
+        'fsyncs': fsyncs,
+        'dropped': dropped,
+        'tail_us': times['all'] * 1e6,
+        'room_tail_us': times['room'] * 1e6,
+        'quiet_tail_us': times['quiet_tail'] * 1e6,
+        'recent_us': times['recent'] * 1e6,
+        'quiet_recent_us': times['quiet'] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, nargs='+', default=[100000, 200000, 400000])
+    parser.add_argument('--replay', type=int, default=20)
+    parser.add_argument('--segment-size', type=int, default=4 * 1024 * 1024)
+    args = parser.parse_args()
+
+    print(f"{'messages':>10}{'append/s':>12}{'written/s':>12}{'fsyncs':>8}{'dropped':>9}"
+          f"{'tail us':>10}{'room tail us':>14}{'quiet tail us':>15}{'ring us':>9}{'quiet ring us':>15}")
+    for count in args.messages:
+        directory = tempfile.mkdtemp(prefix='morse-log-')
+        try:
+            result = measure(directory, synthetic_archive(count), args.replay, args.segment_size)
+        finally:
+            shutil.rmtree(directory)
+        print(f"{count:>10}{result['append_per_sec']:>12.0f}{result['write_per_sec']:>12.0f}"
+              f"{result['fsyncs']:>8}{result['dropped']:>9}{result['tail_us']:>10.1f}{result['room_tail_us']:>14.1f}"
+              f"{result['quiet_tail_us']:>15.0f}{result['recent_us']:>9.1f}{result['quiet_recent_us']:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
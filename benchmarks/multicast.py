@@ -0,0 +1,164 @@
+"""Multicast fan-out benchmark (runs on loopback).
+
+Egress: the same room of socketpair connections is fed through broadcast()
+once with TCP fan-out and once with every member subscribed to a
+multicast group, counting the server's send calls per message.
+
+Delivery: real clients subscribe to the group over loopback, with a share
+of datagrams dropped on arrival, and the benchmark checks that every
+message still arrives (in order) through the NACK/retransmit path.
+
+    python -m benchmarks.multicast --connections 10 100 1000 --loss 0.1
+"""
+import argparse
+import random
+import socket
+import statistics
+import threading
+import time
+
+import server
+from client import MorseClient
+from loadgen import raise_fd_limit
+from multicast import MulticastSubscriber
+
+GROUP = '239.255.42.99'
+
+
+def free_port(kind=socket.SOCK_STREAM):
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def drain(peers):
+    for peer in peers:
+        try:
+            while peer.recv(65536):
+                pass
+        except BlockingIOError:
+            pass
+
+
+def measure_egress(count, messages, multicast):
+    server.clients.clear()
+    server.rooms.clear()
+    if multicast:
+        server.MULTICAST_GROUP = GROUP
+        server.MULTICAST_PORT = free_port(socket.SOCK_DGRAM)
+        server.open_multicast('127.0.0.1')
+    connections = []
+    peers = []
+    for _ in range(count):
+        server_side, peer = socket.socketpair()
+        peer.setblocking(False)
+        connection = server.ClientConnection(server_side, 'member')
+        connection.start()
+        server.add_client(connection)
+        if multicast:
+            server.subscribe_multicast(connection)
+        connections.append(connection)
+        peers.append(peer)
+    time.sleep(0.1)
+    drain(peers)
+    calls_before = sum(connection.send_calls for connection in connections)
+    payload = 'SOS ' * 16
+    times = []
+    for _ in range(messages):
+        start = time.perf_counter()
+        server.broadcast(None, payload)
+        times.append(time.perf_counter() - start)
+        drain(peers)
+    time.sleep(0.1)
+    drain(peers)
+    calls = sum(connection.send_calls for connection in connections) - calls_before
+    if multicast:
+        calls += server.multicast.published
+    for connection in connections:
+        connection.close()
+    for peer in peers:
+        peer.close()
+    server.close_multicast()
+    server.MULTICAST_GROUP = None
+    return {'broadcast_us': statistics.median(times) * 1e6, 'sends_per_message': calls / messages}
+
+
+class LossySubscriber(MulticastSubscriber):
+    """Drops a share of the datagrams read from the group (not the TCP retransmits)."""
+    loss = 0.0
+
+    def handle_datagram(self, data, retransmit=True):
+        if not retransmit and random.random() < self.loss:
+            return
+        super().handle_datagram(data, retransmit)
+
+
+def measure_delivery(subscribers, messages, loss, timeout=10.0):
+    server.MULTICAST_GROUP = GROUP
+    server.MULTICAST_PORT = free_port(socket.SOCK_DGRAM)
+    server.open_multicast('127.0.0.1')
+    port = free_port()
+    thread = threading.Thread(target=server.start_server, args=('127.0.0.1', port), daemon=True)
+    thread.start()
+    time.sleep(0.3)
+    LossySubscriber.loss = loss
+    clients = []
+    for _ in range(subscribers):
+        client = MorseClient('127.0.0.1', port, multicast=True)
+        client.subscriber_class = LossySubscriber
+        client.connect()
+        client.start_receiving()
+        clients.append(client)
+    sender = MorseClient('127.0.0.1', port)
+    sender.connect()
+    time.sleep(0.3)
+    for index in range(messages):
+        sender.send_message(' '.join(['.' * (index % 5 + 1)] * 4))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(client.receive_stats()['received'] >= messages for client in clients):
+            break
+        time.sleep(0.1)
+    elapsed = timeout - max(deadline - time.monotonic(), 0)
+    stats = [client.receive_stats()['multicast'] for client in clients]
+    publisher = server.multicast.stats()
+    for client in clients + [sender]:
+        client.close()
+    server.request_shutdown()
+    thread.join()
+    server.close_multicast()
+    server.MULTICAST_GROUP = None
+    return {
+        'delivered': sum(entry['delivered'] for entry in stats) / (subscribers * messages),
+        'recovered': sum(entry['recovered'] for entry in stats),
+        'nacks': publisher['nacks'],
+        'seconds': elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--subscribers', type=int, default=5)
+    parser.add_argument('--loss', type=float, default=0.1)
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    server.setup_logging()
+    server.logger.setLevel('WARNING')
+    print(f"{'connections':>12}{'tcp us':>10}{'tcp sends/msg':>15}{'mcast us':>10}{'mcast sends/msg':>17}")
+    for count in args.connections:
+        tcp = measure_egress(count, args.messages, multicast=False)
+        mcast = measure_egress(count, args.messages, multicast=True)
+        print(f"{count:>12}{tcp['broadcast_us']:>10.1f}{tcp['sends_per_message']:>15.1f}"
+              f"{mcast['broadcast_us']:>10.1f}{mcast['sends_per_message']:>17.1f}")
+
+    result = measure_delivery(args.subscribers, args.messages, args.loss)
+    print(f"\n{args.subscribers} subscribers, {args.loss:.0%} datagram loss: "
+          f"{result['delivered']:.1%} delivered, {result['recovered']} recovered over TCP, "
+          f"{result['nacks']} NACKs, {result['seconds']:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Rate limiting and admission control benchmark.
+
+Flood: a room of listeners, one client sending as fast as it can and one
+sending 10 messages a second. The well-behaved client's end-to-end
+latency is measured at a listener, with no limits and then with a
+per-connection rate limit (and load shedding) that caps the flooder.
+
+Storm: many clients connect at once, as after a server restart, with no
+limit and with an accept rate limit; rejected connections are reset
+immediately instead of being served.
+
+Every run starts a fresh threaded server in a subprocess.
+
+    python -m benchmarks.ratelimit --listeners 50 --duration 5 --client-rate 50
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.server_load import free_port
+from framing import FrameDecoder
+from loadgen import parse_message, percentile, raise_fd_limit, send
+
+SERVER_COMMAND = ("import server; {settings}; server.apply_settings(); "
+                  "server.start_server('127.0.0.1', {port}, 4096, 10000)")
+FLOODER, PROBER = 0, 1
+
+
+class Stats:
+    def __init__(self):
+        self.sent = 0
+        self.send_times = {}
+        self.latencies = []
+        self.flood_delivered = 0
+
+
+def start_server(port, **settings):
+    command = SERVER_COMMAND.format(port=port, settings='; '.join(
+        f"server.{name} = {value!r}" for name, value in settings.items()) or 'pass')
+    process = subprocess.Popen([sys.executable, '-c', command],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            # Takes one token from the accept limit, well within its burst
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+async def listen(reader, stats, record):
+    decoder = FrameDecoder()
+    while True:
+        try:
+            data = await reader.read(65536)
+        except OSError:
+            return
+        if not data:
+            return
+        now = time.perf_counter()
+        for payload in decoder.feed(data):
+            key = parse_message(str(payload, 'utf-8', 'replace'))
+            if not record or key is None:
+                continue
+            if key[0] == PROBER:
+                stats.latencies.append(now - stats.send_times[key])
+            else:
+                stats.flood_delivered += 1
+
+
+async def run_flood(port, listeners, duration, probe_rate):
+    stats = Stats()
+    streams = [await asyncio.open_connection('127.0.0.1', port) for _ in range(listeners + 2)]
+    tasks = [asyncio.create_task(listen(reader, stats, index == 2)) for index, (reader, _) in enumerate(streams)]
+    await asyncio.sleep(0.5)
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(send(FLOODER, streams[0][1], stats, 0, 10 ** 9, 64, deadline),
+                         send(PROBER, streams[1][1], stats, probe_rate, 10 ** 9, 64, deadline))
+    # Let what is still queued arrive (or be dropped) before counting
+    await asyncio.sleep(2.0)
+    for task in tasks:
+        task.cancel()
+    for _, writer in streams:
+        writer.close()
+    latencies = sorted(stats.latencies)
+    probes = sum(1 for key in stats.send_times if key[0] == PROBER)
+    return {
+        'flood_sent': stats.sent - probes,
+        'flood_delivered': stats.flood_delivered,
+        'probe_delivered': len(latencies) / probes if probes else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def try_connection(port, hold):
+    """True if the server kept the connection open for `hold` seconds."""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    except OSError:
+        return False
+    try:
+        data = await asyncio.wait_for(reader.read(1), hold)
+        accepted = bool(data)
+    except asyncio.TimeoutError:
+        accepted = True
+    except OSError:
+        accepted = False
+    writer.close()
+    return accepted
+
+
+async def run_storm(port, connections, hold=1.0):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(try_connection(port, hold) for _ in range(connections)))
+    return {'accepted': sum(results), 'rejected': connections - sum(results),
+            'seconds': time.perf_counter() - start - hold}
+
+
+def with_server(settings, coroutine, *args):
+    port = free_port()
+    process = start_server(port, **settings)
+    try:
+        return asyncio.run(coroutine(port, *args))
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listeners', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--probe-rate', type=float, default=10.0)
+    parser.add_argument('--client-rate', type=float, default=50.0,
+                        help='CLIENT_RATE_LIMIT for the limited run, messages/s')
+    parser.add_argument('--high-water', type=int, default=5000,
+                        help='LOAD_SHED_HIGH_WATER for the limited run')
+    parser.add_argument('--storm', type=int, default=1000, help='connections opened at once')
+    parser.add_argument('--accept-rate', type=float, default=200.0,
+                        help='ACCEPT_RATE_LIMIT for the limited run, connections/s')
+    args = parser.parse_args()
+    raise_fd_limit()
+
+    print(f"{'flood':<14}{'flood sent':>12}{'delivered':>11}{'probe recv':>12}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, settings in (('no limit', {}),
+                           ('rate limited', {'CLIENT_RATE_LIMIT': args.client_rate,
+                                             'LOAD_SHED_HIGH_WATER': args.high_water})):
+        result = with_server(settings, run_flood, args.listeners, args.duration, args.probe_rate)
+        print(f"{name:<14}{result['flood_sent']:>12}{result['flood_delivered']:>11}"
+              f"{result['probe_delivered']:>12.0%}{result['p50_ms']:>9.1f}{result['p99_ms']:>9.1f}")
+
+    print(f"\n{'storm':<14}{'accepted':>12}{'rejected':>11}{'seconds':>12}")
+    for name, settings in (('no limit', {}), ('accept limit', {'ACCEPT_RATE_LIMIT': args.accept_rate})):
+        result = with_server(settings, run_storm, args.storm)
+        print(f"{name:<14}{result['accepted']:>12}{result['rejected']:>11}{result['seconds']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
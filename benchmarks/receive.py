@@ -0,0 +1,149 @@
+"""Receive path benchmark: recv() + FrameDecoder vs recv_into() + ReceiveBuffer.
+
+Both loops read the same stream of framed Morse messages from an
+in-memory socket (so the kernel is out of the picture) and decode every
+payload to str, as the server does before translating it:
+
+  recv      the previous handler: a new bytes object per read, copied into
+            the decoder's bytearray, and a bytes object per frame
+  recv_into the current handler: reads land in one pooled buffer and
+            frames are memoryview slices decoded in place
+
+Throughput (best of --repeat runs) and garbage collections are measured
+without tracing. A second pass with tracemalloc records how far memory
+peaks above its level at the start of each read while that read and the
+frames it completed are handled, averaged over the reads; messages of a few words and of a few hundred
+words are both measured, since copies grow with the message and views
+don't.
+
+    python -m benchmarks.receive --messages 200000 --read-size 4096
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from framing import BufferPool, FrameDecoder, ReceiveBuffer, encode_frame
+from morse_dict import text_to_morse
+
+WORDS = ['CQ', 'DE', 'W1AW', 'SOS', 'TEST', 'QTH', 'RST', '599', 'TU', '73', 'K', 'HELLO', 'WORLD']
+
+
+class MemorySocket:
+    """Serves a byte stream through recv() and recv_into(), at most read_size bytes per call."""
+
+    def __init__(self, data, read_size):
+        self.data = memoryview(data)
+        self.read_size = read_size
+        self.offset = 0
+
+    def recv(self, size):
+        size = min(size, self.read_size)
+        chunk = bytes(self.data[self.offset:self.offset + size])
+        self.offset += len(chunk)
+        return chunk
+
+    def recv_into(self, buffer):
+        size = min(len(buffer), self.read_size, len(self.data) - self.offset)
+        buffer[:size] = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return size
+
+
+def message_stream(count, words=4, seed=1):
+    """Framed Morse messages of 1 to `words` words."""
+    rng = random.Random(seed)
+    messages = [text_to_morse(' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, words))))
+                for _ in range(256)]
+    return b''.join(encode_frame(messages[index % len(messages)]) for index in range(count))
+
+
+def recv_loop(sock, on_read=None):
+    decoder = FrameDecoder()
+    count = 0
+    while True:
+        data = sock.recv(4096)
+        if not data:
+            return count
+        for payload in decoder.feed(data):
+            payload.decode('utf-8')
+            count += 1
+        if on_read:
+            on_read()
+
+
+def recv_into_loop(sock, on_read=None, pool=None):
+    buffer = ReceiveBuffer(pool)
+    count = 0
+    while True:
+        if not buffer.recv_into(sock):
+            buffer.release()
+            return count
+        for payload in buffer.frames():
+            str(payload, 'utf-8')
+            count += 1
+        if on_read:
+            on_read()
+
+
+def throughput(loop, data, read_size, repeat, **kwargs):
+    """(messages/s, MB/s, generation 0 collections) of the fastest run."""
+    best = None
+    collections = gc.get_stats()[0]['collections']
+    for _ in range(repeat):
+        sock = MemorySocket(data, read_size)
+        start = time.perf_counter()
+        count = loop(sock, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    collections = gc.get_stats()[0]['collections'] - collections
+    return count / best, len(data) / best / 1e6, collections // repeat
+
+
+def peak_per_read(loop, data, read_size, **kwargs):
+    """Average bytes allocated above the level at the start of a read while it is handled."""
+    sock = MemorySocket(data, read_size)
+    total = 0
+    reads = 0
+    tracemalloc.start()
+    level = tracemalloc.get_traced_memory()[0]
+
+    def on_read():
+        nonlocal total, reads, level
+        current, peak = tracemalloc.get_traced_memory()
+        total += peak - level
+        reads += 1
+        tracemalloc.reset_peak()
+        level = current
+
+    tracemalloc.reset_peak()
+    loop(sock, on_read=on_read, **kwargs)
+    tracemalloc.stop()
+    return total / reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--read-size', type=int, nargs='+', default=[512, 4096],
+                        help='bytes the socket hands over per read')
+    parser.add_argument('--words', type=int, nargs='+', default=[4, 200],
+                        help='longest message, in words')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pool = BufferPool()
+    print(f"{'words':>6}{'read size':>10}{'loop':>11}{'msg/s':>12}{'MB/s':>8}{'gen0 GCs':>10}{'peak B/read':>13}")
+    for words in args.words:
+        data = message_stream(args.messages, words)
+        for read_size in args.read_size:
+            for name, loop, kwargs in (('recv', recv_loop, {}), ('recv_into', recv_into_loop, {'pool': pool})):
+                rate, megabytes, collections = throughput(loop, data, read_size, args.repeat, **kwargs)
+                peak = peak_per_read(loop, data[:len(data) // 10], read_size, **kwargs)
+                print(f"{words:>6}{read_size:>10}{name:>11}{rate:>12,.0f}{megabytes:>8.1f}"
+                      f"{collections:>10}{peak:>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
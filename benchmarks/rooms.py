@@ -0,0 +1,79 @@
+"""Room broadcast benchmark.
+
+Spreads a growing number of connections over rooms of a fixed size and
+measures how long broadcast() takes into one of them. With indexed
+rooms the cost depends on the room size, not on the total number of
+connections; the same clients in a single shared room are timed for
+comparison.
+
+    python -m benchmarks.rooms --connections 100 1000 5000 --room-size 10
+"""
+import argparse
+import socket
+import statistics
+import time
+
+import server
+from loadgen import raise_fd_limit
+
+
+def connect_clients(count, room_size, shared):
+    """Register `count` socketpair connections, `room_size` per room (or all in one)."""
+    server.clients.clear()
+    server.rooms.clear()
+    connections = []
+    peers = []
+    for index in range(count):
+        server_side, peer = socket.socketpair()
+        connection = server.ClientConnection(server_side, 'member')
+        server.add_client(connection)
+        if not shared:
+            server.rooms.join(connection, f'room-{index // room_size}')
+        connections.append(connection)
+        peers.append(peer)
+    return connections, peers
+
+
+def measure(count, room_size, messages, shared=False):
+    connections, peers = connect_clients(count, room_size, shared)
+    room = server.rooms.room_of(connections[0])
+    payload = 'SOS ' * 16
+    times = []
+    for _ in range(messages):
+        start = time.perf_counter()
+        server.broadcast(None, payload, room=room)
+        times.append(time.perf_counter() - start)
+        # Keep the kernel buffers of the target room from filling up
+        for peer in peers[:room_size]:
+            peer.setblocking(False)
+            try:
+                while peer.recv(65536):
+                    pass
+            except BlockingIOError:
+                pass
+    recipients = len(server.rooms.members(room))
+    for connection in connections:
+        connection.close()
+    for peer in peers:
+        peer.close()
+    return {'broadcast_us': statistics.median(times) * 1e6, 'recipients': recipients}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--room-size', type=int, default=10)
+    parser.add_argument('--messages', type=int, default=200)
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    print(f"{'connections':>12}{'room us':>10}{'recipients':>12}{'shared us':>12}{'recipients':>12}")
+    for count in args.connections:
+        rooms = measure(count, args.room_size, args.messages)
+        shared = measure(count, args.room_size, args.messages, shared=True)
+        print(f"{count:>12}{rooms['broadcast_us']:>10.1f}{rooms['recipients']:>12}"
+              f"{shared['broadcast_us']:>12.1f}{shared['recipients']:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Load benchmark comparing the threaded and asyncio server modes.
+
+Starts each server mode in a subprocess, opens many client connections,
+lets a subset of them send Morse messages and measures how many
+connections were held and how many broadcast deliveries per second the
+server achieved.
+
+    python -m benchmarks.server_load --connections 1000 --senders 20 --messages 50
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+
+from framing import FrameDecoder, encode_frame
+from loadgen import raise_fd_limit
+from morse_dict import text_to_morse
+
+MESSAGE = encode_frame(text_to_morse('SOS'))
+
+SERVER_COMMANDS = {
+    'threaded': "import server; server.start_server('127.0.0.1', {port}, {backlog})",
+    'asyncio': "import server; server.start_async_server('127.0.0.1', {port}, {backlog})",
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server_process(mode, port, backlog):
+    command = SERVER_COMMANDS[mode].format(port=port, backlog=backlog)
+    process = subprocess.Popen([sys.executable, '-c', command],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+async def receive_deliveries(reader, counter):
+    decoder = FrameDecoder()
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            counter['closed'] += 1
+            return
+        counter['delivered'] += len(decoder.feed(data))
+
+
+async def run_load(port, connections, senders, messages, timeout):
+    counter = {'delivered': 0, 'closed': 0}
+    streams = []
+    start = time.perf_counter()
+    for _ in range(connections):
+        try:
+            streams.append(await asyncio.open_connection('127.0.0.1', port))
+        except OSError:
+            break
+    connect_time = time.perf_counter() - start
+    receivers = [asyncio.create_task(receive_deliveries(reader, counter)) for reader, _ in streams]
+    # Give the server a moment to register every connection before sending
+    await asyncio.sleep(0.5)
+
+    expected = senders * messages * (len(streams) - 1)
+    start = time.perf_counter()
+    for _ in range(messages):
+        for _, writer in streams[:senders]:
+            writer.write(MESSAGE)
+        await asyncio.gather(*(writer.drain() for _, writer in streams[:senders]))
+    while counter['delivered'] < expected and time.perf_counter() - start < timeout:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    held = len(streams) - counter['closed']
+
+    for task in receivers:
+        task.cancel()
+    for _, writer in streams:
+        writer.close()
+    return {
+        'connections_held': held,
+        'connect_seconds': connect_time,
+        'deliveries': counter['delivered'],
+        'expected_deliveries': expected,
+        'seconds': elapsed,
+        'deliveries_per_sec': counter['delivered'] / elapsed if elapsed else 0.0,
+    }
+
+
+def run_benchmark(mode, connections, senders, messages, backlog, timeout):
+    port = free_port()
+    process = start_server_process(mode, port, backlog)
+    try:
+        return asyncio.run(run_load(port, connections, senders, messages, timeout))
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=list(SERVER_COMMANDS), choices=list(SERVER_COMMANDS))
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--senders', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=20)
+    parser.add_argument('--backlog', type=int, default=1024)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    print(f"{'mode':<10}{'held':>8}{'connect s':>12}{'delivered':>12}{'expected':>12}{'msg/s':>14}")
+    for mode in args.modes:
+        result = run_benchmark(mode, args.connections, args.senders, args.messages,
+                               args.backlog, args.timeout)
+        print(f"{mode:<10}{result['connections_held']:>8}{result['connect_seconds']:>12.2f}"
+              f"{result['deliveries']:>12}{result['expected_deliveries']:>12}"
+              f"{result['deliveries_per_sec']:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
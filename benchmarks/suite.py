@@ -0,0 +1,197 @@
+"""Repeatable benchmark suite with stored results and regression checks.
+
+Runs a fixed set of benchmarks (morse_to_text, batch translation, frame
+encoding and decoding, broadcast fan-out and an end-to-end load test
+against both server modes), keeps the best of --repeat runs for each
+metric and writes the results to a JSON file. When a baseline file
+exists, every metric is compared with it and the run fails if one got
+worse by more than --tolerance.
+
+    python -m benchmarks.suite                      # run and compare with the baseline
+    python -m benchmarks.suite --save-baseline      # run and store the new baseline
+    python -m benchmarks.suite --only framing fanout
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import loadgen
+from benchmarks.batch import synthetic_archive
+from benchmarks.fanout import measure
+from benchmarks.server_load import free_port, start_server_process
+from framing import FrameDecoder, encode_frame
+from morse_dict import morse_to_text, morse_to_text_batch
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, 'latest.json')
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+DEFAULT_TOLERANCE = 0.10
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_translate(quick):
+    """Messages per second through morse_to_text and morse_to_text_batch."""
+    messages = synthetic_archive(20000 if quick else 100000)
+    scalar, expected = timed(lambda: [morse_to_text(message) for message in messages])
+    batch, result = timed(morse_to_text_batch, messages)
+    assert result == expected
+    return {
+        'morse_to_text_msg_per_sec': (len(messages) / scalar, 'higher'),
+        'morse_to_text_batch_msg_per_sec': (len(messages) / batch, 'higher'),
+    }
+
+
+def bench_framing(quick):
+    """Frame encode rate and decode throughput over a stream split into reads."""
+    payloads = synthetic_archive(20000 if quick else 100000)
+    encode, frames = timed(lambda: [encode_frame(payload) for payload in payloads])
+    stream = b''.join(frames)
+    chunks = [stream[i:i + 4096] for i in range(0, len(stream), 4096)]
+    decoder = FrameDecoder()
+    decode, decoded = timed(lambda: sum(len(decoder.feed(chunk)) for chunk in chunks))
+    assert decoded == len(payloads)
+    return {
+        'encode_frames_per_sec': (len(payloads) / encode, 'higher'),
+        'decode_mb_per_sec': (len(stream) / 1e6 / decode, 'higher'),
+    }
+
+
+def bench_fanout(quick):
+    """Broadcast call time and delivery latency with stalled receivers."""
+    results = {}
+    for count in (10, 100) if quick else (10, 100, 1000):
+        result = measure(count, 200 if quick else 1000, 1024, 'drop')
+        results[f'fanout_{count}_broadcast_us'] = (result['broadcast_us'], 'lower')
+        results[f'fanout_{count}_delivery_us'] = (result['delivery_us'], 'lower')
+    return results
+
+
+def bench_end_to_end(quick):
+    """loadgen against each server mode: throughput and latency percentiles."""
+    results = {}
+    for mode in ('threaded', 'asyncio'):
+        port = free_port()
+        process = start_server_process(mode, port, 1024)
+        try:
+            result = asyncio.run(loadgen.run_load('127.0.0.1', port, 100 if quick else 500, 10,
+                                                  rate=0, messages=50 if quick else 200))
+        finally:
+            process.kill()
+            process.wait()
+        results[f'{mode}_deliveries_per_sec'] = (result['deliveries_per_sec'], 'higher')
+        results[f'{mode}_latency_p50_ms'] = (result['latency_p50_ms'], 'lower')
+        results[f'{mode}_latency_p99_ms'] = (result['latency_p99_ms'], 'lower')
+    return results
+
+
+BENCHMARKS = {
+    'translate': bench_translate,
+    'framing': bench_framing,
+    'fanout': bench_fanout,
+    'end_to_end': bench_end_to_end,
+}
+
+
+def run_suite(names, repeat, quick):
+    """Run the benchmarks and keep the best value of every metric."""
+    metrics = {}
+    for name in names:
+        for _ in range(repeat):
+            for metric, (value, better) in BENCHMARKS[name](quick).items():
+                best = metrics.get(metric)
+                if best is None or (value > best['value'] if better == 'higher' else value < best['value']):
+                    metrics[metric] = {'value': value, 'better': better}
+        print(f"[INFO] {name} done", file=sys.stderr)
+    return metrics
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(metrics, baseline, tolerance):
+    """Return (metric, baseline, current, change) for every regression beyond tolerance."""
+    regressions = []
+    for metric, current in metrics.items():
+        previous = baseline.get(metric)
+        if not previous or not previous['value']:
+            continue
+        change = (current['value'] - previous['value']) / previous['value']
+        if current['better'] == 'lower':
+            change = -change
+        if change < -tolerance:
+            regressions.append((metric, previous['value'], current['value'], change))
+    return regressions
+
+
+def save(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true', help='smaller inputs, for a fast check')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative slowdown before a metric counts as a regression')
+    args = parser.parse_args()
+
+    loadgen.raise_fd_limit()
+    metrics = run_suite(args.only, args.repeat, args.quick)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['metrics']
+
+    print(f"{'metric':<36}{'value':>14}{'baseline':>14}{'change':>9}")
+    for metric, current in metrics.items():
+        previous = baseline.get(metric, {}).get('value')
+        change = ''
+        if previous:
+            change = f"{(current['value'] - previous) / previous:+.1%}"
+        previous = f"{previous:.2f}" if previous is not None else '-'
+        print(f"{metric:<36}{current['value']:>14.2f}{previous:>14}{change:>9}")
+
+    data = {'environment': environment(), 'metrics': metrics}
+    save(args.output, data)
+    if args.save_baseline:
+        save(args.baseline, data)
+        print(f"[INFO] Baseline saved to {args.baseline}")
+        return
+
+    regressions = compare(metrics, baseline, args.tolerance)
+    for metric, previous, current, change in regressions:
+        print(f"[REGRESSION] {metric}: {previous:.2f} -> {current:.2f} ({-change:.1%} worse)")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
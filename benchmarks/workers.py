@@ -0,0 +1,65 @@
+"""Multi-worker scaling benchmark.
+
+Starts the server with 1, 2, 4... worker processes sharing one port and
+runs the same load as benchmarks.server_load against each, so the
+deliveries/sec column shows how throughput scales with the worker count.
+Cross-worker deliveries go through the master's message bus.
+
+    python -m benchmarks.workers --workers 1 2 4 --mode asyncio
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.server_load import free_port, raise_fd_limit, run_load
+
+WORKERS_COMMAND = "import workers; workers.start_workers('127.0.0.1', {port}, {workers}, '{mode}')"
+
+
+def start_workers_process(workers, mode, port):
+    command = WORKERS_COMMAND.format(port=port, workers=workers, mode=mode)
+    process = subprocess.Popen([sys.executable, '-c', command],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            # Give the remaining workers a moment to bind as well
+            time.sleep(0.5 + 0.1 * workers)
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"{workers} workers did not start on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--mode', default='asyncio', choices=['threaded', 'asyncio'])
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--senders', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=20)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    print(f"{'workers':>8}{'held':>8}{'delivered':>12}{'expected':>12}{'msg/s':>14}")
+    for count in args.workers:
+        port = free_port()
+        process = start_workers_process(count, args.mode, port)
+        try:
+            result = asyncio.run(run_load(port, args.connections, args.senders,
+                                          args.messages, args.timeout))
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{count:>8}{result['connections_held']:>8}{result['deliveries']:>12}"
+              f"{result['expected_deliveries']:>12}{result['deliveries_per_sec']:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,143 @@
+import argparse
+import asyncio
+import random
 import socket
 import os
+import sys
+import zlib
 import time
-import tkinter as tk
-from tkinter import messagebox, simpledialog
+import threading
+from collections import deque
 from dotenv import load_dotenv
-from gui import MorseGUI
+from framing import FrameDecoder, encode_frame, read_frame, send_frame
+from keying import KEYING_END, KEYING_RESET, pack_events
+from morse_binary import BINARY_ACCEPT, BINARY_HELLO, is_control, pack_morse
+from multicast import (MULTICAST_ACCEPT, MULTICAST_LOST, MULTICAST_RETRANSMIT, MULTICAST_SUBSCRIBE,
+                       MULTICAST_UNSUBSCRIBE, MulticastSubscriber, nack_payload, parse_accept, parse_range)
+from rooms import DEFAULT_ROOM, JOINED_PREFIX, REPLAY_PREFIX, join_frame_payload, parse_replay
+
+# tkinter and gui (which pulls in pynput and the keyboard hooks) are only
+# imported when a dialog or the GUI is actually needed, so headless use
+# starts quickly and works without a display.
+
+RECV_BUFFER_SIZE = 4096
+DEFAULT_INBOX_SIZE = 256
+DEFAULT_SERVER_IP = "127.0.0.1"
+DEFAULT_SERVER_PORT = 5000
+DEFAULT_OUTBOUND_BUFFER_SIZE = 100
+RECONNECT_BACKOFF_BASE = 0.5
+RECONNECT_BACKOFF_MAX = 30.0
+# Detect a dead server within about a minute instead of the OS default of hours
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+
+def tune_socket(sock):
+    """Send small messages immediately (no Nagle delay) and probe idle connections."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # Option names differ per platform (TCP_KEEPALIVE is the macOS idle time)
+    for name, value in (("TCP_KEEPIDLE", KEEPALIVE_IDLE), ("TCP_KEEPALIVE", KEEPALIVE_IDLE),
+                        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL), ("TCP_KEEPCNT", KEEPALIVE_COUNT)):
+        if hasattr(socket, name):
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, name), value)
+            except OSError:
+                pass
+
+def backoff_delays(base=RECONNECT_BACKOFF_BASE, cap=RECONNECT_BACKOFF_MAX):
+    """Exponential backoff with full jitter: attempt n waits uniform(0, min(cap, base * 2**n)).
+
+    The jitter keeps many clients that lost the same server from
+    reconnecting in lockstep.
+    """
+    attempt = 0
+    while True:
+        yield random.uniform(0, min(cap, base * 2 ** attempt))
+        attempt += 1
+
+def resolve_connection(host=None, port=None):
+    """Connection settings from the arguments, then SERVER_IP/SERVER_PORT, then defaults."""
+    load_dotenv()
+    host = host or os.getenv("SERVER_IP") or DEFAULT_SERVER_IP
+    port = int(port or os.getenv("SERVER_PORT") or DEFAULT_SERVER_PORT)
+    return host, port
+
+def encode_message(morse_code, binary):
+    """Payload for a Morse message: packed when binary was negotiated and possible."""
+    if binary:
+        packed = pack_morse(morse_code)
+        if packed is not None:
+            return packed
+    return morse_code
 
 class MorseClient:
-    def __init__(self):
+    subscriber_class = MulticastSubscriber
+    
+    def __init__(self, host=None, port=None, interactive=False, binary=None, room=None, raw_keying=None,
+                 multicast=None):
         # Load environment variables if available
         load_dotenv()
         
-        # Get server connection details (either from .env or user input)
-        self.get_connection_details()
+        if interactive:
+            # Get server connection details (either from .env or user input)
+            self.get_connection_details()
+        else:
+            self.SERVER_IP, self.SERVER_PORT = resolve_connection(host, port)
         
-        self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.client_socket = None
         self.client_ip = None
         self.connection_status = "Disconnected"
+        self.connected = False
+        self.closing = threading.Event()
+        
+        # Reconnect automatically (with backoff) when an established
+        # connection drops; messages sent meanwhile wait in a bounded buffer
+        # and are replayed in order once the connection is back.
+        self.reconnect = os.getenv("CLIENT_RECONNECT", "1") != "0"
+        self.backoff_base = float(os.getenv("CLIENT_BACKOFF_BASE", RECONNECT_BACKOFF_BASE))
+        self.backoff_max = float(os.getenv("CLIENT_BACKOFF_MAX", RECONNECT_BACKOFF_MAX))
+        outbound_size = int(os.getenv("CLIENT_OUTBOUND_BUFFER_SIZE", DEFAULT_OUTBOUND_BUFFER_SIZE))
+        self.outbound = deque(maxlen=outbound_size)
+        self.send_lock = threading.Lock()
+        
+        # Ask the server for the compact binary encoding; messages stay text
+        # until it accepts (an older server simply never answers)
+        self.request_binary = os.getenv("CLIENT_BINARY", "0") != "0" if binary is None else binary
+        self.binary = False
+        
+        # Room to join on every (re)connect; None stays in the server's
+        # default room
+        self.room = room or os.getenv("CLIENT_ROOM") or None
+        
+        # Stream raw key-down/key-up times and let the server's adaptive
+        # keyer decode them, instead of sending finished Morse
+        self.raw_keying = os.getenv("CLIENT_RAW_KEYING", "0") != "0" if raw_keying is None else raw_keying
+        self.keying_epoch = time.monotonic()
+        
+        # Take broadcasts from the server's multicast group (when it has
+        # one) instead of one TCP send per client
+        self.request_multicast = os.getenv("CLIENT_MULTICAST", "0") != "0" if multicast is None else multicast
+        self.subscriber = None
+        
+        # Messages received from the server, waiting to be picked up by the GUI.
+        # Bounded so a flood of broadcasts can't grow memory; the oldest
+        # messages are dropped first and counted in the receive stats.
+        inbox_size = int(os.getenv("CLIENT_INBOX_SIZE", DEFAULT_INBOX_SIZE))
+        self.inbox = deque(maxlen=inbox_size)
+        self.inbox_lock = threading.Lock()
+        self.post_event = None
+        self.receiver_thread = None
+        self.stats = {'received': 0, 'bytes_received': 0, 'dropped': 0, 'inbox_high_water': 0,
+                      'reconnects': 0, 'buffered': 0, 'replayed': 0, 'send_dropped': 0}
         
     def get_connection_details(self):
         # Check if .env values exist
         env_ip = os.getenv("SERVER_IP")
         env_port = os.getenv("SERVER_PORT")
         
+        import tkinter as tk
+        from tkinter import messagebox
         root = tk.Tk()
         root.withdraw()  # Hide the main window
         
@@ -38,73 +153,466 @@ class MorseClient:
                 self.SERVER_PORT = int(env_port)
             else:
                 # User wants to enter new values
-                self.get_user_input_for_connection()
+                self.get_user_input_for_connection(root)
         else:
             # No .env file or missing values, ask user to input
-            self.get_user_input_for_connection()
+            self.get_user_input_for_connection(root)
             
         root.destroy()
     
-    def get_user_input_for_connection(self):
-        root = tk.Tk()
-        root.withdraw()  # Hide the main window
+    def get_user_input_for_connection(self, root):
+        # Dialogs share the hidden root created by get_connection_details
+        from tkinter import messagebox, simpledialog
         
         # Get IP address
         self.SERVER_IP = simpledialog.askstring(
             "Server IP", 
             "Enter the server IP address:",
-            initialvalue="127.0.0.1"
+            initialvalue=DEFAULT_SERVER_IP,
+            parent=root
         )
         if not self.SERVER_IP:
-            self.SERVER_IP = "127.0.0.1"  # Default if canceled
+            self.SERVER_IP = DEFAULT_SERVER_IP  # Default if canceled
             
         # Get port
         port_str = simpledialog.askstring(
             "Server Port", 
             "Enter the server port number:",
-            initialvalue="5000"
+            initialvalue=str(DEFAULT_SERVER_PORT),
+            parent=root
         )
         try:
-            self.SERVER_PORT = int(port_str) if port_str else 5000
+            self.SERVER_PORT = int(port_str) if port_str else DEFAULT_SERVER_PORT
         except ValueError:
-            messagebox.showwarning("Invalid Port", "Invalid port number. Using default port 5000.")
-            self.SERVER_PORT = 5000
+            messagebox.showwarning("Invalid Port", "Invalid port number. Using default port 5000.", parent=root)
+            self.SERVER_PORT = DEFAULT_SERVER_PORT
             
     def connect(self):
+        # A socket can't be reused after a failed or closed connection, so
+        # every attempt starts from a fresh one
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
-            self.client_socket.connect((self.SERVER_IP, self.SERVER_PORT))
-            self.client_ip = self.get_client_ip()
-            self.connection_status = "Connected"
-            return True
+            tune_socket(sock)
+            sock.connect((self.SERVER_IP, self.SERVER_PORT))
         except Exception as e:
+            sock.close()
             self.connection_status = f"Error: {str(e)}"
             print(f"Connection error: {e}")
             return False
+            
+        with self.send_lock:
+            old_socket, self.client_socket = self.client_socket, sock
+            if old_socket is not None:
+                old_socket.close()
+            self.client_ip = self.get_client_ip()
+            self.connected = True
+            self.connection_status = "Connected"
+            self.binary = False
+            if self.request_binary:
+                try:
+                    send_frame(sock, BINARY_HELLO)
+                except OSError:
+                    pass
+            if self.room:
+                try:
+                    send_frame(sock, join_frame_payload(self.room))
+                except OSError:
+                    pass
+            if self.request_multicast:
+                try:
+                    send_frame(sock, MULTICAST_SUBSCRIBE)
+                except OSError:
+                    pass
+            self.replay_outbound()
+        return True
         
     def get_client_ip(self):
         return self.client_socket.getsockname()[0]
         
+    def join_room(self, room):
+        """Move to another room; remembered so a reconnect rejoins it."""
+        self.room = room
+        self.send_control(join_frame_payload(room))
+        
+    def send_control(self, payload):
+        """Send a control frame now; returns False when not connected (nothing is buffered)."""
+        with self.send_lock:
+            if not self.connected:
+                return False
+            try:
+                send_frame(self.client_socket, payload)
+                return True
+            except OSError as e:
+                self.connection_status = f"Send Error: {str(e)}"
+                self.mark_disconnected()
+                return False
+                
+    def send_key_events(self, events):
+        """Stream raw (kind, time.monotonic()) key events to the server's keyer."""
+        return self.send_control(pack_events((kind, timestamp - self.keying_epoch)
+                                             for kind, timestamp in events))
+        
+    def end_keyed_message(self, send=True):
+        """Have the server send (or with send=False, discard) the keyed message."""
+        return self.send_control(KEYING_END if send else KEYING_RESET)
+        
     def send_message(self, morse_code):
-        try:
-            message = f"{morse_code}"
-            self.client_socket.send(message.encode('utf-8'))
+        """Send a message, or buffer it for replay while the connection is down.
+        
+        Only the receiver thread reconnects and replays the buffer, so
+        without one a dropped connection is retried once right here and
+        nothing is buffered. Returns False only when the message could
+        not be sent or buffered.
+        """
+        if not self.connected and not self.receiving and self.reconnect and not self.closing.is_set():
+            self.connect()
+        with self.send_lock:
+            if self.connected:
+                try:
+                    send_frame(self.client_socket, encode_message(morse_code, self.binary))
+                    return True
+                except Exception as e:
+                    self.connection_status = f"Send Error: {str(e)}"
+                    print(f"Send error: {e}")
+                    self.mark_disconnected()
+            if not self.reconnect or self.closing.is_set() or not self.receiving:
+                return False
+            if len(self.outbound) == self.outbound.maxlen:
+                self.stats['send_dropped'] += 1
+            self.outbound.append(morse_code)
+            self.stats['buffered'] += 1
             return True
-        except Exception as e:
-            self.connection_status = f"Send Error: {str(e)}"
-            print(f"Send error: {e}")
-            return False
+            
+    def replay_outbound(self):
+        # Called with send_lock held, right after connecting
+        while self.outbound:
+            try:
+                send_frame(self.client_socket, encode_message(self.outbound[0], self.binary))
+            except OSError as e:
+                self.connection_status = f"Send Error: {str(e)}"
+                self.mark_disconnected()
+                return
+            self.outbound.popleft()
+            self.stats['replayed'] += 1
+            
+    def mark_disconnected(self):
+        self.connected = False
+        try:
+            # Wakes the receiver thread, which takes care of reconnecting
+            self.client_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        
+    def start_receiving(self, post_event=None):
+        """Start the background thread that drains broadcasts from the server.
+
+        post_event is called with a 'messages_available' event whenever the
+        inbox goes from empty to non-empty; the receiver then calls
+        drain_messages() to collect everything that arrived.
+        """
+        self.post_event = post_event
+        self.receiver_thread = threading.Thread(target=self.receive_loop, daemon=True)
+        self.receiver_thread.start()
+        
+    @property
+    def receiving(self):
+        """Whether a receiver thread is running (and will reconnect after a drop)."""
+        return self.receiver_thread is not None and self.receiver_thread.is_alive()
+        
+    def receive_loop(self):
+        while True:
+            self.receive_until_disconnected(self.client_socket)
+            self.connected = False
+            if self.closing.is_set() or not self.reconnect or not self.reconnect_with_backoff():
+                break
+        
+        if not self.closing.is_set() and self.post_event:
+            self.post_event({'type': 'set_status', 'text': self.connection_status})
+            
+    def receive_until_disconnected(self, sock):
+        decoder = FrameDecoder()
+        while True:
+            try:
+                data = sock.recv(RECV_BUFFER_SIZE)
+                if not data:
+                    self.connection_status = "Disconnected by server"
+                    break
+                self.stats['bytes_received'] += len(data)
+                for payload in decoder.feed(data):
+                    if is_control(payload):
+                        self.handle_control(payload)
+                    else:
+                        self.deliver(payload.decode('utf-8', errors='replace'))
+            except Exception as e:
+                if not self.closing.is_set():
+                    self.connection_status = f"Receive Error: {str(e)}"
+                    print(f"Receive error: {e}")
+                break
+                
+    def handle_control(self, payload):
+        if payload == BINARY_ACCEPT:
+            self.binary = True
+        elif payload.startswith(JOINED_PREFIX):
+            self.room = payload[len(JOINED_PREFIX):].decode("utf-8", errors="replace")
+            self.set_status(f"Connected to {self.SERVER_IP}:{self.SERVER_PORT} - room {self.room}")
+        elif payload.startswith(REPLAY_PREFIX):
+            replayed = parse_replay(payload)
+            if replayed is not None and replayed[0] == (self.room or DEFAULT_ROOM):
+                self.deliver(replayed[1])
+        elif payload.startswith(MULTICAST_ACCEPT):
+            self.start_multicast(payload)
+        elif payload.startswith(MULTICAST_RETRANSMIT):
+            if self.subscriber is not None:
+                self.subscriber.handle_datagram(payload[len(MULTICAST_RETRANSMIT):])
+        elif payload.startswith(MULTICAST_LOST):
+            lost = parse_range(payload[len(MULTICAST_LOST):])
+            if self.subscriber is not None and lost is not None:
+                self.subscriber.skip(*lost)
+                
+    def start_multicast(self, payload):
+        """Join the group the server announced; falls back to TCP if that fails."""
+        accepted = parse_accept(payload)
+        if accepted is None:
+            return
+        group, port, member, stream, next_sequence = accepted
+        if self.subscriber is not None:
+            self.subscriber.resubscribe(member, stream, next_sequence)
+            return
+        try:
+            # Receive on the interface that reaches the server
+            self.subscriber = self.subscriber_class(group, port, member, stream, next_sequence,
+                                                    self.deliver_multicast, self.send_nack,
+                                                    interface=self.client_ip).start()
+        except OSError as e:
+            print(f"Multicast error: {e}")
+            self.send_control(MULTICAST_UNSUBSCRIBE)
+            
+    def deliver_multicast(self, room, message):
+        if room == (self.room or DEFAULT_ROOM):
+            self.deliver(message)
+            
+    def send_nack(self, first, last):
+        self.send_control(nack_payload(first, last))
+            
+    def reconnect_with_backoff(self):
+        """Retry until connected (True) or the client is closed (False)."""
+        for attempt, delay in enumerate(backoff_delays(self.backoff_base, self.backoff_max), 1):
+            self.set_status(f"{self.connection_status} - reconnecting in {delay:.1f}s (attempt {attempt})")
+            if self.closing.wait(delay):
+                return False
+            if self.connect():
+                self.stats['reconnects'] += 1
+                self.set_status(f"Reconnected to {self.SERVER_IP}:{self.SERVER_PORT}")
+                return True
+                
+    def set_status(self, text):
+        self.connection_status = text
+        if self.post_event:
+            self.post_event({'type': 'set_status', 'text': text})
+            
+    def deliver(self, message):
+        with self.inbox_lock:
+            was_empty = not self.inbox
+            if len(self.inbox) == self.inbox.maxlen:
+                self.stats['dropped'] += 1
+            self.inbox.append(message)
+            self.stats['received'] += 1
+            self.stats['inbox_high_water'] = max(self.stats['inbox_high_water'], len(self.inbox))
+            
+        # Only wake the receiver once per batch; it drains everything at once
+        if was_empty and self.post_event:
+            self.post_event({'type': 'messages_available'})
+            
+    def drain_messages(self):
+        """Return and clear every message received since the last call."""
+        with self.inbox_lock:
+            messages = list(self.inbox)
+            self.inbox.clear()
+        return messages
+        
+    def receive_stats(self):
+        """Counters describing the receive path and its backpressure."""
+        with self.inbox_lock:
+            stats = dict(self.stats)
+            stats['inbox_depth'] = len(self.inbox)
+        if self.subscriber is not None:
+            stats['multicast'] = self.subscriber.stats()
+        return stats
         
     def close(self):
         try:
-            self.client_socket.close()
+            self.closing.set()
+            self.connected = False
+            if self.subscriber is not None:
+                self.subscriber.close()
+            if self.client_socket is not None:
+                try:
+                    # Wake the receiver thread blocked in recv
+                    self.client_socket.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                self.client_socket.close()
             self.connection_status = "Disconnected"
         except Exception as e:
             print(f"Close error: {e}")
 
-# Main application entry point
-if __name__ == "__main__":
-    # Create client
-    client = MorseClient()
+class ConnectionPool:
+    """A fixed set of MorseClient connections shared by many logical operators.
+    
+    Relay processes that multiplex operators spread their traffic over the
+    pool. A key (e.g. an operator id) always maps to the same connection,
+    so each operator's messages stay in order; every connection reconnects
+    and replays on its own. Broadcasts are collected from the first
+    connection only, and include messages sent on the other members.
+    """
+    def __init__(self, size, host=None, port=None):
+        self.clients = [MorseClient(host, port) for _ in range(size)]
+        self.next_index = 0
+        
+    def connect(self):
+        """Connect every member; returns how many connected."""
+        return sum(client.connect() for client in self.clients)
+        
+    def start_receiving(self, post_event=None):
+        # Every member needs its receiver thread to notice drops and reconnect
+        for index, client in enumerate(self.clients):
+            client.start_receiving(post_event if index == 0 else None)
+            
+    def client_for(self, key=None):
+        if key is None:
+            self.next_index = (self.next_index + 1) % len(self.clients)
+            return self.clients[self.next_index]
+        # crc32 rather than hash() so the mapping is stable across processes
+        return self.clients[zlib.crc32(str(key).encode('utf-8')) % len(self.clients)]
+        
+    def send_message(self, morse_code, key=None):
+        return self.client_for(key).send_message(morse_code)
+        
+    def drain_messages(self):
+        return self.clients[0].drain_messages()
+        
+    def stats(self):
+        return [client.receive_stats() for client in self.clients]
+        
+    def close(self):
+        for client in self.clients:
+            client.close()
+
+class AsyncMorseClient:
+    """asyncio client for scripts and headless relays: no threads and no Tk.
+
+        async with AsyncMorseClient(host, port) as client:
+            await client.send("... --- ...")
+            async for message in client:
+                print(message)
+    """
+    def __init__(self, host=None, port=None, binary=False, room=None):
+        self.SERVER_IP, self.SERVER_PORT = resolve_connection(host, port)
+        self.request_binary = binary
+        self.binary = False
+        self.room = room
+        self.reader = None
+        self.writer = None
+        self.client_ip = None
+        self.connection_status = "Disconnected"
+        
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.SERVER_IP, self.SERVER_PORT)
+        tune_socket(self.writer.get_extra_info("socket"))
+        if self.request_binary:
+            self.writer.write(encode_frame(BINARY_HELLO))
+        if self.room:
+            self.writer.write(encode_frame(join_frame_payload(self.room)))
+        self.client_ip = self.writer.get_extra_info("sockname")[0]
+        self.connection_status = "Connected"
+        
+    async def join(self, room):
+        self.room = room
+        self.writer.write(encode_frame(join_frame_payload(room)))
+        await self.writer.drain()
+        
+    async def send(self, morse_code):
+        self.writer.write(encode_frame(encode_message(morse_code, self.binary)))
+        await self.writer.drain()
+        
+    async def receive(self):
+        """Wait for the next broadcast; None once the server closes the connection."""
+        while True:
+            payload = await read_frame(self.reader)
+            if payload is None:
+                self.connection_status = "Disconnected by server"
+                return None
+            if not is_control(payload):
+                return payload.decode("utf-8", errors="replace")
+            if payload == BINARY_ACCEPT:
+                self.binary = True
+            elif payload.startswith(JOINED_PREFIX):
+                self.room = payload[len(JOINED_PREFIX):].decode("utf-8", errors="replace")
+            elif payload.startswith(REPLAY_PREFIX):
+                replayed = parse_replay(payload)
+                if replayed is not None and replayed[0] == (self.room or DEFAULT_ROOM):
+                    return replayed[1]
+        
+    def __aiter__(self):
+        return self
+        
+    async def __anext__(self):
+        message = await self.receive()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+        
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.connection_status = "Disconnected"
+        
+    async def __aenter__(self):
+        await self.connect()
+        return self
+        
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+async def print_messages(client):
+    async for message in client:
+        print(message, flush=True)
+
+async def run_headless(host, port, messages, text=False, listen=False, binary=False, room=None):
+    """Send messages (or stdin lines) and print every broadcast received."""
+    from morse_dict import text_to_morse
+    started = time.perf_counter()
+    async with AsyncMorseClient(host, port, binary, room) as client:
+        print(f"Connected to {client.SERVER_IP}:{client.SERVER_PORT} in "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+        receiver = asyncio.create_task(print_messages(client))
+        encode = text_to_morse if text else str
+        for message in messages:
+            await client.send(encode(message))
+        if not messages:
+            # One message per stdin line until EOF
+            loop = asyncio.get_running_loop()
+            while True:
+                line = await loop.run_in_executor(None, sys.stdin.readline)
+                if not line:
+                    break
+                if line.strip():
+                    await client.send(encode(line.strip()))
+        if listen:
+            await receiver
+        receiver.cancel()
+
+def run_gui(host=None, port=None):
+    import tkinter as tk
+    from tkinter import messagebox
+    from gui import MorseGUI
+    
+    # Create client; prompt for the server unless it was given on the command line
+    client = MorseClient(host, port, interactive=not (host or port))
     
     # Application setup
     root = tk.Tk()
@@ -120,6 +628,7 @@ if __name__ == "__main__":
     if client.connect():
         # Create GUI and show connection details
         app = MorseGUI(root, client)
+        client.start_receiving(app.post_event)
         messagebox.showinfo("Connection Successful", 
                            f"Connected to server at {client.SERVER_IP}:{client.SERVER_PORT}")
         
@@ -137,4 +646,32 @@ if __name__ == "__main__":
     else:
         messagebox.showerror("Connection Error", 
                            f"Failed to connect to server at {client.SERVER_IP}:{client.SERVER_PORT}\n\n{client.connection_status}")
-        root.destroy()
\ No newline at end of file
+        root.destroy()
+
+# Main application entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Morse code chat client")
+    parser.add_argument("--host", help="server IP (default: SERVER_IP from .env)")
+    parser.add_argument("--port", type=int, help="server port (default: SERVER_PORT from .env)")
+    parser.add_argument("--headless", action="store_true", help="run without the GUI")
+    parser.add_argument("--send", action="append", default=[], metavar="MESSAGE",
+                        help="headless: message to send (repeatable); otherwise stdin lines are sent")
+    parser.add_argument("--text", action="store_true", help="headless: messages are plain text to encode as Morse")
+    parser.add_argument("--binary", action="store_true",
+                        help="headless: use the compact binary encoding if the server supports it")
+    parser.add_argument("--room", help="headless: room to join instead of the server's default room")
+    parser.add_argument("--listen", action="store_true",
+                        help="headless: keep printing broadcasts after sending, until the server disconnects")
+    args = parser.parse_args()
+    
+    if args.headless:
+        try:
+            asyncio.run(run_headless(args.host, args.port, args.send, args.text, args.listen, args.binary,
+                                     args.room))
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            print(f"Connection error: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        run_gui(args.host, args.port)
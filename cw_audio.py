@@ -0,0 +1,401 @@
+"""Decoding CW (Morse tone) audio from PCM or WAV recordings.
+
+The decoder streams: samples arrive in chunks (read through mmap for
+files, so a recording is never loaded whole), and every chunk is
+processed with a few vectorized NumPy operations:
+
+1. Envelope: the chunk is cut into short blocks and the tone's amplitude
+   in each block is one DFT bin, i.e. what a Goertzel filter computes,
+   done for all blocks at once as a matrix product with a cosine and a
+   sine, then smoothed over three blocks.
+2. Threshold: a two-means split of the chunk's amplitudes gives the noise
+   and tone levels, which are tracked across chunks; blocks are compared
+   with the level halfway between them, with hysteresis.
+3. Runs: the on/off changes are found by comparing neighbouring blocks
+   and passed as key-down and key-up times to keying.AdaptiveKeyer, which
+   follows the sender's speed and yields dots, dashes and letter and word
+   gaps.
+
+The symbols feed MorseDecoder as they come, so the translation is the
+same as morse_to_text would give for the decoded Morse. NumPy is only
+needed for this module. The tone synthesizer writes test recordings
+from text:
+
+    python cw_audio.py synth "CQ CQ DE W1AW" cq.wav --wpm 25 --noise 0.3
+    python cw_audio.py decode cq.wav
+"""
+import argparse
+import mmap
+import struct
+import sys
+import time
+import wave
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from keying import INITIAL_WPM, PARIS_UNIT, AdaptiveKeyer
+from morse_dict import MorseDecoder, text_to_morse
+
+DEFAULT_SAMPLE_RATE = 8000
+DEFAULT_TONE_FREQUENCY = 700
+DEFAULT_BLOCK_MS = 5
+DEFAULT_CHUNK_SECONDS = 1.0
+# Tone frequencies searched when none is given, and how much audio to search
+SEARCH_BAND = (300, 1500)
+TONE_SEARCH_SECONDS = 2.0
+HYSTERESIS = 0.1
+# How far the tracked tone level moves toward each chunk's, so the
+# threshold follows a fading signal
+LEVEL_RATE = 0.5
+# Per-second growth allowed for the tracked noise level
+NOISE_RISE = 2.0
+# Loud blocks must be this much above the noise to count as tone; noise
+# alone splits into two groups less than 2x apart
+MIN_SNR = 2.2
+SPLIT_ITERATIONS = 4
+RAMP_MS = 4
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("CW audio decoding needs NumPy (pip install numpy)")
+
+
+class WavFormat:
+    """Where the PCM samples of a WAV file are and how they are stored."""
+
+    def __init__(self, sample_rate, channels, sample_width, data_offset, data_size):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    @property
+    def frames(self):
+        return self.data_size // (self.channels * self.sample_width)
+
+
+def read_wav_format(data):
+    """Parse the RIFF chunks of a mapped WAV file without copying its samples."""
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError("Not a WAV file")
+    position = 12
+    fmt = None
+    while position + 8 <= len(data):
+        chunk_id = data[position:position + 4]
+        size, = struct.unpack_from('<I', data, position + 4)
+        body = position + 8
+        if chunk_id == b'fmt ':
+            audio_format, channels, sample_rate = struct.unpack_from('<HHI', data, body)
+            sample_width = struct.unpack_from('<H', data, body + 14)[0] // 8
+            if audio_format not in (1, 0xFFFE) or sample_width not in (1, 2):
+                raise ValueError("Only 8 and 16-bit PCM WAV files are supported")
+            fmt = (sample_rate, channels, sample_width)
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk before its format chunk")
+            # Some writers leave the size at 0 or 0xFFFFFFFF while streaming
+            size = min(size, len(data) - body) or len(data) - body
+            return WavFormat(*fmt, body, size)
+        position = body + size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def pcm_chunks(samples, sample_width, channels, chunk_frames):
+    """Float chunks of the first channel of raw PCM (bytes, mmap or memoryview)."""
+    require_numpy()
+    dtype = np.dtype('<i2') if sample_width == 2 else np.dtype(np.uint8)
+    # A view over the mapped bytes; only the current chunk is converted
+    pcm = np.frombuffer(samples, dtype=dtype, count=len(samples) // dtype.itemsize)
+    pcm = pcm[:len(pcm) - len(pcm) % channels].reshape(-1, channels)[:, 0]
+    for start in range(0, len(pcm), chunk_frames):
+        chunk = pcm[start:start + chunk_frames].astype(np.float32)
+        if sample_width == 1:
+            chunk -= 128
+        yield chunk
+
+
+def wav_chunks(path, chunk_seconds=DEFAULT_CHUNK_SECONDS):
+    """(sample rate, iterator of float chunks) for a WAV file, read through mmap."""
+    f = open(path, 'rb')
+    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    fmt = read_wav_format(data)
+
+    def chunks():
+        try:
+            view = memoryview(data)[fmt.data_offset:fmt.data_offset + fmt.data_size]
+            yield from pcm_chunks(view, fmt.sample_width, fmt.channels,
+                                  max(int(fmt.sample_rate * chunk_seconds), 1))
+        finally:
+            # The numpy views must be gone before the map can close
+            view = None
+            data.close()
+            f.close()
+
+    return fmt.sample_rate, chunks()
+
+
+def raw_chunks(path, sample_rate, sample_width=2, channels=1, chunk_seconds=DEFAULT_CHUNK_SECONDS):
+    """(sample rate, iterator of float chunks) for a headerless little-endian PCM file."""
+    f = open(path, 'rb')
+    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def chunks():
+        try:
+            yield from pcm_chunks(data, sample_width, channels, max(int(sample_rate * chunk_seconds), 1))
+        finally:
+            data.close()
+            f.close()
+
+    return sample_rate, chunks()
+
+
+def find_tone(samples, sample_rate, band=SEARCH_BAND):
+    """Frequency of the strongest spectral peak within band."""
+    require_numpy()
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples))))
+    frequencies = np.fft.rfftfreq(len(samples), 1 / sample_rate)
+    in_band = (frequencies >= band[0]) & (frequencies <= band[1])
+    return float(frequencies[in_band][np.argmax(spectrum[in_band])])
+
+
+class CWDecoder:
+    """Streaming tone-to-Morse decoder; feed() float sample chunks of any size."""
+
+    def __init__(self, sample_rate, frequency=None, block_ms=DEFAULT_BLOCK_MS, wpm=INITIAL_WPM):
+        require_numpy()
+        self.sample_rate = sample_rate
+        self.block = max(int(sample_rate * block_ms / 1000), 1)
+        self.block_seconds = self.block / sample_rate
+        self.frequency = None
+        self.basis = None
+        if frequency:
+            self.set_frequency(frequency)
+        self.keyer = AdaptiveKeyer(wpm)
+        self.decoder = MorseDecoder()
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.blocks_seen = 0
+        self.level = None
+        self.noise = None
+        self.on = False
+        self.carry = np.zeros(2, dtype=np.float32)
+        self.samples = 0
+
+    def set_frequency(self, frequency):
+        self.frequency = frequency
+        phase = 2 * np.pi * frequency * np.arange(self.block) / self.sample_rate
+        self.basis = np.stack([np.cos(phase), np.sin(phase)], axis=1).astype(np.float32)
+
+    def envelope(self, samples):
+        """Tone amplitude of every whole block in samples (one DFT bin per block)."""
+        blocks = samples[:len(samples) - len(samples) % self.block].reshape(-1, self.block)
+        projected = blocks @ self.basis
+        return np.sqrt(np.einsum('ij,ij->i', projected, projected))
+
+    def feed(self, samples):
+        """Decode a chunk; returns the Morse symbols it completed."""
+        self.samples += len(samples)
+        if len(self.pending):
+            samples = np.concatenate([self.pending, samples])
+        if self.basis is None:
+            if len(samples) < self.sample_rate * TONE_SEARCH_SECONDS:
+                self.pending = samples
+                return ''
+            self.set_frequency(find_tone(samples, self.sample_rate))
+        usable = len(samples) - len(samples) % self.block
+        self.pending = samples[usable:]
+        if not usable:
+            return ''
+        return self.threshold_runs(self.envelope(samples[:usable]))
+
+    def threshold_runs(self, amplitude):
+        """Key events for the on/off changes in a chunk of block amplitudes."""
+        # A moving average over three blocks steadies the noise; it delays
+        # every edge by one block, which no duration notices
+        padded = np.concatenate([self.carry, amplitude])
+        self.carry = padded[-2:]
+        amplitude = (padded[:-2] + padded[1:-1] + padded[2:]) / 3
+        noise, tone = self.split_levels(amplitude)
+        if self.noise is None:
+            self.noise = noise
+        # The noise level drops at once but rises slowly, since a slow
+        # sender can fill a chunk with tone
+        seconds = len(amplitude) * self.block_seconds
+        self.noise = min(self.noise * NOISE_RISE ** seconds, noise)
+        if tone > self.noise * MIN_SNR:
+            self.level = tone if self.level is None else self.level + LEVEL_RATE * (tone - self.level)
+        if self.level is None:
+            # No tone has stood out from the noise yet
+            above = np.zeros(len(amplitude), dtype=bool)
+        else:
+            # Between the two hysteresis levels a block keeps the state of
+            # the last block outside them (a vectorized forward fill)
+            threshold = (self.noise + self.level) / 2
+            high = amplitude > threshold * (1 + HYSTERESIS)
+            low = amplitude > threshold * (1 - HYSTERESIS)
+            last_decided = np.where(high | ~low, np.arange(len(amplitude)), -1)
+            np.maximum.accumulate(last_decided, out=last_decided)
+            above = np.where(last_decided >= 0, high[last_decided], self.on)
+        states = np.concatenate([[self.on], above])
+        changes = np.flatnonzero(states[1:] != states[:-1])
+        first_block = self.blocks_seen
+        self.blocks_seen += len(amplitude)
+        symbols = []
+        for index in changes.tolist():
+            timestamp = (first_block + index) * self.block_seconds
+            self.on = not self.on
+            symbols.append(self.keyer.key_down(timestamp) if self.on else self.keyer.key_up(timestamp))
+        symbols = ''.join(symbols)
+        self.decoder.feed_many(symbols)
+        return symbols
+
+    def split_levels(self, amplitude):
+        """Mean amplitudes of the quiet and loud blocks of a chunk (two-means clustering)."""
+        threshold = float(np.median(amplitude))
+        for _ in range(SPLIT_ITERATIONS):
+            loud = amplitude > threshold
+            if loud.all() or not loud.any():
+                break
+            quiet_mean = float(amplitude[~loud].mean())
+            loud_mean = float(amplitude[loud].mean())
+            threshold = (quiet_mean + loud_mean) / 2
+        else:
+            return quiet_mean, loud_mean
+        value = float(amplitude.mean())
+        return value, value
+
+    def flush(self):
+        """Finish the message: a tone still sounding ends now."""
+        symbols = ''
+        if self.basis is None and len(self.pending) >= self.block:
+            # The recording ended before TONE_SEARCH_SECONDS of audio came in
+            self.set_frequency(find_tone(self.pending, self.sample_rate))
+            usable = len(self.pending) - len(self.pending) % self.block
+            samples, self.pending = self.pending[:usable], self.pending[usable:]
+            symbols = self.threshold_runs(self.envelope(samples))
+        if self.on:
+            last = self.keyer.key_up(self.blocks_seen * self.block_seconds)
+            self.on = False
+            self.decoder.feed_many(last)
+            symbols += last
+        held = self.keyer.end_message()
+        self.decoder.feed_many(held)
+        return symbols + held
+
+    @property
+    def text(self):
+        return self.decoder.text
+
+    @property
+    def seconds(self):
+        return self.samples / self.sample_rate
+
+
+def tone_samples(units, unit_seconds, frequency, sample_rate, volume=0.5):
+    """A tone lasting `units` Morse units, with short ramps against clicks."""
+    count = int(units * unit_seconds * sample_rate)
+    ramp = min(int(sample_rate * RAMP_MS / 1000), count // 2) or 1
+    envelope = np.ones(count, dtype=np.float32)
+    envelope[:ramp] = np.linspace(0, 1, ramp)
+    envelope[count - ramp:] = np.linspace(1, 0, ramp)
+    return volume * envelope * np.sin(2 * np.pi * frequency * np.arange(count) / sample_rate)
+
+
+def synthesize(text, path, wpm=20, frequency=DEFAULT_TONE_FREQUENCY, sample_rate=DEFAULT_SAMPLE_RATE,
+               noise=0.0, seed=1, chunk_seconds=DEFAULT_CHUNK_SECONDS):
+    """Write text as a 16-bit mono CW recording with optional white noise; returns its length in seconds.
+
+    Samples are written a chunk at a time, so long recordings never sit in memory.
+    """
+    require_numpy()
+    unit = PARIS_UNIT / wpm
+    # Every mark is followed by the one-unit element gap, so the letter and
+    # word separators only add the rest of their 3 and 7 units
+    gap = np.zeros(int(unit * sample_rate))
+    parts = {
+        '.': np.concatenate([tone_samples(1, unit, frequency, sample_rate), gap]),
+        '-': np.concatenate([tone_samples(3, unit, frequency, sample_rate), gap]),
+        ' ': np.zeros(int(2 * unit * sample_rate)),
+        '/': np.zeros(int(6 * unit * sample_rate)),
+    }
+    rng = np.random.default_rng(seed)
+    limit = int(chunk_seconds * sample_rate)
+    frames = 0
+
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+
+        def write(pieces):
+            nonlocal frames
+            samples = np.concatenate(pieces)
+            if noise:
+                samples = samples + rng.normal(0, noise, len(samples))
+            wav.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+            frames += len(samples)
+
+        pieces = [parts['/']]
+        buffered = 0
+        for symbol in text_to_morse(text).replace(' / ', '/'):
+            pieces.append(parts.get(symbol, parts['/']))
+            buffered += len(pieces[-1])
+            if buffered >= limit:
+                write(pieces)
+                pieces, buffered = [], 0
+        pieces.append(parts['/'])
+        write(pieces)
+    return frames / sample_rate
+
+
+def decode_chunks(sample_rate, chunks, frequency=None, wpm=INITIAL_WPM):
+    """Decode an iterable of sample chunks; returns the finished CWDecoder."""
+    decoder = CWDecoder(sample_rate, frequency, wpm=wpm)
+    for chunk in chunks:
+        decoder.feed(chunk)
+    decoder.flush()
+    return decoder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode CW audio recordings or synthesize test ones.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    synth = commands.add_parser('synth', help='write text as a CW tone recording')
+    synth.add_argument('text')
+    synth.add_argument('output')
+    synth.add_argument('--wpm', type=float, default=20)
+    synth.add_argument('--frequency', type=float, default=DEFAULT_TONE_FREQUENCY)
+    synth.add_argument('--rate', type=int, default=DEFAULT_SAMPLE_RATE)
+    synth.add_argument('--noise', type=float, default=0.0, help='white noise level (full scale = 1)')
+    decode = commands.add_parser('decode', help='decode a WAV (or raw PCM) recording')
+    decode.add_argument('input')
+    decode.add_argument('--frequency', type=float, help='tone frequency (found automatically if omitted)')
+    decode.add_argument('--wpm', type=float, default=INITIAL_WPM, help='initial speed guess')
+    decode.add_argument('--raw', action='store_true', help='headerless 16-bit little-endian mono PCM')
+    decode.add_argument('--rate', type=int, default=DEFAULT_SAMPLE_RATE, help='sample rate of --raw input')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'synth':
+            seconds = synthesize(args.text, args.output, args.wpm, args.frequency, args.rate, args.noise)
+            print(f"Wrote {seconds:.1f} s to {args.output}")
+            return
+        start = time.perf_counter()
+        sample_rate, chunks = raw_chunks(args.input, args.rate) if args.raw else wav_chunks(args.input)
+        decoder = decode_chunks(sample_rate, chunks, args.frequency, args.wpm)
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    print(decoder.text)
+    tone = f"{decoder.frequency:.0f} Hz" if decoder.frequency else "no tone found"
+    print(f"{decoder.seconds:.1f} s of audio ({tone}), about {decoder.keyer.wpm:.0f} WPM, "
+          f"decoded in {elapsed:.2f} s ({decoder.seconds / elapsed:.0f}x realtime)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
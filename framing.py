@@ -0,0 +1,207 @@
+"""Length-prefixed message framing for the client/server wire protocol.
+
+Every message is sent as a 4-byte big-endian payload length followed by
+the UTF-8 encoded payload, so message boundaries survive TCP coalescing
+and splitting of reads.
+
+FrameDecoder takes chunks that were already read. ReceiveBuffer reads
+straight into one preallocated bytearray with recv_into() and hands out
+memoryview slices of the completed payloads, so a read allocates nothing
+but the views; buffers come from a BufferPool and go back to it when the
+connection closes.
+"""
+import asyncio
+import struct
+import threading
+
+HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 1024 * 1024
+# Reads go into the free part of the buffer, which is compacted once less
+# than half of it is free, so every read has room for at least half of it
+DEFAULT_RECEIVE_BUFFER_SIZE = 8192
+DEFAULT_POOL_SIZE = 1024
+# A receive buffer grown past this for a large frame is swapped for a
+# normal one once the frame has been handled; smaller ones are kept
+MAX_RETAINED_BUFFER_SIZE = 64 * 1024
+
+
+class FrameError(ValueError):
+    """Raised when the peer sends a frame that violates the protocol."""
+
+
+def encode_frame(payload):
+    """Return the wire representation of a str or bytes payload."""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds limit of {MAX_FRAME_SIZE}")
+    return HEADER.pack(len(payload)) + payload
+
+
+def send_frame(sock, payload):
+    """Write a whole frame to a blocking socket, retrying partial writes."""
+    sock.sendall(encode_frame(payload))
+
+
+class FrameDecoder:
+    """Reassemble frames from an arbitrarily chunked byte stream."""
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes and return the list of completed payloads."""
+        buffer = self._buffer
+        buffer += data
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= HEADER.size:
+            (length,) = HEADER.unpack_from(buffer, offset)
+            if length > self.max_frame_size:
+                raise FrameError(f"Frame of {length} bytes exceeds limit of {self.max_frame_size}")
+            end = offset + HEADER.size + length
+            if end > len(buffer):
+                break
+            frames.append(bytes(buffer[offset + HEADER.size:end]))
+            offset = end
+        if offset:
+            del buffer[:offset]
+        return frames
+
+    def pending(self):
+        """Number of buffered bytes belonging to an incomplete frame."""
+        return len(self._buffer)
+
+
+async def read_frame(reader, max_frame_size=MAX_FRAME_SIZE):
+    """Read one payload from an asyncio StreamReader, or None on clean EOF."""
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise FrameError("Connection closed in the middle of a frame header")
+    (length,) = HEADER.unpack(header)
+    if length > max_frame_size:
+        raise FrameError(f"Frame of {length} bytes exceeds limit of {max_frame_size}")
+    return await reader.readexactly(length)
+
+
+class BufferPool:
+    """Recycles fixed-size receive buffers between connections."""
+
+    def __init__(self, buffer_size=DEFAULT_RECEIVE_BUFFER_SIZE, limit=DEFAULT_POOL_SIZE):
+        self.buffer_size = buffer_size
+        self.limit = limit
+        self.free = []
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self):
+        with self.lock:
+            if self.free:
+                self.reused += 1
+                return self.free.pop()
+            self.created += 1
+        return bytearray(self.buffer_size)
+
+    def release(self, buffer):
+        """Keep a buffer for the next connection; grown buffers are left to the GC."""
+        if len(buffer) != self.buffer_size:
+            return
+        with self.lock:
+            if len(self.free) < self.limit:
+                self.free.append(buffer)
+
+    def stats(self):
+        with self.lock:
+            return {'buffer_size': self.buffer_size, 'free': len(self.free),
+                    'created': self.created, 'reused': self.reused}
+
+
+class ReceiveBuffer:
+    """Reassembles frames inside one reusable bytearray filled with recv_into().
+
+    frames() returns memoryviews into the buffer, which are only valid
+    until the next recv_into(); callers copy or decode what they keep.
+    A frame larger than the buffer grows it (up to max_frame_size); past
+    MAX_RETAINED_BUFFER_SIZE only until that frame has been parsed.
+    """
+
+    def __init__(self, pool=None, size=DEFAULT_RECEIVE_BUFFER_SIZE, max_frame_size=MAX_FRAME_SIZE):
+        self.pool = pool
+        self.size = pool.buffer_size if pool is not None else size
+        self.max_frame_size = max_frame_size
+        self.buffer = pool.acquire() if pool is not None else bytearray(size)
+        self.view = memoryview(self.buffer)
+        # Parsed up to start, received up to end
+        self.start = 0
+        self.end = 0
+
+    def recv_into(self, sock):
+        """Read what the socket has into the free space; returns the byte count (0 on EOF)."""
+        if 2 * self.end > len(self.buffer):
+            self._make_room()
+        received = sock.recv_into(self.view[self.end:])
+        self.end += received
+        return received
+
+    def _make_room(self):
+        """Move the incomplete frame to the front, growing the buffer if it doesn't fit with a read."""
+        pending = self.end - self.start
+        needed = pending + self.size // 2
+        if pending >= HEADER.size:
+            (length,) = HEADER.unpack_from(self.buffer, self.start)
+            needed = max(needed, HEADER.size + length)
+        if needed > len(self.buffer):
+            buffer = bytearray(max(needed, 2 * len(self.buffer)))
+            buffer[:pending] = self.view[self.start:self.end]
+            self._replace(buffer)
+        else:
+            # memoryview assignment is a memmove, no temporary copy
+            self.view[:pending] = self.view[self.start:self.end]
+        self.start = 0
+        self.end = pending
+
+    def frames(self):
+        """memoryviews of the payloads completed by the data received so far."""
+        view = self.view
+        frames = []
+        offset = self.start
+        while self.end - offset >= HEADER.size:
+            (length,) = HEADER.unpack_from(view, offset)
+            if length > self.max_frame_size:
+                raise FrameError(f"Frame of {length} bytes exceeds limit of {self.max_frame_size}")
+            end = offset + HEADER.size + length
+            if end > self.end:
+                break
+            frames.append(view[offset + HEADER.size:end])
+            offset = end
+        if offset == self.end:
+            # Everything parsed: the next read starts at the front again
+            self.start = self.end = 0
+            if len(self.buffer) > MAX_RETAINED_BUFFER_SIZE:
+                self._replace(self.pool.acquire() if self.pool is not None else bytearray(self.size))
+        else:
+            self.start = offset
+        return frames
+
+    def pending(self):
+        """Number of buffered bytes belonging to an incomplete frame."""
+        return self.end - self.start
+
+    def _replace(self, buffer):
+        self.view.release()
+        if self.pool is not None:
+            self.pool.release(self.buffer)
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+
+    def release(self):
+        """Return the buffer to the pool; the ReceiveBuffer can't be used afterwards."""
+        self.view.release()
+        if self.pool is not None:
+            self.pool.release(self.buffer)
+        self.buffer = None
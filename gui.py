@@ -2,24 +2,45 @@ import tkinter as tk
 from tkinter import ttk, font
 import time
 import threading
-import winsound
 from pynput.mouse import Listener
 import keyboard
-from morse_dict import MORSE_CODE_DICT, morse_to_text
+from keying import KEY_DOWN, KEY_UP, WORD_BREAK, AdaptiveKeyer
+from morse_dict import MORSE_CODE_DICT, MorseDecoder
+from audio import AudioPlayer
 import queue
 
+MAX_RECEIVED_LINES = 100
+MORSE_EVENT = '<<MorseEvent>>'
+# Safety-net queue check; events normally wake the Tk loop immediately
+IDLE_POLL_MS = 1000
+FALLBACK_POLL_MS = 100
+
 class MorseGUI:
     def __init__(self, root, client=None):
         self.root = root
         self.morse_code = ""
+        self.decoder = MorseDecoder()
+        self.translation = self.decoder.text
         self.start_time = 0
         self.is_mouse_pressed = False
         
         # Use the provided client if available
         self.client = client
         
+        # In raw keying mode presses are classified by an adaptive keyer
+        # that follows the operator's speed (the server runs its own copy
+        # on the streamed timings) instead of a fixed 0.2 s threshold
+        self.raw_keying = bool(client and client.raw_keying)
+        self.keyer = AdaptiveKeyer()
+        
+        # Tones play on a background worker so they never block the UI loop
+        self.audio = AudioPlayer()
+        
         # Create a queue for thread-safe communication
         self.event_queue = queue.Queue()
+        self.wakeup_lock = threading.Lock()
+        self.wakeup_pending = False
+        self.poll_interval = IDLE_POLL_MS
         
         # Apply modern style
         self.style = ttk.Style()
@@ -35,15 +56,19 @@ class MorseGUI:
         # Configure GUI
         self.setup_gui()
         
+        # Producer threads wake the Tk loop through a virtual event
+        self.root.bind(MORSE_EVENT, lambda event: self.process_queue())
+        
         # Start threads
         self.mouse_thread = threading.Thread(target=self.start_mouse_listener, daemon=True)
         self.mouse_thread.start()
         
-        self.keyboard_thread = threading.Thread(target=self.check_for_space, daemon=True)
-        self.keyboard_thread.start()
+        # Space key sends the message; the keyboard hook calls back on key events
+        self.space_down = False
+        self.start_keyboard_listener()
         
-        # Start periodic checking of the queue (thread-safe UI updates)
-        self.root.after(100, self.process_queue)
+        # Slow safety-net check of the queue in case a wakeup is ever missed
+        self.root.after(self.poll_interval, self.poll_queue)
         
     def setup_gui(self):
         # Set the window properties
@@ -152,6 +177,14 @@ class MorseGUI:
                                         anchor=tk.W)
         self.translation_label.pack(fill=tk.X)
         
+        # Messages broadcast by other operators
+        if self.client:
+            self.received_list = tk.Listbox(input_display_frame, 
+                                          height=5, 
+                                          font=normal_font, 
+                                          fg=self.text_color)
+            self.received_list.pack(fill=tk.X, pady=(10, 0))
+        
         # Clear button
         self.clear_button = tk.Button(input_display_frame, 
                                     text="Clear", 
@@ -359,8 +392,34 @@ class MorseGUI:
                                      bg="white")
                 morse_label.pack(side=tk.LEFT)
     
+    def post_event(self, event):
+        """Queue an event from any thread and wake the Tk loop to handle it"""
+        self.event_queue.put(event)
+        with self.wakeup_lock:
+            if self.wakeup_pending:
+                # A wakeup is already on its way and will drain this event too
+                return
+            self.wakeup_pending = True
+        try:
+            self.root.event_generate(MORSE_EVENT, when='tail')
+        except (tk.TclError, RuntimeError):
+            # Tcl without thread support (or the loop isn't running yet):
+            # fall back to polling the queue
+            self.poll_interval = FALLBACK_POLL_MS
+            with self.wakeup_lock:
+                self.wakeup_pending = False
+    
+    def poll_queue(self):
+        self.process_queue()
+        self.root.after(self.poll_interval, self.poll_queue)
+    
     def process_queue(self):
-        """Process UI update events from the queue"""
+        """Process every queued UI event, then redraw once for the whole batch"""
+        with self.wakeup_lock:
+            # Events posted from now on need a new wakeup
+            self.wakeup_pending = False
+        needs_redraw = False
+        canvas_color = None
         try:
             while True:
                 # Get event from queue without blocking
@@ -370,21 +429,37 @@ class MorseGUI:
                 event_type = event.get('type')
                 
                 if event_type == 'mouse_down':
-                    self.draw_mouse_area(self.secondary_color)
+                    canvas_color = self.secondary_color
                     self.status_label.config(text="Recording dot/dash...")
                 
                 elif event_type == 'mouse_up':
                     symbol = event.get('symbol')
                     self.morse_code += symbol
+                    self.apply_translation_delta(self.decoder.feed(symbol))
                     self.play_morse_sound(symbol)
                     self.status_label.config(text=f"Recorded {symbol}")
-                    self.draw_mouse_area(self.bg_color)
-                    self.update_gui()
+                    canvas_color = self.bg_color
+                    needs_redraw = True
+                
+                elif event_type == 'key_released':
+                    symbols = self.keyer.key_down(event['down_at']) + self.keyer.key_up(event['up_at'])
+                    if symbols:
+                        self.morse_code += symbols
+                        self.apply_translation_delta(self.decoder.feed_many(symbols))
+                        self.play_morse_sound(symbols[-1])
+                        self.status_label.config(text=f"Recorded {symbols[-1]} ({self.keyer.wpm:.0f} WPM)")
+                    else:
+                        # The keyer holds the first marks until it knows the speed
+                        self.status_label.config(text="Measuring keying speed...")
+                    canvas_color = self.bg_color
+                    needs_redraw = True
                 
                 elif event_type == 'word_separator':
-                    self.morse_code += ' / '
+                    symbols = self.keyer.word_break() if self.raw_keying else ' / '
+                    self.morse_code += symbols
+                    self.apply_translation_delta(self.decoder.feed_many(symbols))
                     self.status_label.config(text="Added word separator")
-                    self.update_gui()
+                    needs_redraw = True
                 
                 elif event_type == 'send_message':
                     self.send_message()
@@ -392,48 +467,72 @@ class MorseGUI:
                 elif event_type == 'set_status':
                     self.status_label.config(text=event.get('text', ''))
                 
+                elif event_type == 'messages_available':
+                    self.show_received_messages()
+                
                 # Mark this task as done
                 self.event_queue.task_done()
                 
         except queue.Empty:
-            # Queue is empty, schedule the next check
+            # Queue is empty, everything queued so far has been handled
             pass
         
-        # Schedule the next queue check
-        self.root.after(100, self.process_queue)
+        if canvas_color is not None:
+            self.draw_mouse_area(canvas_color)
+        if needs_redraw:
+            self.update_gui()
+            
+    def show_received_messages(self):
+        messages = self.client.drain_messages()
+        if not messages:
+            return
+        for message in messages:
+            self.received_list.insert(tk.END, f"Received: {message}")
+        # Keep only the most recent lines
+        excess = self.received_list.size() - MAX_RECEIVED_LINES
+        if excess > 0:
+            self.received_list.delete(0, excess - 1)
+        self.received_list.see(tk.END)
+        
+        stats = self.client.receive_stats()
+        if stats['dropped']:
+            self.status_label.config(text=f"Received {stats['received']} messages ({stats['dropped']} dropped while busy)")
+        else:
+            self.status_label.config(text=f"Received: {messages[-1]}")
             
     def on_click(self, x, y, button, pressed):
         try:
             if button.name == 'left':
                 if pressed:
-                    self.start_time = time.time()
+                    self.start_time = time.monotonic()
                     # Queue UI update instead of direct call
-                    self.event_queue.put({'type': 'mouse_down'})
+                    self.post_event({'type': 'mouse_down'})
+                    
+                elif self.raw_keying:
+                    released = time.monotonic()
+                    self.client.send_key_events([(KEY_DOWN, self.start_time), (KEY_UP, released)])
+                    self.post_event({'type': 'key_released', 'down_at': self.start_time, 'up_at': released})
+                    self.start_time = 0
                     
                 else:
-                    press_duration = time.time() - self.start_time
+                    press_duration = time.monotonic() - self.start_time
                     symbol = '.' if press_duration < 0.2 else '-'
                     # Queue UI update instead of direct call
-                    self.event_queue.put({'type': 'mouse_up', 'symbol': symbol})
+                    self.post_event({'type': 'mouse_up', 'symbol': symbol})
                     self.start_time = 0
                     
             elif button.name == 'right' and not pressed:
-                if self.morse_code and not self.morse_code.strip().endswith('/'):
+                # Marks the keyer still holds count as input too
+                if (self.morse_code or self.keyer.held) and not self.morse_code.strip().endswith('/'):
+                    if self.raw_keying:
+                        self.client.send_key_events([(WORD_BREAK, time.monotonic())])
                     # Queue UI update instead of direct call
-                    self.event_queue.put({'type': 'word_separator'})
+                    self.post_event({'type': 'word_separator'})
         except Exception as e:
             print(f"Error in on_click: {e}")
             
     def play_morse_sound(self, symbol):
-        try:
-            if symbol == '.':
-                winsound.Beep(1000, 200)
-            elif symbol == '-':
-                winsound.Beep(1000, 600)
-            else:
-                time.sleep(0.2)
-        except Exception as e:
-            print(f"Sound error: {e}")
+        self.audio.play(symbol)
             
     def draw_mouse_area(self, color):
         self.canvas.delete("all")
@@ -452,8 +551,21 @@ class MorseGUI:
                 listener.join()
         except Exception as e:
             print(f"Mouse listener error: {e}")
-            self.event_queue.put({'type': 'set_status', 'text': f"Mouse listener error: {e}"})
+            self.post_event({'type': 'set_status', 'text': f"Mouse listener error: {e}"})
             
+    def apply_translation_delta(self, delta):
+        # Only the changed tail of the translation is touched per symbol
+        retract, text = delta
+        if retract:
+            self.translation = self.translation[:-retract]
+        self.translation += text
+
+    def reset_input(self):
+        self.morse_code = ""
+        self.decoder.reset()
+        self.keyer.end_message()
+        self.translation = self.decoder.text
+
     def update_gui(self):
         # Update morse code display
         if self.morse_code:
@@ -462,45 +574,62 @@ class MorseGUI:
             self.morse_label.config(text="Morse Code: ")
             
         # Update translation
-        translated_message = morse_to_text(self.morse_code)
+        translated_message = self.translation
         if translated_message:
             self.translation_label.config(text=f"Translated: {translated_message}")
         else:
             self.translation_label.config(text="Translated: ")
             
     def clear_morse(self):
-        self.morse_code = ""
+        if self.raw_keying:
+            self.client.end_keyed_message(send=False)
+        self.reset_input()
         self.update_gui()
         self.status_label.config(text="Input cleared")
         
-    def check_for_space(self):
+    def start_keyboard_listener(self):
         try:
-            while True:
-                if keyboard.is_pressed('space'):
-                    if self.morse_code:
-                        # Queue the send message event instead of direct call
-                        self.event_queue.put({'type': 'send_message'})
-                        # Small delay to avoid multiple triggers
-                        time.sleep(0.3)
-                    else:
-                        time.sleep(0.1)
-                else:
-                    time.sleep(0.1)
+            keyboard.on_press_key('space', self.on_space_press)
+            keyboard.on_release_key('space', self.on_space_release)
         except Exception as e:
             print(f"Keyboard listener error: {e}")
-            self.event_queue.put({'type': 'set_status', 'text': f"Keyboard listener error: {e}"})
+            self.post_event({'type': 'set_status', 'text': f"Keyboard listener error: {e}"})
+            
+    def on_space_press(self, event):
+        # A held key auto-repeats key-down events; only the first one sends
+        if self.space_down:
+            return
+        self.space_down = True
+        # Queue the send message event instead of direct call; send_message
+        # ignores it if there is nothing to send
+        self.post_event({'type': 'send_message'})
+        
+    def on_space_release(self, event):
+        self.space_down = False
             
     def send_message(self):
+        if self.raw_keying:
+            held = self.keyer.end_message()
+            self.morse_code += held
+            self.apply_translation_delta(self.decoder.feed_many(held))
         if not self.morse_code:
             return
             
-        translated = morse_to_text(self.morse_code)
+        translated = self.translation
         
         # Send to server if client is available
         if self.client:
-            success = self.client.send_message(self.morse_code)
+            # Raw keying is decoded by the server; while disconnected the
+            # locally decoded Morse is buffered like a typed message
+            if self.raw_keying and self.client.end_keyed_message():
+                success = True
+            else:
+                success = self.client.send_message(self.morse_code)
             
-            if success:
+            if success and not self.client.connected:
+                # Buffered by the client and replayed once it reconnects
+                self.status_label.config(text=f"Queued until reconnected: {translated}")
+            elif success:
                 self.status_label.config(text=f"Sent: {translated}")
             else:
                 self.status_label.config(text="Failed to send message")
@@ -508,7 +637,7 @@ class MorseGUI:
             self.status_label.config(text=f"Translated: {translated}")
             
         # Clear input
-        self.morse_code = ""
+        self.reset_input()
         self.update_gui()
 
 # Main application entry point
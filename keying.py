@@ -0,0 +1,224 @@
+"""Adaptive decoding of raw key timings into Morse.
+
+A fixed press-length threshold only works for operators near one speed.
+AdaptiveKeyer instead clusters mark (key-down) lengths into dots and
+dashes and gap (key-up) lengths into element, letter and word gaps, and
+keeps following the operator as they speed up or slow down. Each cluster
+set is a handful of running centers tied together by the standard Morse
+ratios (dash = 3 dots; gaps of 1, 3 and 7 units), so one well-classified
+element also moves the estimates it says nothing about directly. Every
+event costs O(1) and the state is a few floats per connection.
+
+A first guess at the speed would misread the first letters of an
+operator far from it (a 25 WPM dash is shorter than a 12 WPM one), so
+the keyer holds back its first few events and seeds the clusters from
+them: once a mark at least twice as long as another shows up, the marks
+split into dots and dashes around their widest gap; if they stay alike
+(SOS, EEE), the shortest mark or gap is taken as one unit. The held
+events are then decoded with the seeded speed, and end_message() decodes
+whatever is still held.
+
+On the wire, raw keying travels in control frames: KEYING_PREFIX followed
+by 5-byte events (kind, milliseconds since the client started keying),
+KEYING_END when the operator sends the message and KEYING_RESET when
+they clear it. The server decodes
+the events of each connection with its own AdaptiveKeyer and handles the
+finished Morse like any typed message.
+"""
+import struct
+
+KEY_UP = 0
+KEY_DOWN = 1
+WORD_BREAK = 2
+KEYING_PREFIX = b'\x00KEY '
+KEYING_END = b'\x00KEY-END'
+KEYING_RESET = b'\x00KEY-RESET'
+KEY_EVENT = struct.Struct('!BI')
+# 12 WPM puts the dot/dash boundary at 0.2 s, the old fixed threshold
+INITIAL_WPM = 12
+# Seconds per unit at 1 WPM (the word PARIS is 50 units)
+PARIS_UNIT = 1.2
+MARK_RATIOS = (1, 3)
+GAP_RATIOS = (1, 3, 7)
+# How far the winning center moves toward a sample; samples outside the
+# outermost centers move them faster so a speed change is picked up
+# within a few elements
+LEARNING_RATE = 0.2
+ATTACK_RATE = 0.5
+# How far the other centers move toward the ratio implied by the winner
+COUPLING_RATE = 0.5
+# Events are held back until a mark this many times longer than another
+# shows up (dots and dashes both seen) or SEED_MARKS marks have been keyed
+SEED_RATIO = 2.0
+SEED_MARKS = 4
+# Held events are decoded at whatever speed is known once this many pile up
+MAX_HELD_EVENTS = 32
+# Shorter (or negative, from a wrapped or reordered timestamp) durations
+# are read as one wire tick, so every mark and gap is positive
+MIN_DURATION = 0.001
+
+
+def pack_events(events):
+    """Keying control payload for (kind, seconds) events."""
+    return KEYING_PREFIX + b''.join(KEY_EVENT.pack(kind, int(seconds * 1000) & 0xFFFFFFFF)
+                                    for kind, seconds in events)
+
+
+def unpack_events(payload):
+    """(kind, seconds) events of a keying payload (without KEYING_PREFIX)."""
+    usable = len(payload) - len(payload) % KEY_EVENT.size
+    return [(kind, ms / 1000) for kind, ms in KEY_EVENT.iter_unpack(payload[:usable])]
+
+
+class RatioClusters:
+    """Online 1-D clustering with centers held near fixed ratios of one unit."""
+    __slots__ = ('ratios', 'centers')
+
+    def __init__(self, ratios, unit):
+        self.ratios = ratios
+        self.centers = [ratio * unit for ratio in ratios]
+
+    def classify(self, value):
+        """Index of the nearest center; the chosen centers adapt to the value."""
+        centers = self.centers
+        last = len(centers) - 1
+        index = 0
+        while index < last and value * value > centers[index] * centers[index + 1]:
+            index += 1
+        center = centers[index]
+        outward = (index == 0 and value < center) or (index == last and value > center)
+        centers[index] = center + (ATTACK_RATE if outward else LEARNING_RATE) * (value - center)
+        unit = centers[index] / self.ratios[index]
+        for other, ratio in enumerate(self.ratios):
+            if other != index:
+                centers[other] += COUPLING_RATE * (ratio * unit - centers[other])
+        return index
+
+    def nudge(self, index, value):
+        """Move one center part of the way toward an outside estimate."""
+        self.centers[index] += COUPLING_RATE * (value - self.centers[index])
+
+    @property
+    def unit(self):
+        return self.centers[0] / self.ratios[0]
+
+
+class AdaptiveKeyer:
+    """Turns key-down/key-up times into Morse symbols, tracking the operator's speed.
+
+    key_down() returns what the gap that just ended means ('', ' ' for a
+    new letter or ' / ' for a new word) and key_up() returns '.' or '-',
+    so joining the results gives text Morse for morse_to_text. Until
+    the speed is seeded both return '' and a later call returns the
+    symbols of every held event at once.
+    """
+    __slots__ = ('marks', 'gaps', 'down_at', 'up_at', 'held')
+
+    def __init__(self, wpm=INITIAL_WPM):
+        unit = PARIS_UNIT / wpm
+        self.marks = RatioClusters(MARK_RATIOS, unit)
+        self.gaps = RatioClusters(GAP_RATIOS, unit)
+        self.down_at = None
+        self.up_at = None
+        # (kind, duration) events waiting for the speed to be seeded; None once seeded
+        self.held = []
+
+    @property
+    def wpm(self):
+        return PARIS_UNIT / self.marks.unit
+
+    def key_down(self, timestamp):
+        gap = ''
+        if self.up_at is not None:
+            duration = max(timestamp - self.up_at, MIN_DURATION)
+            if self.held is None:
+                gap = self._gap(duration)
+            else:
+                gap = self._hold(KEY_DOWN, duration)
+        self.down_at = timestamp
+        self.up_at = None
+        return gap
+
+    def key_up(self, timestamp):
+        if self.down_at is None:
+            return ''
+        duration = max(timestamp - self.down_at, MIN_DURATION)
+        self.down_at = None
+        self.up_at = timestamp
+        if self.held is None:
+            return self._mark(duration)
+        self.held.append((KEY_UP, duration))
+        marks = [value for kind, value in self.held if kind == KEY_UP]
+        if len(marks) >= SEED_MARKS or (len(marks) > 1 and max(marks) >= SEED_RATIO * min(marks)):
+            return self._seed()
+        return ''
+
+    def word_break(self):
+        """An explicit word separator; the gap before the next element is not measured."""
+        self.up_at = None
+        if self.held is None:
+            return ' / '
+        if self.held and self.held[-1][0] == WORD_BREAK:
+            return ''
+        return self._hold(WORD_BREAK, 0.0)
+
+    def _hold(self, kind, duration):
+        """Hold a gap or break back; past MAX_HELD_EVENTS, seed from what is held."""
+        self.held.append((kind, duration))
+        return self._seed() if len(self.held) >= MAX_HELD_EVENTS else ''
+
+    def _gap(self, duration):
+        return ('', ' ', ' / ')[self.gaps.classify(duration)]
+
+    def _mark(self, duration):
+        symbol = '.-'[self.marks.classify(duration)]
+        # Element gaps are one unit even when letter and word gaps are
+        # stretched, so the mark speed also steers the gap clusters
+        self.gaps.nudge(0, self.marks.unit)
+        return symbol
+
+    def _seed(self):
+        """Set the speed from the held events and return their symbols."""
+        held, self.held = self.held, None
+        marks = sorted(value for kind, value in held if kind == KEY_UP)
+        gaps = [value for kind, value in held if kind == KEY_DOWN]
+        unit = None
+        if len(marks) > 1 and marks[-1] >= SEED_RATIO * marks[0]:
+            # Dots and dashes: split at the widest ratio between neighbours
+            split = max(range(1, len(marks)), key=lambda index: marks[index] / marks[index - 1])
+            dots, dashes = marks[:split], marks[split:]
+            unit = (sum(dots) + sum(dashes) / MARK_RATIOS[1]) / len(marks)
+        elif marks and gaps:
+            # All marks alike: an element gap, or the marks if they are dots
+            unit = min(min(gaps), sum(marks) / len(marks))
+        if unit:
+            self.marks = RatioClusters(MARK_RATIOS, unit)
+            self.gaps = RatioClusters(GAP_RATIOS, unit)
+        symbols = []
+        for kind, value in held:
+            if kind == KEY_UP:
+                symbols.append(self._mark(value))
+            elif kind == KEY_DOWN:
+                symbols.append(self._gap(value))
+            else:
+                symbols.append(' / ')
+        return ''.join(symbols)
+
+    def feed(self, kind, timestamp):
+        if kind == KEY_DOWN:
+            return self.key_down(timestamp)
+        if kind == KEY_UP:
+            return self.key_up(timestamp)
+        return self.word_break()
+
+    def feed_events(self, events):
+        return ''.join([self.feed(kind, timestamp) for kind, timestamp in events])
+
+    def end_message(self):
+        """Forget the pending timestamps and return the symbols of any held events.
+
+        The speed estimates carry over to the next message.
+        """
+        self.down_at = None
+        self.up_at = None
+        return self._seed() if self.held else ''
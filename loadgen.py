@@ -0,0 +1,203 @@
+"""Headless load generator for the Morse chat server.
+
+Opens many client connections (speaking the same framed protocol as
+client.py, without Tk), lets some of them send Morse traffic at a fixed
+rate and size, and reports throughput and end-to-end latency
+percentiles. Every message starts with the sender number and a sequence
+number spelled in Morse, which survive the server's translation, so the
+probe connections can match each broadcast to its send time.
+
+    python loadgen.py --connections 2000 --senders 20 --rate 50 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+from framing import FrameDecoder, encode_frame
+from morse_dict import text_to_morse
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5555
+READ_SIZE = 65536
+
+
+def raise_fd_limit():
+    """Raise the open file limit so thousands of sockets can be held."""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def make_message(sender, sequence, size):
+    """Morse for 'SENDER SEQUENCE EEE...', padded to roughly size bytes."""
+    morse = text_to_morse(f"{sender} {sequence}")
+    padding = max(size - len(morse) - 3, 0) // 2
+    if padding:
+        # Each E is '.' plus its separator
+        morse += ' / ' + text_to_morse('E' * padding)
+    return morse
+
+
+def parse_message(text):
+    """Return (sender, sequence) from a translated load-generator message."""
+    parts = text.split(' ', 2)
+    try:
+        return int(parts[0]), int(parts[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class LoadStats:
+    def __init__(self):
+        self.sent = 0
+        self.delivered = 0
+        self.closed = 0
+        self.latencies = []
+        self.send_times = {}
+
+
+async def receive(reader, stats, probe):
+    """Count broadcasts; probe connections also record their latency."""
+    decoder = FrameDecoder()
+    while True:
+        try:
+            data = await reader.read(READ_SIZE)
+        except OSError:
+            data = b''
+        if not data:
+            stats.closed += 1
+            return
+        payloads = decoder.feed(data)
+        stats.delivered += len(payloads)
+        if probe:
+            now = time.perf_counter()
+            for payload in payloads:
+                sent_at = stats.send_times.get(parse_message(payload.decode('utf-8', errors='replace')))
+                if sent_at is not None:
+                    stats.latencies.append(now - sent_at)
+
+
+async def send(sender, writer, stats, rate, count, size, deadline):
+    """Send count messages (or until deadline) at rate messages/sec (0 = flat out)."""
+    interval = 1 / rate if rate else 0
+    next_send = time.perf_counter()
+    sequence = 0
+    while sequence < count and time.perf_counter() < deadline:
+        frame = encode_frame(make_message(sender, sequence, size))
+        stats.send_times[(sender, sequence)] = time.perf_counter()
+        writer.write(frame)
+        stats.sent += 1
+        sequence += 1
+        await writer.drain()
+        if interval:
+            next_send += interval
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif sequence % 100 == 0:
+            await asyncio.sleep(0)
+
+
+async def run_load(host, port, connections, senders, rate=10.0, messages=100, size=64,
+                   duration=60.0, probes=50, settle=0.5, timeout=30.0):
+    """Run one load test and return its results as a dict."""
+    stats = LoadStats()
+    streams = []
+    start = time.perf_counter()
+    for _ in range(connections):
+        try:
+            streams.append(await asyncio.open_connection(host, port))
+        except OSError:
+            break
+    connect_seconds = time.perf_counter() - start
+    # Probes are picked from the receivers that do not send, when there are any
+    probe_start = senders if len(streams) > senders else 0
+    receivers = [asyncio.create_task(receive(reader, stats, probe_start <= index < probe_start + probes))
+                 for index, (reader, _) in enumerate(streams)]
+    # Give the server a moment to register every connection before sending
+    await asyncio.sleep(settle)
+
+    senders = min(senders, len(streams))
+    start = time.perf_counter()
+    await asyncio.gather(*(send(sender, writer, stats, rate, messages, size, start + duration)
+                           for sender, (_, writer) in enumerate(streams[:senders])))
+    send_seconds = time.perf_counter() - start
+    expected = stats.sent * (len(streams) - 1)
+    while stats.delivered < expected and time.perf_counter() - start < send_seconds + timeout:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    for task in receivers:
+        task.cancel()
+    for _, writer in streams:
+        writer.close()
+    latencies = sorted(stats.latencies)
+    return {
+        'connections': len(streams),
+        'connections_held': len(streams) - stats.closed,
+        'connect_seconds': connect_seconds,
+        'sent': stats.sent,
+        'delivered': stats.delivered,
+        'expected': expected,
+        'seconds': elapsed,
+        'messages_per_sec': stats.sent / send_seconds if send_seconds else 0.0,
+        'deliveries_per_sec': stats.delivered / elapsed if elapsed else 0.0,
+        'latency_samples': len(latencies),
+        'latency_p50_ms': percentile(latencies, 0.50) * 1000,
+        'latency_p90_ms': percentile(latencies, 0.90) * 1000,
+        'latency_p99_ms': percentile(latencies, 0.99) * 1000,
+        'latency_max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=os.getenv('SERVER_IP', DEFAULT_HOST))
+    parser.add_argument('--port', type=int, default=int(os.getenv('SERVER_PORT', DEFAULT_PORT)))
+    parser.add_argument('--connections', type=int, default=100, help='connections to open')
+    parser.add_argument('--senders', type=int, default=10, help='connections that send')
+    parser.add_argument('--rate', type=float, default=10.0, help='messages/sec per sender (0 = unlimited)')
+    parser.add_argument('--messages', type=int, default=100, help='messages per sender')
+    parser.add_argument('--size', type=int, default=64, help='approximate Morse message size in bytes')
+    parser.add_argument('--duration', type=float, default=60.0, help='stop sending after this many seconds')
+    parser.add_argument('--probes', type=int, default=50, help='receivers that measure latency')
+    parser.add_argument('--timeout', type=float, default=30.0, help='wait this long for deliveries after sending')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    result = asyncio.run(run_load(args.host, args.port, args.connections, args.senders, args.rate,
+                                  args.messages, args.size, args.duration, args.probes,
+                                  timeout=args.timeout))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"connections  {result['connections_held']}/{result['connections']} held "
+          f"(connected in {result['connect_seconds']:.2f}s)")
+    print(f"sent         {result['sent']} ({result['messages_per_sec']:.0f} msg/s)")
+    print(f"delivered    {result['delivered']}/{result['expected']} "
+          f"({result['deliveries_per_sec']:.0f} deliveries/s)")
+    print(f"latency ms   p50 {result['latency_p50_ms']:.2f}  p90 {result['latency_p90_ms']:.2f}  "
+          f"p99 {result['latency_p99_ms']:.2f}  max {result['latency_max_ms']:.2f} "
+          f"({result['latency_samples']} samples)")
+
+
+if __name__ == '__main__':
+    main()
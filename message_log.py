@@ -0,0 +1,379 @@
+"""Append-only, segmented on-disk log of translated messages.
+
+Every broadcast is appended as one record:
+
+    length (4 bytes) | unix time (8 bytes, double) | room NUL sender NUL message
+
+all big-endian, the body UTF-8. Records go into segment files named after
+the sequence number of their first record (00000000000000000000.log, ...);
+a new segment starts once the current one reaches the segment size. Next
+to each segment, a .idx file holds the 8-byte offset of every record, so
+the Nth record of a segment is found without scanning it.
+
+The server only puts records on a queue; a writer thread appends them in
+batches and fsyncs at most once per fsync interval (and on close), so the
+message path never waits on the disk. Data is flushed before its index
+entries, so every indexed record is complete.
+
+Readers map segments and indexes with mmap and decode only the records
+they return: reading the last N messages of a room touches a few pages
+at the end of the newest segment, however large the log grows.
+
+Replay to connecting clients never reads the disk: MessageLog also keeps
+the last few messages of each recently active room in memory (loaded
+from the end of the log on startup), so a replay is a copy of a short
+deque, even for a quiet room and even on the event loop. Room names come
+from clients, so the ring is bounded in total characters as well as in
+rooms and messages per room, and long messages are only kept on disk.
+
+    python message_log.py LOG_DIR --last 50 --room main
+"""
+import argparse
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+
+RECORD_HEADER = struct.Struct('!Id')
+INDEX_ENTRY = struct.Struct('!Q')
+SEGMENT_SUFFIX = '.log'
+INDEX_SUFFIX = '.idx'
+DEFAULT_SEGMENT_SIZE = 16 * 1024 * 1024
+DEFAULT_FSYNC_INTERVAL = 1.0
+DEFAULT_QUEUE_SIZE = 65536
+# Upper bound on the records tail() inspects while looking for a room's messages
+DEFAULT_SCAN_LIMIT = 10000
+# Messages kept in memory per room for replay, and how many rooms are
+# kept (the least recently active are forgotten first)
+DEFAULT_RECENT_SIZE = 20
+DEFAULT_RECENT_ROOMS = 4096
+# Characters of message text kept in memory across all rooms, and the
+# longest message kept (longer ones are logged but not replayed)
+DEFAULT_RECENT_CHARS = 4 * 1024 * 1024
+MAX_RECENT_MESSAGE_LENGTH = 1024
+
+LogRecord = namedtuple('LogRecord', 'sequence timestamp room sender message')
+
+
+def encode_record(room, sender, message, timestamp=None):
+    """One log record; sender is a (host, port) address, a string or None."""
+    if isinstance(sender, tuple):
+        sender = f"{sender[0]}:{sender[1]}"
+    body = f"{room}\x00{sender or ''}\x00{message}".encode('utf-8')
+    return RECORD_HEADER.pack(len(body), time.time() if timestamp is None else timestamp) + body
+
+
+def decode_record(data, offset, sequence):
+    """The record at `offset` of a mapped segment."""
+    length, timestamp = RECORD_HEADER.unpack_from(data, offset)
+    start = offset + RECORD_HEADER.size
+    room, sender, message = bytes(data[start:start + length]).decode('utf-8').split('\x00', 2)
+    return LogRecord(sequence, timestamp, room, sender, message)
+
+
+def list_segments(directory):
+    """(first sequence, segment path, index path) for every segment, oldest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    segments = []
+    for name in names:
+        base, suffix = os.path.splitext(name)
+        if suffix == SEGMENT_SUFFIX and base.isdigit():
+            path = os.path.join(directory, name)
+            segments.append((int(base), path, path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX))
+    return sorted(segments)
+
+
+@contextmanager
+def mapped(path):
+    """Read-only mmap of a file, or None when it is missing or empty."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        yield None
+        return
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield None
+            return
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield data
+        finally:
+            data.close()
+
+
+def valid_entries(index, data):
+    """Number of index entries whose records are complete in `data`."""
+    count = len(index) // INDEX_ENTRY.size
+    while count:
+        offset, = INDEX_ENTRY.unpack_from(index, (count - 1) * INDEX_ENTRY.size)
+        if offset + RECORD_HEADER.size <= len(data):
+            length, _ = RECORD_HEADER.unpack_from(data, offset)
+            if offset + RECORD_HEADER.size + length <= len(data):
+                return count
+        count -= 1
+    return 0
+
+
+class LogReader:
+    """Reads a message log directory through mmap; safe while a MessageLog appends to it."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def tail(self, count, room=None, scan_limit=DEFAULT_SCAN_LIMIT):
+        """The last `count` records (of one room, if given), oldest first.
+
+        Looks at no more than scan_limit records, so a quiet room never
+        turns a replay into a scan of the whole log.
+        """
+        found = []
+        scanned = 0
+        for base, segment_path, index_path in reversed(list_segments(self.directory)):
+            # Map the index before the data: the data is flushed first, so it
+            # covers every entry of the index we mapped
+            with mapped(index_path) as index, mapped(segment_path) as data:
+                if index is None or data is None:
+                    continue
+                for position in range(valid_entries(index, data) - 1, -1, -1):
+                    if len(found) >= count or scanned >= scan_limit:
+                        return found[::-1]
+                    scanned += 1
+                    offset, = INDEX_ENTRY.unpack_from(index, position * INDEX_ENTRY.size)
+                    record = decode_record(data, offset, base + position)
+                    if room is None or record.room == room:
+                        found.append(record)
+        return found[::-1]
+
+    def records(self, start=0):
+        """Every record from sequence number `start` on, oldest first."""
+        for base, segment_path, index_path in list_segments(self.directory):
+            with mapped(index_path) as index, mapped(segment_path) as data:
+                if index is None or data is None:
+                    continue
+                entries = valid_entries(index, data)
+                if base + entries <= start:
+                    continue
+                for position in range(max(start - base, 0), entries):
+                    offset, = INDEX_ENTRY.unpack_from(index, position * INDEX_ENTRY.size)
+                    yield decode_record(data, offset, base + position)
+
+
+class MessageLog:
+    """Appends records to the newest segment from a background writer thread."""
+
+    def __init__(self, directory, segment_size=DEFAULT_SEGMENT_SIZE,
+                 fsync_interval=DEFAULT_FSYNC_INTERVAL, queue_size=DEFAULT_QUEUE_SIZE,
+                 recent_size=DEFAULT_RECENT_SIZE, recent_rooms=DEFAULT_RECENT_ROOMS,
+                 recent_chars=DEFAULT_RECENT_CHARS):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.fsync_interval = fsync_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.reader = LogReader(directory)
+        self.recent_size = recent_size
+        self.recent_rooms = recent_rooms
+        self.recent_chars = recent_chars
+        # room -> deque of its last recent_size messages, in LRU order
+        self.recent = OrderedDict()
+        self.recent_held = 0
+        self.recent_skipped = 0
+        self.recent_lock = threading.Lock()
+        self.writer_thread = threading.Thread(target=self._write_loop, name='message-log', daemon=True)
+        self.segment = None
+        self.index = None
+        self.next_sequence = 0
+        self.segment_base = 0
+        self.appended = 0
+        self.dropped = 0
+        self.fsyncs = 0
+        self.last_fsync = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self._open_existing()
+        if recent_size > 0:
+            for record in self.reader.tail(DEFAULT_SCAN_LIMIT):
+                self._remember(record.room, record.message)
+
+    def _open_existing(self):
+        """Continue the newest segment, cutting off a record torn by a crash."""
+        segments = list_segments(self.directory)
+        if not segments:
+            self._open_segment(0)
+            return
+        base, segment_path, index_path = segments[-1]
+        with mapped(index_path) as index, mapped(segment_path) as data:
+            entries = valid_entries(index, data) if index is not None and data is not None else 0
+            end = 0
+            if entries:
+                offset, = INDEX_ENTRY.unpack_from(index, (entries - 1) * INDEX_ENTRY.size)
+                length, _ = RECORD_HEADER.unpack_from(data, offset)
+                end = offset + RECORD_HEADER.size + length
+        for path, size in ((segment_path, end), (index_path, entries * INDEX_ENTRY.size)):
+            with open(path, 'ab') as f:
+                f.truncate(size)
+        self.segment_base = base
+        self.next_sequence = base + entries
+        self.segment = open(segment_path, 'ab')
+        self.index = open(index_path, 'ab')
+
+    def _open_segment(self, base):
+        if self.segment is not None:
+            self._fsync()
+            self.segment.close()
+            self.index.close()
+        path = os.path.join(self.directory, f"{base:020d}")
+        self.segment = open(path + SEGMENT_SUFFIX, 'ab')
+        self.index = open(path + INDEX_SUFFIX, 'ab')
+        self.segment_base = base
+
+    def start(self):
+        self.writer_thread.start()
+        return self
+
+    def append(self, room, sender, message):
+        """Queue a message for the writer thread; never blocks."""
+        if self.recent_size > 0:
+            with self.recent_lock:
+                self._remember(room, message)
+        try:
+            self.queue.put_nowait(encode_record(room, sender, message))
+        except queue.Full:
+            self.dropped += 1
+
+    def _remember(self, room, message):
+        if len(message) > MAX_RECENT_MESSAGE_LENGTH:
+            self.recent_skipped += 1
+            return
+        messages = self.recent.get(room)
+        if messages is None:
+            messages = self.recent[room] = deque()
+            if len(self.recent) > self.recent_rooms:
+                self._forget_room()
+        else:
+            self.recent.move_to_end(room)
+        if len(messages) >= self.recent_size:
+            self.recent_held -= len(messages.popleft())
+        messages.append(message)
+        self.recent_held += len(message)
+        while self.recent_held > self.recent_chars and len(self.recent) > 1:
+            self._forget_room()
+
+    def _forget_room(self):
+        """Drop the least recently active room from the ring."""
+        _, messages = self.recent.popitem(last=False)
+        self.recent_held -= sum(map(len, messages))
+
+    def recent_messages(self, room, count=None):
+        """The last `count` messages of a room (up to recent_size), oldest first, from memory."""
+        with self.recent_lock:
+            messages = self.recent.get(room)
+            if not messages:
+                return []
+            messages = list(messages)
+        return messages[-count:] if count else messages
+
+    def _write_loop(self):
+        dirty = False
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.fsync_interval if dirty else None)]
+            except queue.Empty:
+                self._fsync()
+                dirty = False
+                continue
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_batch([record for record in batch if record is not None])
+            dirty = True
+            if None in batch:
+                self._fsync()
+                return
+            if time.monotonic() - self.last_fsync >= self.fsync_interval:
+                self._fsync()
+                dirty = False
+
+    def _write_batch(self, records):
+        offsets = []
+        position = self.segment.tell()
+        for record in records:
+            if position and position + len(record) > self.segment_size:
+                self._flush(offsets)
+                offsets = []
+                self._open_segment(self.next_sequence)
+                position = 0
+            self.segment.write(record)
+            offsets.append(INDEX_ENTRY.pack(position))
+            position += len(record)
+            self.next_sequence += 1
+        self._flush(offsets)
+        self.appended += len(records)
+
+    def _flush(self, offsets):
+        """Write the data before the index entries that point into it."""
+        self.segment.flush()
+        self.index.write(b''.join(offsets))
+        self.index.flush()
+
+    def _fsync(self):
+        os.fsync(self.segment.fileno())
+        os.fsync(self.index.fileno())
+        self.last_fsync = time.monotonic()
+        self.fsyncs += 1
+
+    def tail(self, count, room=None, scan_limit=DEFAULT_SCAN_LIMIT):
+        """The last `count` written records (of one room, if given), oldest first."""
+        return self.reader.tail(count, room, scan_limit)
+
+    def close(self):
+        """Write and fsync everything queued, then close the files."""
+        if self.writer_thread.is_alive():
+            self.queue.put(None)
+            self.writer_thread.join()
+        self.segment.close()
+        self.index.close()
+
+    def stats(self):
+        return {
+            'appended': self.appended,
+            'queued': self.queue.qsize(),
+            'dropped': self.dropped,
+            'fsyncs': self.fsyncs,
+            'next_sequence': self.next_sequence,
+            'segment': self.segment_base,
+            'recent_rooms': len(self.recent),
+            'recent_chars': self.recent_held,
+            'recent_skipped': self.recent_skipped,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print messages from a server message log.")
+    parser.add_argument('directory')
+    parser.add_argument('--last', type=int, help='only the last N messages')
+    parser.add_argument('--room', help='only messages of this room')
+    parser.add_argument('--start', type=int, default=0, help='first sequence number to print')
+    args = parser.parse_args()
+
+    reader = LogReader(args.directory)
+    if args.last is not None:
+        records = reader.tail(args.last, args.room, scan_limit=float('inf'))
+    else:
+        records = (record for record in reader.records(args.start)
+                   if args.room is None or record.room == args.room)
+    for record in records:
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.timestamp))
+        print(f"{record.sequence} {stamp} [{record.room}] {record.sender}: {record.message}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""Server metrics, a local stats endpoint and a sampling profiler.
+
+Counters and latency histograms are cheap enough to update on the hot
+path: a histogram observation only picks a power-of-two bucket and bumps
+a few integers under a lock. Everything is read back through snapshot(),
+which the stats endpoint serves as JSON together with the server's own
+counters. The profiler samples the stacks of every thread from a
+background thread and is started and stopped over the same endpoint.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Bucket i counts observations below 2**i microseconds (bucket 0 is < 1us)
+HISTOGRAM_BUCKETS = 32
+DEFAULT_PROFILE_INTERVAL = 0.005
+MAX_PROFILE_DEPTH = 64
+PROFILE_REPORT_SIZE = 25
+
+
+class Histogram:
+    """Latency histogram with power-of-two microsecond buckets."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)
+        with self.lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper bound (in seconds) of the bucket holding the given percentile."""
+        with self.lock:
+            buckets = list(self.buckets)
+            count = self.count
+        if not count:
+            return 0.0
+        target = fraction * count
+        running = 0
+        for index, bucket in enumerate(buckets):
+            running += bucket
+            if running >= target:
+                return (1 << index) / 1e6
+        return (1 << (HISTOGRAM_BUCKETS - 1)) / 1e6
+
+    def snapshot(self):
+        with self.lock:
+            count, total, maximum = self.count, self.total, self.max
+        return {
+            'count': count,
+            'mean_ms': total / count * 1000 if count else 0.0,
+            'p50_ms': self.percentile(0.50) * 1000,
+            'p90_ms': self.percentile(0.90) * 1000,
+            'p99_ms': self.percentile(0.99) * 1000,
+            'max_ms': maximum * 1000,
+        }
+
+
+class Metrics:
+    """Named counters and latency histograms shared by the whole server."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = Counter()
+        self.histograms = {}
+        self.started = time.monotonic()
+
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def observe(self, name, seconds):
+        self.histogram(name).observe(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.monotonic()
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        return {
+            'uptime': time.monotonic() - self.started,
+            'counters': counters,
+            'latency': {name: histogram.snapshot() for name, histogram in sorted(histograms.items())},
+        }
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler built on sys._current_frames().
+
+    While running, a background thread records the stack of every other
+    thread each interval. report() returns the hottest functions (by
+    samples at the top of the stack) and the hottest stacks in collapsed
+    "outer;inner" form, ready for flame graph tools.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stacks = Counter()
+        self.samples = 0
+        self.interval = DEFAULT_PROFILE_INTERVAL
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, interval=DEFAULT_PROFILE_INTERVAL):
+        """Start sampling, discarding the previous profile."""
+        self.stop()
+        with self.lock:
+            self.stacks.clear()
+            self.samples = 0
+        self.interval = interval
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='morse-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            sampled = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_PROFILE_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                sampled.append(';'.join(reversed(stack)))
+            with self.lock:
+                self.stacks.update(sampled)
+                self.samples += 1
+
+    def report(self, limit=PROFILE_REPORT_SIZE):
+        with self.lock:
+            stacks = Counter(self.stacks)
+            samples = self.samples
+        functions = Counter()
+        for stack, count in stacks.items():
+            functions[stack.rsplit(';', 1)[-1]] += count
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'samples': samples,
+            'top_functions': functions.most_common(limit),
+            'top_stacks': stacks.most_common(limit),
+        }
+
+
+class StatsRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /stats, /stats/clients and /profile[/start|/stop] as JSON."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        profiler = self.server.profiler
+        if url.path == '/stats':
+            body = self.server.stats_source()
+        elif url.path == '/stats/clients':
+            body = self.server.clients_source()
+        elif url.path == '/profile/start':
+            profiler.start(float(query.get('interval', [DEFAULT_PROFILE_INTERVAL])[0]))
+            body = profiler.report()
+        elif url.path == '/profile/stop':
+            profiler.stop()
+            body = profiler.report()
+        elif url.path == '/profile':
+            body = profiler.report()
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StatsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, stats_source, clients_source, profiler):
+        super().__init__(address, StatsRequestHandler)
+        self.stats_source = stats_source
+        self.clients_source = clients_source
+        self.profiler = profiler
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='morse-stats', daemon=True).start()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        self.profiler.stop()
+
+
+metrics = Metrics()
+profiler = SamplingProfiler()
@@ -0,0 +1,173 @@
+"""Compact binary encoding of Morse messages for the wire.
+
+Text Morse spends a byte per dot or dash plus one or three bytes per
+separator. The binary form packs every element into 2 bits, four per
+byte, first element in the high bits:
+
+    00 '.'    01 '-'    10 ' ' (next letter)    11 ' / ' (next word)
+
+A binary payload is a marker byte (0x01), a byte giving how many
+elements of the last byte are padding, and the packed elements. Text
+payloads never start with 0x01, so both forms can share a connection.
+
+Binary is negotiated per connection: the client sends the BINARY_HELLO
+control frame (control frames start with 0x00) and switches to binary
+after the server answers BINARY_ACCEPT. Servers that don't answer keep
+getting text. Only canonical Morse (dots and dashes separated by ' ' or
+' / ') is packed; anything else is sent as text, so translations are
+always identical to the text protocol.
+
+binary_to_text() translates a payload without rebuilding the text Morse.
+It walks the Morse trie a byte (four elements) at a time through a table
+of (state, byte) -> (completed text, next state), where a state is a
+trie node or a position between letters, so a message costs one lookup
+per packed byte. That is cheaper than splitting and looking up the same
+message as text.
+"""
+import re
+import threading
+
+from morse_dict import MORSE_TRIE, morse_to_text
+
+CONTROL_PREFIX = b'\x00'
+BINARY_HELLO = b'\x00MORSE-BIN/1'
+BINARY_ACCEPT = b'\x00MORSE-BIN/1 OK'
+BINARY_MARKER = b'\x01'
+SYMBOLS = ('.', '-', ' ', ' / ')
+
+_CANONICAL = re.compile(r'[.-]+(?:(?: / | )[.-]+)*')
+_DIGITS = str.maketrans({'.': '0', '-': '1', ' ': '2'})
+
+
+def _element_table(count):
+    """For each byte value, the text of its first `count` elements."""
+    return [''.join(SYMBOLS[(byte >> shift) & 3] for shift in (6, 4, 2, 0)[:count])
+            for byte in range(256)]
+
+
+_UNPACK_TABLE = _element_table(4)
+_TAIL_TABLES = {count: _element_table(count) for count in (1, 2, 3)}
+
+# Decoder states other than the trie nodes; a separator at the start, at
+# the end or after another separator makes a payload INVALID for the table
+_START, _AFTER_LETTER, _AFTER_WORD, _INVALID, _NO_LETTER = range(5)
+# Built on first use: per state, the (text, next state) of every element
+# and of every byte, and the text a message ending in that state finishes with
+_element_steps = None
+_byte_steps = None
+_final_text = None
+_tables_lock = threading.Lock()
+
+
+def _load_decoding_tables():
+    """Build the tables once, even if several threads decode their first payload together."""
+    global _element_steps, _byte_steps, _final_text
+    with _tables_lock:
+        if _byte_steps is None:
+            _element_steps, _final_text, byte_steps = _build_decoding_tables()
+            # Assigned last: binary_to_text checks it without the lock
+            _byte_steps = byte_steps
+
+
+def _build_decoding_tables():
+    nodes = []
+    pending = [MORSE_TRIE]
+    while pending:
+        node = pending.pop()
+        for symbol in '.-':
+            child = node.children.get(symbol)
+            if child is not None:
+                nodes.append(child)
+                pending.append(child)
+    states = {id(node): _NO_LETTER + 1 + index for index, node in enumerate(nodes)}
+
+    def enter(node, symbol):
+        child = node.children.get(symbol) if node is not None else None
+        return states[id(child)] if child is not None else _NO_LETTER
+
+    count = _NO_LETTER + 1 + len(nodes)
+    element_steps = [None] * count
+    final_text = [None] * count
+    for state in (_START, _AFTER_LETTER, _AFTER_WORD):
+        element_steps[state] = (('', enter(MORSE_TRIE, '.')), ('', enter(MORSE_TRIE, '-')),
+                                ('', _INVALID), ('', _INVALID))
+    element_steps[_INVALID] = (('', _INVALID),) * 4
+    for state, node in [(_NO_LETTER, None)] + [(states[id(node)], node) for node in nodes]:
+        # Codes that aren't letters translate to '_', as in morse_to_text
+        char = (node.char if node is not None else None) or '_'
+        element_steps[state] = (('', enter(node, '.')), ('', enter(node, '-')),
+                                (char, _AFTER_LETTER), (char + ' ', _AFTER_WORD))
+        final_text[state] = char
+    byte_steps = []
+    for state in range(count):
+        row = []
+        for byte in range(256):
+            text, after = '', state
+            for shift in (6, 4, 2, 0):
+                piece, after = element_steps[after][(byte >> shift) & 3]
+                text += piece
+            row.append((text, after))
+        byte_steps.append(row)
+    return element_steps, final_text, byte_steps
+
+
+def is_control(payload):
+    return payload[:1] == CONTROL_PREFIX
+
+
+def is_binary(payload):
+    return payload[:1] == BINARY_MARKER
+
+
+def pack_morse(morse_code):
+    """Binary payload for a Morse message, or None if it isn't canonical Morse."""
+    morse_code = morse_code.strip()
+    if not _CANONICAL.fullmatch(morse_code):
+        return None
+    # One base-4 digit per element; int() parses power-of-two bases in linear time
+    digits = morse_code.replace(' / ', '3').translate(_DIGITS)
+    padding = -len(digits) % 4
+    digits += '0' * padding
+    return BINARY_MARKER + bytes([padding]) + int(digits, 4).to_bytes(len(digits) // 4, 'big')
+
+
+def unpack_morse(payload):
+    """Text Morse for a binary payload (bytes or memoryview), without copying it."""
+    view = memoryview(payload)
+    if len(view) < 2 or view[1] > 3 or (view[1] and len(view) == 2):
+        raise ValueError("Malformed binary Morse payload")
+    padding = view[1]
+    body = view[2:]
+    if not padding:
+        return ''.join(map(_UNPACK_TABLE.__getitem__, body))
+    return ''.join(map(_UNPACK_TABLE.__getitem__, body[:-1])) + _TAIL_TABLES[4 - padding][body[-1]]
+
+
+def binary_to_text(payload):
+    """morse_to_text(unpack_morse(payload)), decoded straight from the packed elements."""
+    view = memoryview(payload)
+    if len(view) < 2 or view[1] > 3 or (view[1] and len(view) == 2):
+        raise ValueError("Malformed binary Morse payload")
+    byte_steps = _byte_steps
+    if byte_steps is None:
+        _load_decoding_tables()
+        byte_steps = _byte_steps
+    padding = view[1]
+    body = view[2:]
+    state = _START
+    parts = []
+    for byte in (body[:-1] if padding else body):
+        text, state = byte_steps[state][byte]
+        parts.append(text)
+    if padding:
+        last = body[-1]
+        for shift in (6, 4, 2, 0)[:4 - padding]:
+            text, state = _element_steps[state][(last >> shift) & 3]
+            parts.append(text)
+    final = _final_text[state]
+    if final is None:
+        # Empty messages and stray separators follow morse_to_text's
+        # splitting rules, which only the text form reproduces
+        return morse_to_text(unpack_morse(view))
+    parts.append(final)
+    return ''.join(parts)
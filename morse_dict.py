@@ -1,3 +1,6 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 MORSE_CODE_DICT = {
     '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E', '..-.': 'F', '--.': 'G',
     '....': 'H', '..': 'I', '.---': 'J', '-.-': 'K', '.-..': 'L', '--': 'M', '-.': 'N',
@@ -16,4 +19,196 @@ def morse_to_text(morse_code):
         letters = word.split(' ')
         translated_word = ''.join([MORSE_CODE_DICT.get(letter, '_') for letter in letters])
         translated_message.append(translated_word)
-    return ' '.join(translated_message)
\ No newline at end of file
+    return ' '.join(translated_message)
+
+
+def morse_word_to_text(word):
+    """Translate one word (letters separated by single spaces) like morse_to_text does."""
+    return ''.join([MORSE_CODE_DICT.get(letter, '_') for letter in word.split(' ')])
+
+
+# Reverse lookup built once at import. Only single characters are encoded,
+# so multi-character entries such as 'SOS' are spelled out letter by letter.
+TEXT_TO_MORSE_DICT = {char: code for code, char in MORSE_CODE_DICT.items() if len(char) == 1}
+for _char, _code in list(TEXT_TO_MORSE_DICT.items()):
+    TEXT_TO_MORSE_DICT[_char.lower()] = _code
+del _char, _code
+# Code used for characters without a Morse equivalent; it is not in
+# MORSE_CODE_DICT, so morse_to_text turns it into the usual '_'
+UNKNOWN_MORSE = '..--.-'
+# str.translate table mapping every known character to its code plus the
+# letter separator
+_ENCODE_TABLE = str.maketrans({char: code + ' ' for char, code in TEXT_TO_MORSE_DICT.items()})
+_ENCODABLE = frozenset(TEXT_TO_MORSE_DICT)
+
+
+def text_to_morse(text):
+    """Encode text as Morse: letters separated by ' ', words by ' / '."""
+    if not text:
+        return ''
+    if _ENCODABLE.issuperset(text):
+        return text.translate(_ENCODE_TABLE)[:-1]
+    return ' '.join([TEXT_TO_MORSE_DICT.get(char, UNKNOWN_MORSE) for char in text])
+
+
+def iter_text_to_morse(chunks):
+    """Encode an iterable of text chunks lazily, yielding Morse pieces.
+
+    Joining the yielded pieces gives text_to_morse() of the joined chunks.
+    """
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        encoded = text_to_morse(chunk)
+        yield encoded if first else ' ' + encoded
+        first = False
+
+
+class _TrieNode:
+    __slots__ = ('char', 'children')
+
+    def __init__(self):
+        self.char = None
+        self.children = {}
+
+
+def _build_trie(code_dict):
+    root = _TrieNode()
+    for code, char in code_dict.items():
+        node = root
+        for symbol in code:
+            node = node.children.setdefault(symbol, _TrieNode())
+        node.char = char
+    return root
+
+
+MORSE_TRIE = _build_trie(MORSE_CODE_DICT)
+
+
+class MorseDecoder:
+    """Incremental Morse decoder that walks a trie one symbol at a time.
+
+    feed() accepts a single character of Morse input ('.', '-', ' ', '/')
+    and returns the change to the translation as a (retract, text) pair:
+    drop `retract` characters from the end of the previous translation,
+    then append `text`. The running translation always equals
+    morse_to_text() of everything fed so far, at O(1) cost per symbol.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._node = MORSE_TRIE
+        self._tail = '_'  # translation of the letter currently being keyed
+        self._parts = []  # translations of completed letters
+        self._pending_space = []
+        self._started = False
+
+    @property
+    def text(self):
+        """The full translation of everything fed so far."""
+        return ''.join(self._parts) + self._tail
+
+    def _step(self, symbol):
+        node = self._node
+        if node is not None:
+            node = node.children.get(symbol)
+        self._node = node
+        self._tail = (node.char or '_') if node is not None else '_'
+
+    def feed(self, symbol):
+        if symbol.isspace():
+            # Whitespace only counts once something follows it, matching
+            # the strip() in morse_to_text
+            if self._started:
+                self._pending_space.append(symbol)
+            return 0, ''
+
+        old_tail = self._tail
+        committed = len(self._parts)
+        for space in self._pending_space:
+            if space == ' ':
+                self._parts.append(self._tail)
+                self._node = MORSE_TRIE
+                self._tail = '_'
+            else:
+                self._step(space)
+        self._pending_space.clear()
+        self._started = True
+        self._step(symbol)
+
+        new = ''.join(self._parts[committed:]) + self._tail
+        common = 0
+        while common < len(old_tail) and common < len(new) and old_tail[common] == new[common]:
+            common += 1
+        return len(old_tail) - common, new[common:]
+
+    def feed_many(self, symbols):
+        """Feed several symbols and return their combined (retract, text) change."""
+        retract = 0
+        text = ''
+        for symbol in symbols:
+            drop, added = self.feed(symbol)
+            if drop > len(text):
+                retract += drop - len(text)
+                text = added
+            else:
+                text = text[:len(text) - drop] + added
+        return retract, text
+
+
+# Marks message boundaries when a batch is translated as one joined string.
+# Translations never contain it, so it survives the lookup untouched.
+_BATCH_SEPARATOR = '\x00'
+_BATCH_TABLE = dict(MORSE_CODE_DICT)
+_BATCH_TABLE[_BATCH_SEPARATOR] = _BATCH_SEPARATOR
+DEFAULT_BATCH_CHUNK_SIZE = 50000
+
+
+def _translate_chunk(messages):
+    if not messages:
+        return []
+    stripped = [message.strip() for message in messages]
+    joined = f' {_BATCH_SEPARATOR} '.join(stripped)
+    if joined.count(_BATCH_SEPARATOR) != len(messages) - 1:
+        # A message contains the separator itself; fall back to the scalar path
+        return [morse_to_text(message) for message in messages]
+    # Splitting on single spaces and mapping every token reproduces
+    # morse_to_text exactly: a ' / ' word break is the '/' token, which
+    # translates to the same ' ' that joins words.
+    tokens = joined.split(' ')
+    translated = ''.join(map(_BATCH_TABLE.get, tokens, repeat('_')))
+    return translated.split(_BATCH_SEPARATOR)
+
+
+def morse_to_text_batch(messages, workers=None, chunk_size=DEFAULT_BATCH_CHUNK_SIZE):
+    """Translate a list of Morse messages in one call.
+
+    Returns the same list as [morse_to_text(m) for m in messages], but does
+    the splitting and lookups over one joined string at C speed. With
+    workers > 1, chunks of chunk_size messages are translated in a process
+    pool (callers on Windows need the usual __main__ guard).
+    """
+    messages = list(messages)
+    if not workers or workers < 2 or len(messages) <= chunk_size:
+        return _translate_chunk(messages)
+    chunks = [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for translated in executor.map(_translate_chunk, chunks):
+            results.extend(translated)
+    return results
+
+
+def morse_buffer_to_text(buffer, delimiter='\n', workers=None, chunk_size=DEFAULT_BATCH_CHUNK_SIZE):
+    """Translate a buffer (str or UTF-8 bytes) of delimiter-separated messages."""
+    if isinstance(buffer, (bytes, bytearray, memoryview)):
+        buffer = bytes(buffer).decode('utf-8')
+    if not buffer:
+        return []
+    messages = buffer.split(delimiter)
+    if buffer.endswith(delimiter):
+        messages.pop()
+    return morse_to_text_batch(messages, workers, chunk_size)
@@ -0,0 +1,355 @@
+"""UDP multicast (or LAN broadcast) fan-out of translated messages.
+
+Over TCP every broadcast costs one queued frame and one write per client.
+With a multicast group configured, the server instead sends each message
+once as a UDP datagram that every subscribed client on the LAN receives:
+
+    'MC' | kind (1 byte) | stream (4) | sequence (8) | sender (4) | room length (2) | room | message
+
+all big-endian, room and message UTF-8. The stream is a random id picked
+when the publisher starts, so subscribers notice a server restart. DATA
+datagrams carry consecutive sequence numbers; while no message is sent, a
+HEARTBEAT every second carries the next sequence number so that losing
+the last message of a burst is noticed too.
+
+Clients opt in over their TCP connection with MULTICAST_SUBSCRIBE. The
+server answers MULTICAST_ACCEPT followed by 'group port member stream
+next-sequence' and leaves the client out of TCP fan-out from then on.
+UDP may drop or reorder datagrams, so a subscriber delivers in sequence
+order and asks for the missing ones with a NACK control frame (a range of
+sequence numbers). The server keeps its last datagrams in a retransmit
+ring and resends them over TCP as MULTICAST_RETRANSMIT frames; anything
+that already fell out of the ring is reported as MULTICAST_LOST. A client
+that can't receive the group sends MULTICAST_UNSUBSCRIBE and is back on
+TCP fan-out.
+"""
+import ipaddress
+import itertools
+import random
+import socket
+import struct
+import threading
+import time
+
+DATA = 0
+HEARTBEAT = 1
+DATAGRAM_MAGIC = b'MC'
+DATAGRAM_HEADER = struct.Struct('!2sBIQIH')
+# The largest UDP payload over IPv4; longer messages only go through the
+# retransmit path
+MAX_DATAGRAM_SIZE = 65507
+SEQUENCE_RANGE = struct.Struct('!QQ')
+MULTICAST_SUBSCRIBE = b'\x00MCAST-SUB'
+MULTICAST_UNSUBSCRIBE = b'\x00MCAST-UNSUB'
+MULTICAST_ACCEPT = b'\x00MCAST '
+MULTICAST_NACK = b'\x00MCAST-NACK '
+MULTICAST_RETRANSMIT = b'\x00MCAST-RTX '
+MULTICAST_LOST = b'\x00MCAST-LOST '
+DEFAULT_MULTICAST_PORT = 5556
+DEFAULT_TTL = 1
+DEFAULT_HISTORY = 4096
+HEARTBEAT_INTERVAL = 1.0
+# A subscriber repeats a NACK that hasn't been answered after this long
+NACK_RETRY = 0.5
+# Most sequence numbers one NACK asks for
+MAX_NACK_SPAN = DEFAULT_HISTORY
+
+
+def encode_datagram(kind, stream, sequence, sender, room, message):
+    room = room.encode('utf-8')
+    return DATAGRAM_HEADER.pack(DATAGRAM_MAGIC, kind, stream, sequence, sender, len(room)) + room + message
+
+
+def decode_datagram(data):
+    """(kind, stream, sequence, sender, room, message) of a datagram, or None if malformed."""
+    if len(data) < DATAGRAM_HEADER.size:
+        return None
+    magic, kind, stream, sequence, sender, room_length = DATAGRAM_HEADER.unpack_from(data)
+    if magic != DATAGRAM_MAGIC:
+        return None
+    start = DATAGRAM_HEADER.size
+    try:
+        room = bytes(data[start:start + room_length]).decode('utf-8')
+        message = bytes(data[start + room_length:]).decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    return kind, stream, sequence, sender, room, message
+
+
+def nack_payload(first, last):
+    """Control payload asking the server to resend sequence numbers first..last."""
+    return MULTICAST_NACK + SEQUENCE_RANGE.pack(first, last)
+
+
+def parse_range(data):
+    """(first, last) of a NACK or LOST body, or None."""
+    if len(data) != SEQUENCE_RANGE.size:
+        return None
+    first, last = SEQUENCE_RANGE.unpack(data)
+    return (first, last) if first <= last else None
+
+
+def is_multicast(group):
+    return ipaddress.ip_address(group).is_multicast
+
+
+class MulticastPublisher:
+    """Sends every message once to the group and keeps the last `history` for retransmits."""
+
+    def __init__(self, group, port=DEFAULT_MULTICAST_PORT, interface=None, ttl=DEFAULT_TTL,
+                 history=DEFAULT_HISTORY):
+        self.group = group
+        self.port = port
+        self.stream = random.getrandbits(32)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if is_multicast(group):
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+            # Subscribers on this host (and loopback tests) get a copy too
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            if interface:
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+        else:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        # Slot sequence % history holds (sequence, datagram)
+        self.ring = [None] * history
+        self.next_sequence = 0
+        self.member_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.closing = threading.Event()
+        self.heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name='multicast-heartbeat',
+                                                 daemon=True)
+        self.last_send = 0.0
+        self.published = 0
+        self.heartbeats = 0
+        self.send_errors = 0
+        self.nacks = 0
+        self.retransmitted = 0
+        self.lost = 0
+
+    def start(self):
+        self.heartbeat_thread.start()
+        return self
+
+    def new_member(self):
+        """Id a subscriber uses to recognise (and skip) its own messages."""
+        return next(self.member_ids)
+
+    def accept_payload(self, member):
+        """MULTICAST_ACCEPT control payload for a new subscriber."""
+        return MULTICAST_ACCEPT + (f"{self.group} {self.port} {member} {self.stream} "
+                                   f"{self.next_sequence}").encode('ascii')
+
+    def publish(self, room, sender, message):
+        """Send a message to the group once; returns its sequence number."""
+        with self.lock:
+            sequence = self.next_sequence
+            datagram = encode_datagram(DATA, self.stream, sequence, sender, room, message.encode('utf-8'))
+            self.ring[sequence % len(self.ring)] = (sequence, datagram)
+            self.next_sequence += 1
+            self.published += 1
+            # A datagram that can't be sent leaves a gap the subscribers
+            # fill over TCP
+            self._send(datagram)
+        return sequence
+
+    def _send(self, datagram):
+        self.last_send = time.monotonic()
+        if len(datagram) > MAX_DATAGRAM_SIZE:
+            self.send_errors += 1
+            return
+        try:
+            self.sock.sendto(datagram, (self.group, self.port))
+        except OSError:
+            self.send_errors += 1
+
+    def _heartbeat_loop(self):
+        while not self.closing.wait(HEARTBEAT_INTERVAL):
+            with self.lock:
+                if time.monotonic() - self.last_send >= HEARTBEAT_INTERVAL:
+                    self._send(encode_datagram(HEARTBEAT, self.stream, self.next_sequence, 0, '', b''))
+                    self.heartbeats += 1
+
+    def retransmit(self, first, last):
+        """Control payloads answering a NACK for first..last.
+
+        Datagrams still in the ring come back as MULTICAST_RETRANSMIT
+        frames; older ones are reported in one MULTICAST_LOST frame.
+        """
+        with self.lock:
+            self.nacks += 1
+            last = min(last, self.next_sequence - 1, first + MAX_NACK_SPAN - 1)
+            oldest = max(self.next_sequence - len(self.ring), 0)
+            payloads = []
+            if first < oldest and first <= last:
+                payloads.append(MULTICAST_LOST + SEQUENCE_RANGE.pack(first, min(last, oldest - 1)))
+                self.lost += min(last, oldest - 1) - first + 1
+                first = oldest
+            for sequence in range(first, last + 1):
+                payloads.append(MULTICAST_RETRANSMIT + self.ring[sequence % len(self.ring)][1])
+            self.retransmitted += max(last - first + 1, 0)
+        return payloads
+
+    def close(self):
+        self.closing.set()
+        self.sock.close()
+
+    def stats(self):
+        return {
+            'group': f"{self.group}:{self.port}",
+            'next_sequence': self.next_sequence,
+            'published': self.published,
+            'heartbeats': self.heartbeats,
+            'send_errors': self.send_errors,
+            'nacks': self.nacks,
+            'retransmitted': self.retransmitted,
+            'lost': self.lost,
+        }
+
+
+def parse_accept(payload):
+    """(group, port, member, stream, next sequence) of a MULTICAST_ACCEPT payload, or None."""
+    try:
+        group, port, member, stream, sequence = payload[len(MULTICAST_ACCEPT):].decode('ascii').split()
+        return group, int(port), int(member), int(stream), int(sequence)
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+class MulticastSubscriber:
+    """Receives the group's datagrams and hands the messages on in sequence order.
+
+    on_message(room, message) is called for every message except the
+    subscriber's own; request(first, last) should send a NACK over the TCP
+    connection. Retransmits and LOST reports arriving over TCP are passed
+    to handle_datagram() and skip().
+    """
+
+    def __init__(self, group, port, member, stream, next_sequence, on_message, request, interface='0.0.0.0'):
+        self.group = group
+        self.port = port
+        self.on_message = on_message
+        self.request = request
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('', port))
+        if is_multicast(group):
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                                 socket.inet_aton(group) + socket.inet_aton(interface))
+        self.sock.settimeout(NACK_RETRY)
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._receive_loop, name='multicast-subscriber', daemon=True)
+        self.closed = False
+        self.pending = {}
+        self.stats_counters = {'received': 0, 'delivered': 0, 'duplicates': 0, 'recovered': 0,
+                               'lost': 0, 'nacks': 0, 'resubscribed': 0}
+        self.member = member
+        self.stream = stream
+        self._reset(next_sequence)
+
+    def _reset(self, next_sequence):
+        self.expected = next_sequence
+        # Highest sequence number known to exist, and the highest one asked for
+        self.latest = next_sequence - 1
+        self.requested = next_sequence - 1
+        self.last_request = 0.0
+        self.pending.clear()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def resubscribe(self, member, stream, next_sequence):
+        """Take the values of a new MULTICAST_ACCEPT (after a reconnect).
+
+        Against the same server the position is kept and the gap is
+        NACKed; a restarted server has a new stream and starts over.
+        """
+        with self.lock:
+            self.member = member
+            self.stats_counters['resubscribed'] += 1
+            if stream != self.stream:
+                self.stream = stream
+                self._reset(next_sequence)
+
+    def _receive_loop(self):
+        while not self.closed:
+            try:
+                data = self.sock.recv(MAX_DATAGRAM_SIZE)
+            except socket.timeout:
+                with self.lock:
+                    self._request_missing()
+                continue
+            except OSError:
+                break
+            self.handle_datagram(data, retransmit=False)
+
+    def handle_datagram(self, data, retransmit=True):
+        decoded = decode_datagram(data)
+        if decoded is None:
+            return
+        kind, stream, sequence, sender, room, message = decoded
+        with self.lock:
+            if stream != self.stream:
+                return
+            if kind == HEARTBEAT:
+                self.latest = max(self.latest, sequence - 1)
+            elif sequence < self.expected or sequence in self.pending:
+                self.stats_counters['duplicates'] += 1
+                return
+            else:
+                self.stats_counters['recovered' if retransmit else 'received'] += 1
+                self.pending[sequence] = (sender, room, message)
+                self.latest = max(self.latest, sequence)
+            self._deliver_ready()
+            self._request_missing()
+
+    def skip(self, first, last):
+        """The server no longer has first..last; stop waiting for them."""
+        with self.lock:
+            if first > self.expected or last < self.expected:
+                return
+            self.stats_counters['lost'] += last - self.expected + 1
+            for sequence in range(self.expected, last + 1):
+                self.pending.pop(sequence, None)
+            self.expected = last + 1
+            self._deliver_ready()
+
+    def _deliver_ready(self):
+        while self.expected in self.pending:
+            sender, room, message = self.pending.pop(self.expected)
+            self.expected += 1
+            if sender != self.member:
+                self.stats_counters['delivered'] += 1
+                self.on_message(room, message)
+
+    def _request_missing(self):
+        """NACK gaps below `latest`: new ones at once, all of them again every NACK_RETRY."""
+        if self.expected > self.latest:
+            return
+        now = time.monotonic()
+        if now - self.last_request >= NACK_RETRY:
+            start = self.expected
+            self.last_request = now
+        elif self.latest > self.requested:
+            start = max(self.requested + 1, self.expected)
+        else:
+            return
+        self.requested = self.latest
+        end = min(self.latest, start + MAX_NACK_SPAN - 1)
+        first = None
+        for sequence in range(start, end + 2):
+            if sequence <= end and sequence not in self.pending:
+                if first is None:
+                    first = sequence
+            elif first is not None:
+                self.stats_counters['nacks'] += 1
+                self.request(first, sequence - 1)
+                first = None
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+    def stats(self):
+        with self.lock:
+            return {**self.stats_counters, 'expected': self.expected, 'pending': len(self.pending)}
@@ -0,0 +1,68 @@
+"""Token buckets for the server's rate limits and admission control.
+
+A bucket holds up to `burst` tokens and refills at `rate` tokens per
+second; every admitted event takes one. A client may send a short burst
+at any speed, but over time no faster than the rate, and checking costs a
+few float operations with no timers or threads.
+
+The server keeps one bucket per connection, one per source address
+(shared by all connections from that address, so opening more
+connections doesn't raise the limit) and one for accepting connections.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+RATE_LIMIT_POLICIES = ('drop', 'disconnect')
+# Source addresses tracked at once; the least recently seen are forgotten first
+DEFAULT_MAX_ADDRESSES = 65536
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average and bursts of up to `burst`."""
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        # One second's worth by default, and room for at least one event
+        self.burst = max(burst or rate, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def consume(self, now=None):
+        """Take a token if one is available; False means over the limit."""
+        now = time.monotonic() if now is None else now
+        # A time read just before the bucket was created must not take tokens away
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AddressBuckets:
+    """A TokenBucket per source address, safe to share between handler threads."""
+
+    def __init__(self, rate, burst=None, max_addresses=DEFAULT_MAX_ADDRESSES):
+        self.rate = rate
+        self.burst = burst
+        self.max_addresses = max_addresses
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, address, now=None):
+        with self.lock:
+            bucket = self.buckets.get(address)
+            if bucket is None:
+                bucket = self.buckets[address] = TokenBucket(self.rate, self.burst)
+                if len(self.buckets) > self.max_addresses:
+                    # A forgotten address starts again with a full bucket
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(address)
+            return bucket.consume(now)
+
+    def __len__(self):
+        return len(self.buckets)
@@ -0,0 +1,134 @@
+"""Named rooms (independent nets) that clients join.
+
+Every connection is a member of exactly one room, the default room until
+it sends a JOIN control frame. A broadcast only reaches the members of
+the sender's room, so its cost depends on the room size rather than on
+the total number of connections.
+
+Membership changes take the registry lock. Broadcasts don't: each room
+keeps an immutable snapshot of its members that is rebuilt on the next
+broadcast after a change, so the hot path is a dict lookup and a loop
+over a tuple.
+
+Members that receive broadcasts some other way (multicast subscribers)
+can be muted: they stay in their room but are left out of the snapshot.
+
+History replayed to a connection is tagged with its room (REPLAY_PREFIX,
+the room, a NUL, the message): a client that asked for another room
+receives the default room's history before the server sees its JOIN,
+and drops it.
+"""
+import threading
+
+DEFAULT_ROOM = 'main'
+MAX_ROOM_NAME_LENGTH = 64
+JOIN_PREFIX = b'\x00JOIN '
+JOINED_PREFIX = b'\x00JOINED '
+REPLAY_PREFIX = b'\x00REPLAY '
+
+
+def join_frame_payload(room):
+    """Control payload asking the server to move this connection to `room`."""
+    return JOIN_PREFIX + room.encode('utf-8')
+
+
+def replay_frame_payload(room, message):
+    """Control payload carrying a logged message of `room`."""
+    return REPLAY_PREFIX + room.encode('utf-8') + b'\x00' + message.encode('utf-8')
+
+
+def parse_replay(payload):
+    """(room, message) of a replay payload (with REPLAY_PREFIX), or None."""
+    room, separator, message = bytes(payload[len(REPLAY_PREFIX):]).partition(b'\x00')
+    if not separator:
+        return None
+    return room.decode('utf-8', errors='replace'), message.decode('utf-8', errors='replace')
+
+
+def parse_room_name(data):
+    """Validated room name from raw bytes, or None."""
+    try:
+        room = bytes(data).decode('utf-8').strip()
+    except UnicodeDecodeError:
+        return None
+    if not room or len(room) > MAX_ROOM_NAME_LENGTH or not room.isprintable():
+        return None
+    return room
+
+
+class RoomRegistry:
+    """Room membership with an indexed subscriber set per room."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # room name -> {connection: None}; a dict keeps join order and
+        # gives O(1) membership changes
+        self.rooms = {}
+        self.memberships = {}
+        self.snapshots = {}
+        self.muted = set()
+
+    def join(self, connection, room=DEFAULT_ROOM):
+        """Move a connection into a room; returns the room it left (or None)."""
+        with self.lock:
+            previous = self.memberships.get(connection)
+            if previous == room:
+                return previous
+            if previous is not None:
+                self._remove(connection, previous)
+            self.rooms.setdefault(room, {})[connection] = None
+            self.memberships[connection] = room
+            self.snapshots.pop(room, None)
+            return previous
+
+    def leave(self, connection):
+        """Remove a connection from its room; returns that room (or None)."""
+        with self.lock:
+            room = self.memberships.pop(connection, None)
+            self.muted.discard(connection)
+            if room is not None:
+                self._remove(connection, room)
+            return room
+
+    def _remove(self, connection, room):
+        members = self.rooms[room]
+        del members[connection]
+        if not members:
+            del self.rooms[room]
+        self.snapshots.pop(room, None)
+
+    def mute(self, connection):
+        """Leave a connection out of its room's broadcast snapshots."""
+        with self.lock:
+            self.muted.add(connection)
+            self.snapshots.pop(self.memberships.get(connection), None)
+
+    def unmute(self, connection):
+        with self.lock:
+            self.muted.discard(connection)
+            self.snapshots.pop(self.memberships.get(connection), None)
+
+    def room_of(self, connection):
+        return self.memberships.get(connection)
+
+    def members(self, room):
+        """Tuple of the room's members, safe to iterate without the lock."""
+        snapshot = self.snapshots.get(room)
+        if snapshot is None:
+            with self.lock:
+                snapshot = tuple(connection for connection in self.rooms.get(room, ())
+                                 if connection not in self.muted)
+                self.snapshots[room] = snapshot
+        return snapshot
+
+    def clear(self):
+        with self.lock:
+            self.rooms.clear()
+            self.memberships.clear()
+            self.snapshots.clear()
+            self.muted.clear()
+
+    def stats(self):
+        with self.lock:
+            sizes = [len(members) for members in self.rooms.values()]
+        return {'rooms': len(sizes), 'largest': max(sizes, default=0)}
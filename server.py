@@ -1,12 +1,245 @@
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
+import signal
 import socket
+import struct
 import threading
+import time
 import os
 import keyboard
 from dotenv import load_dotenv, dotenv_values, set_key
-from morse_dict import morse_to_text
+from framing import DEFAULT_POOL_SIZE, BufferPool, FrameDecoder, FrameError, ReceiveBuffer, encode_frame
+from keying import KEYING_END, KEYING_PREFIX, KEYING_RESET, AdaptiveKeyer, unpack_events
+from message_log import DEFAULT_FSYNC_INTERVAL, DEFAULT_SEGMENT_SIZE, MessageLog
+from metrics import StatsServer, metrics, profiler
+from ratelimit import RATE_LIMIT_POLICIES, AddressBuckets, TokenBucket
+from multicast import (DEFAULT_HISTORY, DEFAULT_MULTICAST_PORT, DEFAULT_TTL, MULTICAST_NACK,
+                       MULTICAST_SUBSCRIBE, MULTICAST_UNSUBSCRIBE, MulticastPublisher, parse_range)
+from morse_binary import BINARY_ACCEPT, BINARY_HELLO, is_binary, is_control, unpack_morse
+from rooms import DEFAULT_ROOM, JOIN_PREFIX, JOINED_PREFIX, RoomRegistry, parse_room_name, replay_frame_payload
+from translation_cache import DEFAULT_MESSAGE_CACHE_SIZE, DEFAULT_WORD_CACHE_SIZE, TranslationCache
 
 ENV_PATH = '.env'
-clients = []
+RECV_BUFFER_SIZE = 4096
+# Receive buffers (twice RECV_BUFFER_SIZE, so every read has room for at
+# least RECV_BUFFER_SIZE bytes) kept for reuse after their connection closes
+RECV_BUFFER_POOL_SIZE = DEFAULT_POOL_SIZE
+DEFAULT_BACKLOG = 128
+DEFAULT_MAX_CONNECTIONS = 10000
+DEFAULT_OUTBOUND_QUEUE_SIZE = 1024
+DEFAULT_SLOW_CONSUMER_POLICY = 'drop'
+SLOW_CONSUMER_POLICIES = ('drop', 'disconnect')
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+# While a client is busy, outbound frames are held for up to this long and
+# written together; a client that has been idle this long gets its next
+# frame immediately
+COALESCE_WINDOW = 0.002
+SHUTDOWN_DRAIN_TIMEOUT = 5.0
+# Raw keying longer than this many Morse symbols is sent as a message
+# without waiting for the client's KEYING_END
+MAX_KEYED_LENGTH = 4096
+# Set by workers.py so several worker processes can accept on the same port
+REUSE_PORT = False
+TRANSLATION_CACHE_SIZE = DEFAULT_MESSAGE_CACHE_SIZE
+TRANSLATION_WORD_CACHE_SIZE = DEFAULT_WORD_CACHE_SIZE
+TRANSLATION_CACHE_POLICY = 'lru'
+LOG_LEVEL = 'INFO'
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+# Local HTTP endpoint serving server_stats() and the profiler; off when None
+STATS_HOST = '127.0.0.1'
+STATS_PORT = None
+# Directory of the persistent message log; off when None. New connections
+# (and room joins) get the last MESSAGE_LOG_REPLAY messages of their room.
+MESSAGE_LOG_DIR = None
+MESSAGE_LOG_REPLAY = 20
+MESSAGE_LOG_SEGMENT_SIZE = DEFAULT_SEGMENT_SIZE
+MESSAGE_LOG_FSYNC_INTERVAL = DEFAULT_FSYNC_INTERVAL
+# UDP group (multicast or broadcast address) that subscribed clients get
+# broadcasts from instead of TCP; off when None. MULTICAST_INTERFACE is the
+# local address to send from (the listening address by default).
+MULTICAST_GROUP = None
+MULTICAST_PORT = DEFAULT_MULTICAST_PORT
+MULTICAST_INTERFACE = None
+MULTICAST_TTL = DEFAULT_TTL
+MULTICAST_HISTORY = DEFAULT_HISTORY
+# Token-bucket limits, 0 disables each: frames per second from one
+# connection and from one source address (all its connections together),
+# and new connections per second. A burst of 0 allows one second's worth.
+# Frames over a limit are dropped, or with the 'disconnect' policy the
+# connection is closed.
+CLIENT_RATE_LIMIT = 0
+CLIENT_RATE_BURST = 0
+ADDRESS_RATE_LIMIT = 0
+ADDRESS_RATE_BURST = 0
+ACCEPT_RATE_LIMIT = 0
+ACCEPT_RATE_BURST = 0
+RATE_LIMIT_POLICY = 'drop'
+# Once more than this many frames wait in the outbound queues of all
+# clients together, incoming messages are dropped until the backlog is
+# back under half of it; 0 disables load shedding
+LOAD_SHED_HIGH_WATER = 0
+LOAD_SHED_CHECK_INTERVAL = 0.1
+# Every connected client (a dict used as an ordered set), guarded by clients_lock
+clients = {}
+clients_lock = threading.Lock()
+rooms = RoomRegistry()
+receive_buffers = BufferPool(2 * RECV_BUFFER_SIZE, RECV_BUFFER_POOL_SIZE)
+# In multi-worker mode, relays broadcasts to the other worker processes
+message_bus = None
+# The running event loop in asyncio mode, for deliveries from other threads
+event_loop = None
+translation_cache = TranslationCache(TRANSLATION_CACHE_SIZE, TRANSLATION_WORD_CACHE_SIZE,
+                                     TRANSLATION_CACHE_POLICY)
+logger = logging.getLogger('morse.server')
+log_listener = None
+stats_server = None
+address_limits = None
+accept_limit = None
+shedding = False
+shed_checked = 0.0
+message_log = None
+multicast = None
+
+
+def setup_logging():
+    """Route server logs through a queue so the hot path never waits on the console.
+
+    The QueueListener thread does the formatting and writing. Call again
+    in a forked worker, which does not inherit the listener thread.
+    """
+    global log_listener
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_listener = logging.handlers.QueueListener(log_queue, handler)
+    log_listener.start()
+    logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    logger.propagate = False
+    logger.setLevel(LOG_LEVEL)
+
+
+def stop_logging():
+    """Flush pending log records and stop the listener thread."""
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+
+atexit.register(stop_logging)
+
+
+def open_message_log(directory=None):
+    """Start appending broadcasts to the message log in `directory` (MESSAGE_LOG_DIR by default)."""
+    global message_log
+    directory = directory or MESSAGE_LOG_DIR
+    if not directory:
+        return None
+    message_log = MessageLog(directory, MESSAGE_LOG_SEGMENT_SIZE, MESSAGE_LOG_FSYNC_INTERVAL,
+                             recent_size=MESSAGE_LOG_REPLAY).start()
+    logger.info("Logging messages to %s (from sequence %d)", directory, message_log.next_sequence)
+    return message_log
+
+
+def close_message_log():
+    """Write out and fsync everything still queued for the message log."""
+    global message_log
+    if message_log is not None:
+        message_log.close()
+        message_log = None
+
+
+atexit.register(close_message_log)
+
+
+def open_multicast(interface=None):
+    """Start publishing broadcasts to MULTICAST_GROUP (if set)."""
+    global multicast
+    if not MULTICAST_GROUP:
+        return None
+    interface = MULTICAST_INTERFACE or interface
+    multicast = MulticastPublisher(MULTICAST_GROUP, MULTICAST_PORT, interface, MULTICAST_TTL,
+                                   MULTICAST_HISTORY).start()
+    logger.info("Publishing messages to %s:%s via %s", MULTICAST_GROUP, MULTICAST_PORT, interface or 'default')
+    return multicast
+
+
+def close_multicast():
+    global multicast
+    if multicast is not None:
+        multicast.close()
+        multicast = None
+
+
+atexit.register(close_multicast)
+
+
+def apply_settings():
+    """Rebuild the shared server components from the module-level settings."""
+    global translation_cache, address_limits, accept_limit
+    if RATE_LIMIT_POLICY not in RATE_LIMIT_POLICIES:
+        raise ValueError(f"Unknown rate limit policy: {RATE_LIMIT_POLICY}")
+    translation_cache = TranslationCache(TRANSLATION_CACHE_SIZE, TRANSLATION_WORD_CACHE_SIZE,
+                                         TRANSLATION_CACHE_POLICY)
+    address_limits = AddressBuckets(ADDRESS_RATE_LIMIT, ADDRESS_RATE_BURST) if ADDRESS_RATE_LIMIT else None
+    accept_limit = TokenBucket(ACCEPT_RATE_LIMIT, ACCEPT_RATE_BURST) if ACCEPT_RATE_LIMIT else None
+    logger.setLevel(LOG_LEVEL)
+
+
+def server_stats():
+    """Snapshot of server counters, hot-path metrics and queue depths."""
+    live = list(clients)
+    depths = [client.queue_depth() for client in live]
+    snapshot = metrics.snapshot()
+    counters = snapshot['counters']
+    # Closed clients added their send calls to the counter already
+    counters['send_calls'] = counters.get('send_calls', 0) + sum(client.send_calls for client in live)
+    deliveries = counters.get('deliveries', 0)
+    return {
+        'clients': len(live),
+        'queued': sum(depths),
+        'max_queue_depth': max(depths, default=0),
+        'dropped': sum(client.dropped for client in live),
+        'rooms': rooms.stats(),
+        'receive_buffers': receive_buffers.stats(),
+        'shedding': shedding,
+        'tracked_addresses': len(address_limits) if address_limits is not None else 0,
+        'deliveries_per_sec': deliveries / snapshot['uptime'] if snapshot['uptime'] else 0.0,
+        'send_calls_per_delivery': counters['send_calls'] / deliveries if deliveries else 0.0,
+        'translation_cache': translation_cache.stats(),
+        'message_log': message_log.stats() if message_log is not None else None,
+        'multicast': multicast.stats() if multicast is not None else None,
+        **snapshot,
+    }
+
+
+def client_stats():
+    """Per-client traffic counters and outbound queue depths."""
+    return [client.stats() for client in list(clients)]
+
+
+def start_stats_server(port=None):
+    """Serve server_stats() and the profiler on STATS_HOST (if a port is set)."""
+    global stats_server
+    port = STATS_PORT if port is None else port
+    if not port:
+        return None
+    stats_server = StatsServer((STATS_HOST, port), server_stats, client_stats, profiler)
+    stats_server.start()
+    logger.info("Stats endpoint on http://%s:%s/stats", STATS_HOST, port)
+    return stats_server
+
+
+shutdown_event = threading.Event()
+shutdown_hooks = []
 
 
 def get_server_ip():
@@ -37,85 +270,762 @@ def ensure_env_updated(env_path=ENV_PATH, server_ip='127.0.0.1', default_port='5
     else:
         with open(env_path, 'w') as f:
             f.write(f"SERVER_PORT={default_port}\nSERVER_IP={server_ip}\n")
-        print("[INFO] .env file created with default values.")
+        logger.info(".env file created with default values.")
         return
 
     # Update SERVER_IP if different
     current_ip = env_vars.get("SERVER_IP")
     if current_ip != server_ip:
-        print(f"[INFO] SERVER_IP in .env is outdated ({current_ip}), updating to {server_ip}")
+        logger.info("SERVER_IP in .env is outdated (%s), updating to %s", current_ip, server_ip)
         set_key(env_path, "SERVER_IP", server_ip)
 
     # Add default SERVER_PORT if missing
     if "SERVER_PORT" not in env_vars:
-        print(f"[INFO] SERVER_PORT missing in .env, setting default to {default_port}")
+        logger.info("SERVER_PORT missing in .env, setting default to %s", default_port)
         set_key(env_path, "SERVER_PORT", default_port)
 
 
-def client_handler(client_socket, client_address):
-    """Handle communication with each client."""
-    print(f"[NEW CONNECTION] {client_address} connected.")
-    while True:
+class BaseClientConnection:
+    """Common outbound-queue handling for a connected client.
+
+    Every client owns a bounded queue of encoded frames that is drained by
+    its own writer, so a slow receiver never blocks the sender or the other
+    clients. When the queue is full the slow consumer policy decides whether
+    the frame is dropped for that client or the client is disconnected.
+    """
+    queue_full_error = queue.Full
+
+    def __init__(self, address, queue_size, slow_consumer_policy):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.address = address
+        self.slow_consumer_policy = slow_consumer_policy
+        self.dropped = 0
+        self.closed = False
+        # Set once the client negotiated the binary Morse encoding
+        self.binary = False
+        # Raw keying state, created on the first keying frame
+        self.keyer = None
+        self.keyed = []
+        self.keyed_length = 0
+        # Nonzero once the client takes broadcasts from the multicast group
+        self.multicast_id = 0
+        self.rate_limit = TokenBucket(CLIENT_RATE_LIMIT, CLIENT_RATE_BURST) if CLIENT_RATE_LIMIT else None
+        self.rate_limited = 0
+        self.bytes_in = 0
+        self.messages_in = 0
+        self.bytes_out = 0
+        self.messages_out = 0
+        self.send_calls = 0
+        self.coalesce_window = COALESCE_WINDOW
+        self.last_send = 0.0
+
+    def is_idle(self):
+        """Nothing queued and nothing written within the coalescing window."""
+        return self.pending == 0 and time.monotonic() - self.last_send >= self.coalesce_window
+
+    def coalesce_delay(self):
+        """How long the writer should wait for more frames before flushing."""
+        return self.last_send + self.coalesce_window - time.monotonic()
+
+    def enqueue(self, frame):
+        """Queue an encoded frame for delivery without blocking."""
+        if self.closed:
+            return False
         try:
-            message = client_socket.recv(1024).decode('utf-8')
-            if message:
-                print(f"[{client_address}] Morse Code Message Received: {message}")
-                translated_message = morse_to_text(message)
-                print(f"[{client_address}] Translated Message: {translated_message}")
-                broadcast(client_socket, translated_message)
+            self._put(frame)
+            return True
+        except self.queue_full_error:
+            if self.slow_consumer_policy == 'disconnect':
+                logger.warning("%s is too slow, disconnecting.", self.address)
+                self.close()
             else:
+                self.dropped += 1
+            return False
+        except OSError:
+            self.close()
+            return False
+
+    def queue_depth(self):
+        return self.outbound.qsize()
+
+    def stats(self):
+        return {
+            'address': self.address,
+            'bytes_in': self.bytes_in,
+            'messages_in': self.messages_in,
+            'bytes_out': self.bytes_out,
+            'messages_out': self.messages_out,
+            'send_calls': self.send_calls,
+            'queue_depth': self.queue_depth(),
+            'dropped': self.dropped,
+            'rate_limited': self.rate_limited,
+            'binary': self.binary,
+            'room': rooms.room_of(self),
+            'multicast': bool(self.multicast_id),
+            'keying_wpm': round(self.keyer.wpm, 1) if self.keyer is not None else None,
+        }
+
+
+class ClientConnection(BaseClientConnection):
+    """A client served by a reader thread and a dedicated writer thread."""
+
+    def __init__(self, sock, address, queue_size=DEFAULT_OUTBOUND_QUEUE_SIZE,
+                 slow_consumer_policy=DEFAULT_SLOW_CONSUMER_POLICY):
+        super().__init__(address, queue_size, slow_consumer_policy)
+        self.sock = sock
+        self.outbound = queue.Queue(maxsize=queue_size)
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+
+    def start(self):
+        self.writer_thread.start()
+
+    def _put(self, frame):
+        size = len(frame)
+        with self.lock:
+            if MSG_DONTWAIT and self.pending == 0:
+                # Nothing is queued, so try to hand the frame straight to the
+                # kernel and only queue what doesn't fit. Waking the writer
+                # thread costs far more than the extra send call here.
+                try:
+                    sent = self.sock.send(frame, MSG_DONTWAIT)
+                except BlockingIOError:
+                    sent = 0
+                self.send_calls += 1
+                self.last_send = time.monotonic()
+                frame = frame[sent:]
+            if frame:
+                self.outbound.put_nowait(frame)
+                self.pending += 1
+            self.messages_out += 1
+            self.bytes_out += size
+
+    def _write_loop(self):
+        while not self.closed:
+            frames = [self.outbound.get()]
+            delay = self.coalesce_delay()
+            if delay > 0 and frames[0] is not None:
+                # Busy client: give the burst a moment to accumulate
+                time.sleep(delay)
+            # Send everything that queued up while we were waiting in one go
+            while True:
+                try:
+                    frames.append(self.outbound.get_nowait())
+                except queue.Empty:
+                    break
+            if None in frames or self.closed:
+                break
+            try:
+                calls = send_vectored(self.sock, frames)
+            except OSError:
+                self.close()
                 break
+            with self.lock:
+                self.pending -= len(frames)
+                self.send_calls += calls
+                self.last_send = time.monotonic()
+
+    def drain(self, deadline):
+        """Wait (until deadline) for queued frames to be sent, then close."""
+        while self.pending and not self.closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        try:
+            # Let the kernel flush what it already has before closing
+            self.sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        remove_client(self)
+        metrics.incr('send_calls', self.send_calls)
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        try:
+            # Wake the writer if it is waiting on an empty queue; a writer
+            # blocked in sendall is woken by the socket shutdown instead.
+            self.outbound.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class AsyncClientConnection(BaseClientConnection):
+    """A client served on the event loop with a writer task draining its queue."""
+    queue_full_error = asyncio.QueueFull
+
+    def __init__(self, writer, address, queue_size=DEFAULT_OUTBOUND_QUEUE_SIZE,
+                 slow_consumer_policy=DEFAULT_SLOW_CONSUMER_POLICY):
+        super().__init__(address, queue_size, slow_consumer_policy)
+        self.writer = writer
+        self.outbound = asyncio.Queue(maxsize=queue_size)
+        self.pending = 0
+        self.writer_task = None
+
+    def start(self):
+        self.writer_task = asyncio.get_running_loop().create_task(self._write_loop())
+
+    def _put(self, frame):
+        if self.is_idle() and not self.writer.transport.get_write_buffer_size():
+            # Flush on idle: the transport sends immediately when its buffer is empty
+            self.writer.write(frame)
+            self.send_calls += 1
+            self.last_send = time.monotonic()
+        else:
+            self.outbound.put_nowait(frame)
+            self.pending += 1
+        self.messages_out += 1
+        self.bytes_out += len(frame)
+
+    async def _write_loop(self):
+        try:
+            while not self.closed:
+                frames = [await self.outbound.get()]
+                delay = self.coalesce_delay()
+                if delay > 0:
+                    # Busy client: give the burst a moment to accumulate
+                    await asyncio.sleep(delay)
+                while not self.outbound.empty():
+                    frames.append(self.outbound.get_nowait())
+                self.pending -= len(frames)
+                # One transport write for the whole batch
+                self.writer.writelines(frames)
+                self.send_calls += 1
+                self.last_send = time.monotonic()
+                await self.writer.drain()
+        except (OSError, asyncio.CancelledError):
+            pass
+        finally:
+            self.close()
+
+    async def drain(self, deadline):
+        """Wait (until deadline) for queued frames to be sent, then close."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self.pending and not self.closed and loop.time() < deadline:
+                await asyncio.sleep(0.01)
+            if not self.closed:
+                await asyncio.wait_for(self.writer.drain(), max(deadline - loop.time(), 0))
+        except (OSError, asyncio.TimeoutError):
+            pass
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        remove_client(self)
+        metrics.incr('send_calls', self.send_calls)
+        if self.writer_task is not None and self.writer_task is not asyncio.current_task():
+            self.writer_task.cancel()
+        self.writer.close()
+
+
+def add_client(connection):
+    """Register a new connection, put it in the default room and replay its history."""
+    with clients_lock:
+        clients[connection] = None
+    rooms.join(connection, DEFAULT_ROOM)
+    replay_history(connection, DEFAULT_ROOM)
+
+
+def replay_history(connection, room):
+    """Queue the last MESSAGE_LOG_REPLAY logged messages of a room for a connection.
+
+    They come from the log's in-memory ring, so accepts and joins never
+    wait on a scan of the log. Each is tagged with the room: a client
+    about to join another room drops the default room's history.
+    """
+    if message_log is None or not MESSAGE_LOG_REPLAY:
+        return
+    messages = message_log.recent_messages(room, MESSAGE_LOG_REPLAY)
+    for message in messages:
+        connection.enqueue(encode_frame(replay_frame_payload(room, message)))
+    metrics.incr('replayed_messages', len(messages))
+
+
+def remove_client(connection):
+    with clients_lock:
+        clients.pop(connection, None)
+    rooms.leave(connection)
+
+
+def send_vectored(sock, frames):
+    """Write frames to a blocking socket with as few calls as possible.
+
+    Uses sendmsg() with one iovec per frame (no joining copy) where
+    available. Returns the number of send calls made.
+    """
+    if not HAS_SENDMSG:
+        sock.sendall(b''.join(frames))
+        return 1
+    frames = list(frames)
+    calls = 0
+    index = 0
+    while index < len(frames):
+        sent = sock.sendmsg(frames[index:index + IOV_MAX])
+        calls += 1
+        # Skip what went out completely and resume inside a partial frame
+        while sent:
+            size = len(frames[index])
+            if sent < size:
+                frames[index] = memoryview(frames[index])[sent:]
+                break
+            sent -= size
+            index += 1
+    return calls
+
+
+def handle_control(connection, payload):
+    """Answer a control frame (a payload starting with a NUL byte)."""
+    if payload == BINARY_HELLO:
+        connection.binary = True
+        connection.enqueue(encode_frame(BINARY_ACCEPT))
+        metrics.incr('binary_connections')
+    elif payload.startswith(JOIN_PREFIX):
+        room = parse_room_name(payload[len(JOIN_PREFIX):])
+        if room is None:
+            logger.debug("[%s] Ignoring invalid room name %r", connection.address, payload[:80])
+            return
+        rooms.join(connection, room)
+        connection.enqueue(encode_frame(JOINED_PREFIX + room.encode('utf-8')))
+        replay_history(connection, room)
+        metrics.incr('room_joins')
+        logger.debug("[%s] Joined room %s", connection.address, room)
+    elif payload == MULTICAST_SUBSCRIBE:
+        subscribe_multicast(connection)
+    elif payload == MULTICAST_UNSUBSCRIBE:
+        connection.multicast_id = 0
+        rooms.unmute(connection)
+    elif payload.startswith(MULTICAST_NACK):
+        handle_nack(connection, payload[len(MULTICAST_NACK):])
+    elif payload.startswith(KEYING_PREFIX):
+        handle_keying(connection, payload[len(KEYING_PREFIX):])
+    elif payload == KEYING_END:
+        finish_keying(connection)
+    elif payload == KEYING_RESET:
+        finish_keying(connection, send=False)
+    else:
+        logger.debug("[%s] Ignoring unknown control frame %r", connection.address, payload[:32])
+
+
+def subscribe_multicast(connection):
+    """Switch a client from TCP fan-out to the multicast group.
+
+    Without a multicast group the request goes unanswered and the client
+    stays on TCP.
+    """
+    if multicast is None or connection.multicast_id:
+        return
+    connection.multicast_id = multicast.new_member()
+    rooms.mute(connection)
+    connection.enqueue(encode_frame(multicast.accept_payload(connection.multicast_id)))
+    metrics.incr('multicast_subscribers')
+    logger.debug("[%s] Subscribed to multicast as member %d", connection.address, connection.multicast_id)
+
+
+def handle_nack(connection, data):
+    """Resend the multicast datagrams a subscriber missed over its TCP connection."""
+    requested = parse_range(data)
+    if multicast is None or requested is None:
+        return
+    for payload in multicast.retransmit(*requested):
+        connection.enqueue(encode_frame(payload))
+    metrics.incr('multicast_nacks')
+
+
+def handle_keying(connection, data):
+    """Decode raw key events with the connection's adaptive keyer."""
+    if connection.keyer is None:
+        connection.keyer = AdaptiveKeyer()
+    events = unpack_events(data)
+    symbols = connection.keyer.feed_events(events)
+    metrics.incr('key_events', len(events))
+    if symbols:
+        connection.keyed.append(symbols)
+        connection.keyed_length += len(symbols)
+        if connection.keyed_length > MAX_KEYED_LENGTH:
+            finish_keying(connection)
+
+
+def finish_keying(connection, send=True):
+    """Handle the Morse decoded from raw keying like a typed message (or discard it)."""
+    if connection.keyer is not None:
+        # Events held back while the keyer was still measuring the speed
+        connection.keyed.append(connection.keyer.end_message())
+    morse_code = ''.join(connection.keyed).strip()
+    connection.keyed.clear()
+    connection.keyed_length = 0
+    if connection.keyer is not None:
+        logger.debug("[%s] Keyed at %.1f WPM", connection.address, connection.keyer.wpm)
+    if morse_code and send:
+        handle_message(connection, morse_code.encode('utf-8'))
+
+
+def handle_message(connection, payload):
+    """Translate one Morse payload (text or binary) from a client and broadcast the result.
+
+    The payload may be a memoryview into a receive buffer, valid only
+    during this call; it is decoded straight from the view, and only
+    control frames and cache keys are copied to bytes.
+    """
+    if is_control(payload):
+        handle_control(connection, bytes(payload))
+        return
+    start = time.perf_counter()
+    if is_binary(payload):
+        translated_message = translation_cache.translate_binary(bytes(payload))
+        metrics.incr('binary_messages')
+    else:
+        translated_message = translation_cache.translate(str(payload, 'utf-8'))
+    metrics.observe('translate', time.perf_counter() - start)
+    if logger.isEnabledFor(logging.DEBUG):
+        message = unpack_morse(payload) if is_binary(payload) else str(payload, 'utf-8')
+        logger.debug("[%s] Morse Code Message Received: %s", connection.address, message)
+        logger.debug("[%s] Translated Message: %s", connection.address, translated_message)
+    broadcast(connection, translated_message)
+
+
+def receive_data(connection, decoder, data):
+    """Parse a chunk read from a client and handle every completed message."""
+    start = time.perf_counter()
+    payloads = decoder.feed(data)
+    metrics.observe('recv', time.perf_counter() - start)
+    handle_payloads(connection, len(data), payloads)
+
+
+def handle_payloads(connection, size, payloads):
+    """Count a read of `size` bytes and handle the messages it completed."""
+    connection.bytes_in += size
+    connection.messages_in += len(payloads)
+    metrics.incr('bytes_in', size)
+    metrics.incr('messages_in', len(payloads))
+    limited = connection.rate_limit is not None or address_limits is not None or LOAD_SHED_HIGH_WATER
+    for payload in payloads:
+        if not limited or admit_frame(connection, payload):
+            handle_message(connection, payload)
+        elif connection.closed:
+            break
+
+
+def admit_frame(connection, payload):
+    """Apply the connection and address rate limits and load shedding to one frame."""
+    now = time.monotonic()
+    if ((connection.rate_limit is not None and not connection.rate_limit.consume(now))
+            or (address_limits is not None and not address_limits.consume(connection.address[0], now))):
+        connection.rate_limited += 1
+        metrics.incr('rate_limited')
+        if RATE_LIMIT_POLICY == 'disconnect':
+            logger.warning("%s exceeded the rate limit, disconnecting.", connection.address)
+            connection.close()
+        return False
+    # Control frames are still answered while shedding: they are cheap and
+    # a JOIN or NACK may be what lets the client catch up
+    if is_control(payload) or not overloaded(now):
+        return True
+    metrics.incr('shed_messages')
+    return False
+
+
+def overloaded(now):
+    """Whether to shed incoming messages, rechecking the outbound backlog at most every interval."""
+    global shedding, shed_checked
+    if not LOAD_SHED_HIGH_WATER:
+        return False
+    if now - shed_checked >= LOAD_SHED_CHECK_INTERVAL:
+        shed_checked = now
+        queued = sum(client.pending for client in list(clients))
+        was_shedding = shedding
+        shedding = queued > (LOAD_SHED_HIGH_WATER // 2 if shedding else LOAD_SHED_HIGH_WATER)
+        if shedding != was_shedding:
+            logger.warning("%s load shedding (%d frames queued)", "Started" if shedding else "Stopped", queued)
+    return shedding
+
+
+def admit_connection(address, max_connections):
+    """Apply the connection limit and the accept rate limit to a new connection."""
+    if len(clients) >= max_connections:
+        logger.warning("Connection limit reached, rejecting %s", address)
+    elif accept_limit is not None and not accept_limit.consume():
+        # A reconnect storm would flood the log at warning level
+        logger.debug("Accept rate limit reached, rejecting %s", address)
+        metrics.incr('accept_rate_limited')
+    else:
+        return True
+    metrics.incr('connections_rejected')
+    return False
+
+
+def reset_on_close(sock):
+    """Make closing a rejected connection send a reset instead of a graceful FIN.
+
+    The server keeps no TIME_WAIT state for it, which matters when a
+    reconnect storm is being turned away.
+    """
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+    except OSError:
+        pass
+
+
+def client_handler(connection):
+    """Handle communication with each client.
+
+    Reads go straight into a pooled buffer with recv_into() and messages
+    are handled as memoryviews of it, so the loop allocates no bytes
+    objects of its own; the buffer goes back to the pool on disconnect.
+    """
+    logger.info("%s connected.", connection.address)
+    buffer = ReceiveBuffer(receive_buffers)
+    while True:
+        try:
+            size = buffer.recv_into(connection.sock)
+            if not size:
+                break
+            start = time.perf_counter()
+            payloads = buffer.frames()
+            metrics.observe('recv', time.perf_counter() - start)
+            handle_payloads(connection, size, payloads)
         except Exception as e:
-            print(f"[ERROR] Error handling client {client_address}: {e}")
+            if not connection.closed:
+                logger.error("Error handling client %s: %s", connection.address, e)
             break
+    buffer.release()
 
-    print(f"[{client_address}] Disconnected.")
-    if client_socket in clients:
-        clients.remove(client_socket)
-    client_socket.close()
+    logger.info("%s disconnected.", connection.address)
+    metrics.incr('connections_closed')
+    connection.close()
 
 
-def broadcast(sender_socket, message):
-    """Broadcast a message to all clients except sender."""
-    for client in clients:
-        if client != sender_socket:
-            try:
-                client.send(message.encode('utf-8'))
-            except Exception:
-                continue
+def broadcast(sender, message, publish=True, room=None):
+    """Broadcast a message to the clients in a room (the sender's by default), except sender.
+
+    The message is framed once and the same bytes are queued for every
+    recipient; delivery happens on each client's own writer. Multicast
+    subscribers are not in the room snapshot; they get the single datagram
+    sent to the group. In multi-worker mode the message is also published
+    to the other workers.
+    """
+    start = time.perf_counter()
+    if room is None:
+        room = rooms.room_of(sender) or DEFAULT_ROOM
+    frame = encode_frame(message)
+    delivered = 0
+    for client in rooms.members(room):
+        if client is not sender:
+            delivered += client.enqueue(frame)
+    metrics.observe('broadcast', time.perf_counter() - start)
+    metrics.incr('broadcasts')
+    metrics.incr('deliveries', delivered)
+    metrics.incr('bytes_out', delivered * len(frame))
+    if multicast is not None:
+        multicast.publish(room, sender.multicast_id if sender is not None else 0, message)
+    if message_log is not None:
+        message_log.append(room, sender.address if sender is not None else None, message)
+    if publish and message_bus is not None:
+        message_bus.publish(room, message)
+
+
+def deliver_remote(room, message):
+    """Broadcast a message published by another worker to the local members of its room.
+
+    Called from the bus reader thread; in asyncio mode the delivery is
+    handed over to the event loop, which owns the client queues.
+    """
+    if event_loop is not None:
+        event_loop.call_soon_threadsafe(broadcast, None, message, False, room)
+    else:
+        broadcast(None, message, publish=False, room=room)
+
+
+def request_shutdown():
+    """Ask the running server to stop accepting and drain its clients.
+
+    Safe to call from signal handlers and from other threads.
+    """
+    if shutdown_event.is_set():
+        return
+    shutdown_event.set()
+    for hook in list(shutdown_hooks):
+        hook()
+
+
+def handle_shutdown_signal(signum, frame):
+    logger.info("%s received. Shutting down the server...", signal.Signals(signum).name)
+    request_shutdown()
+
+
+def install_signal_handlers():
+    """Shut down gracefully on SIGINT/SIGTERM (and SIGBREAK on Windows)."""
+    for name in ('SIGINT', 'SIGTERM', 'SIGBREAK'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), handle_shutdown_signal)
 
 
 def listen_for_shutdown():
-    """Listen for ESC key press to shutdown server."""
-    print("[INFO] Press ESC to stop the server.")
-    while True:
-        if keyboard.is_pressed('esc'):
-            print("[INFO] ESC key pressed. Shutting down the server...")
-            os._exit(0)
+    """Register an ESC key hook to shutdown server."""
+    def on_esc():
+        logger.info("ESC key pressed. Shutting down the server...")
+        request_shutdown()
+
+    try:
+        keyboard.add_hotkey('esc', on_esc)
+        logger.info("Press ESC to stop the server.")
+    except Exception as e:
+        # The keyboard hook needs root on Linux; signals still work
+        logger.warning("ESC hotkey unavailable (%s). Use Ctrl+C or SIGTERM to stop the server.", e)
+
+
+def drain_clients(timeout=None):
+    """Flush every threaded client's queue (bounded by timeout) and close it."""
+    deadline = time.monotonic() + (SHUTDOWN_DRAIN_TIMEOUT if timeout is None else timeout)
+    for client in list(clients):
+        client.drain(deadline)
 
 
-def start_server(host, port):
-    """Start the socket server."""
+async def drain_async_clients(timeout=None):
+    """Flush every asyncio client's queue (bounded by timeout) and close it."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (SHUTDOWN_DRAIN_TIMEOUT if timeout is None else timeout)
+    await asyncio.gather(*(client.drain(deadline) for client in list(clients)))
+
+
+def wake_listener(server_socket):
+    # shutdown() interrupts a blocking accept() on Linux; close() does on Windows
+    try:
+        server_socket.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    server_socket.close()
+
+
+def start_server(host, port, backlog=DEFAULT_BACKLOG, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 queue_size=DEFAULT_OUTBOUND_QUEUE_SIZE, slow_consumer_policy=DEFAULT_SLOW_CONSUMER_POLICY):
+    """Start the socket server (one reader and one writer thread per client)."""
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if REUSE_PORT:
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     server_socket.bind((host, port))
-    server_socket.listen(5)
-    print(f"[LISTENING] Server is listening on {host}:{port}")
+    server_socket.listen(backlog)
+    logger.info("Server is listening on %s:%s", host, port)
+    shutdown_event.clear()
+    hook = lambda: wake_listener(server_socket)
+    shutdown_hooks.append(hook)
     try:
-        while True:
-            client_socket, client_address = server_socket.accept()
-            clients.append(client_socket)
-            client_thread = threading.Thread(target=client_handler, args=(client_socket, client_address))
+        while not shutdown_event.is_set():
+            try:
+                client_socket, client_address = server_socket.accept()
+            except OSError:
+                if shutdown_event.is_set():
+                    break
+                raise
+            start = time.perf_counter()
+            if not admit_connection(client_address, max_connections):
+                reset_on_close(client_socket)
+                client_socket.close()
+                continue
+            connection = ClientConnection(client_socket, client_address, queue_size, slow_consumer_policy)
+            add_client(connection)
+            connection.start()
+            client_thread = threading.Thread(target=client_handler, args=(connection,))
             client_thread.start()
+            metrics.observe('accept', time.perf_counter() - start)
+            metrics.incr('connections_accepted')
     except KeyboardInterrupt:
-        print("\n[INFO] KeyboardInterrupt received. Shutting down the server...")
+        logger.info("KeyboardInterrupt received. Shutting down the server...")
     finally:
+        shutdown_hooks.remove(hook)
         server_socket.close()
-        for client in clients:
-            client.close()
-        print("[INFO] Server shutdown complete.")
+        logger.info("Draining %d client(s)...", len(clients))
+        drain_clients()
+        logger.info("Server shutdown complete.")
+
+
+async def async_client_handler(reader, writer, max_connections=DEFAULT_MAX_CONNECTIONS,
+                               queue_size=DEFAULT_OUTBOUND_QUEUE_SIZE,
+                               slow_consumer_policy=DEFAULT_SLOW_CONSUMER_POLICY):
+    """Handle communication with a client on the event loop."""
+    start = time.perf_counter()
+    client_address = writer.get_extra_info('peername')
+    if not admit_connection(client_address, max_connections):
+        reset_on_close(writer.get_extra_info('socket'))
+        writer.transport.abort()
+        return
+
+    connection = AsyncClientConnection(writer, client_address, queue_size, slow_consumer_policy)
+    add_client(connection)
+    connection.start()
+    metrics.observe('accept', time.perf_counter() - start)
+    metrics.incr('connections_accepted')
+    logger.info("%s connected.", client_address)
+    decoder = FrameDecoder()
+    while True:
+        try:
+            data = await reader.read(RECV_BUFFER_SIZE)
+            if not data:
+                if decoder.pending():
+                    raise FrameError("Connection closed in the middle of a frame")
+                break
+            receive_data(connection, decoder, data)
+        except Exception as e:
+            if not connection.closed:
+                logger.error("Error handling client %s: %s", client_address, e)
+            break
+
+    logger.info("%s disconnected.", client_address)
+    metrics.incr('connections_closed')
+    connection.close()
+
+
+async def serve_async(host, port, backlog=DEFAULT_BACKLOG, max_connections=DEFAULT_MAX_CONNECTIONS,
+                      queue_size=DEFAULT_OUTBOUND_QUEUE_SIZE, slow_consumer_policy=DEFAULT_SLOW_CONSUMER_POLICY):
+    """Serve every client from a single asyncio event loop (selector/epoll based)."""
+    async def handler(reader, writer):
+        await async_client_handler(reader, writer, max_connections, queue_size, slow_consumer_policy)
+
+    global event_loop
+    loop = event_loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    shutdown_event.clear()
+    hook = lambda: loop.call_soon_threadsafe(stop.set)
+    shutdown_hooks.append(hook)
+
+    server = await asyncio.start_server(handler, host, port, backlog=backlog, reuse_address=True,
+                                        reuse_port=REUSE_PORT or None)
+    logger.info("Async server is listening on %s:%s", host, port)
+    try:
+        await stop.wait()
+    finally:
+        shutdown_hooks.remove(hook)
+        server.close()
+        logger.info("Draining %d client(s)...", len(clients))
+        await drain_async_clients()
+        event_loop = None
+
+
+def start_async_server(host, port, backlog=DEFAULT_BACKLOG, max_connections=DEFAULT_MAX_CONNECTIONS,
+                       queue_size=DEFAULT_OUTBOUND_QUEUE_SIZE, slow_consumer_policy=DEFAULT_SLOW_CONSUMER_POLICY):
+    """Start the asyncio socket server."""
+    try:
+        asyncio.run(serve_async(host, port, backlog, max_connections, queue_size, slow_consumer_policy))
+    except KeyboardInterrupt:
+        logger.info("KeyboardInterrupt received. Shutting down the server...")
+    finally:
+        clients.clear()
+        rooms.clear()
+        logger.info("Server shutdown complete.")
 
 
 if __name__ == "__main__":
+    setup_logging()
     server_ip = get_server_ip()
     ensure_env_updated(server_ip=server_ip)
     load_dotenv()  # Load updated env values
@@ -124,10 +1034,83 @@ if __name__ == "__main__":
     if port is None:
         raise ValueError("SERVER_PORT not found in environment variables.")
     SERVER_PORT = int(port)
+    SERVER_MODE = os.getenv("SERVER_MODE", "threaded")
+    SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", DEFAULT_BACKLOG))
+    SERVER_MAX_CONNECTIONS = int(os.getenv("SERVER_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS))
+    OUTBOUND_QUEUE_SIZE = int(os.getenv("OUTBOUND_QUEUE_SIZE", DEFAULT_OUTBOUND_QUEUE_SIZE))
+    SLOW_CONSUMER_POLICY = os.getenv("SLOW_CONSUMER_POLICY", DEFAULT_SLOW_CONSUMER_POLICY)
+    SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", SHUTDOWN_DRAIN_TIMEOUT))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 1))
+    TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", TRANSLATION_CACHE_SIZE))
+    TRANSLATION_WORD_CACHE_SIZE = int(os.getenv("TRANSLATION_WORD_CACHE_SIZE", TRANSLATION_WORD_CACHE_SIZE))
+    TRANSLATION_CACHE_POLICY = os.getenv("TRANSLATION_CACHE_POLICY", TRANSLATION_CACHE_POLICY)
+    COALESCE_WINDOW = float(os.getenv("COALESCE_WINDOW_MS", COALESCE_WINDOW * 1000)) / 1000
+    LOG_LEVEL = os.getenv("LOG_LEVEL", LOG_LEVEL).upper()
+    STATS_HOST = os.getenv("STATS_HOST", STATS_HOST)
+    STATS_PORT = int(os.getenv("STATS_PORT", 0)) or None
+    MESSAGE_LOG_DIR = os.getenv("MESSAGE_LOG_DIR") or None
+    MESSAGE_LOG_REPLAY = int(os.getenv("MESSAGE_LOG_REPLAY", MESSAGE_LOG_REPLAY))
+    MESSAGE_LOG_SEGMENT_SIZE = int(os.getenv("MESSAGE_LOG_SEGMENT_SIZE", MESSAGE_LOG_SEGMENT_SIZE))
+    MESSAGE_LOG_FSYNC_INTERVAL = float(os.getenv("MESSAGE_LOG_FSYNC_INTERVAL", MESSAGE_LOG_FSYNC_INTERVAL))
+    CLIENT_RATE_LIMIT = float(os.getenv("CLIENT_RATE_LIMIT", CLIENT_RATE_LIMIT))
+    CLIENT_RATE_BURST = float(os.getenv("CLIENT_RATE_BURST", CLIENT_RATE_BURST))
+    ADDRESS_RATE_LIMIT = float(os.getenv("ADDRESS_RATE_LIMIT", ADDRESS_RATE_LIMIT))
+    ADDRESS_RATE_BURST = float(os.getenv("ADDRESS_RATE_BURST", ADDRESS_RATE_BURST))
+    ACCEPT_RATE_LIMIT = float(os.getenv("ACCEPT_RATE_LIMIT", ACCEPT_RATE_LIMIT))
+    ACCEPT_RATE_BURST = float(os.getenv("ACCEPT_RATE_BURST", ACCEPT_RATE_BURST))
+    RATE_LIMIT_POLICY = os.getenv("RATE_LIMIT_POLICY", RATE_LIMIT_POLICY)
+    LOAD_SHED_HIGH_WATER = int(os.getenv("LOAD_SHED_HIGH_WATER", LOAD_SHED_HIGH_WATER))
+    MULTICAST_GROUP = os.getenv("MULTICAST_GROUP") or None
+    MULTICAST_PORT = int(os.getenv("MULTICAST_PORT", MULTICAST_PORT))
+    MULTICAST_INTERFACE = os.getenv("MULTICAST_INTERFACE") or None
+    MULTICAST_TTL = int(os.getenv("MULTICAST_TTL", MULTICAST_TTL))
+    MULTICAST_HISTORY = int(os.getenv("MULTICAST_HISTORY", MULTICAST_HISTORY))
+    apply_settings()
 
-    # Start shutdown listener in a separate thread
-    shutdown_thread = threading.Thread(target=listen_for_shutdown, daemon=True)
-    shutdown_thread.start()
+    if SERVER_WORKERS > 1:
+        if MULTICAST_GROUP:
+            # Each worker would number its own datagrams, and a subscriber
+            # can only NACK the worker it is connected to
+            logger.warning("Multicast fan-out needs a single server process; ignoring MULTICAST_GROUP")
+        # Worker processes import this file as the `server` module
+        import workers
+        workers.start_workers(server_ip, SERVER_PORT, SERVER_WORKERS, SERVER_MODE,
+                              options={'backlog': SERVER_BACKLOG,
+                                       'max_connections': SERVER_MAX_CONNECTIONS,
+                                       'queue_size': OUTBOUND_QUEUE_SIZE,
+                                       'slow_consumer_policy': SLOW_CONSUMER_POLICY},
+                              overrides={'SHUTDOWN_DRAIN_TIMEOUT': SHUTDOWN_DRAIN_TIMEOUT,
+                                         'TRANSLATION_CACHE_SIZE': TRANSLATION_CACHE_SIZE,
+                                         'TRANSLATION_WORD_CACHE_SIZE': TRANSLATION_WORD_CACHE_SIZE,
+                                         'TRANSLATION_CACHE_POLICY': TRANSLATION_CACHE_POLICY,
+                                         'COALESCE_WINDOW': COALESCE_WINDOW,
+                                         'LOG_LEVEL': LOG_LEVEL,
+                                         'STATS_HOST': STATS_HOST,
+                                         'STATS_PORT': STATS_PORT,
+                                         'MESSAGE_LOG_DIR': MESSAGE_LOG_DIR,
+                                         'MESSAGE_LOG_REPLAY': MESSAGE_LOG_REPLAY,
+                                         'MESSAGE_LOG_SEGMENT_SIZE': MESSAGE_LOG_SEGMENT_SIZE,
+                                         'MESSAGE_LOG_FSYNC_INTERVAL': MESSAGE_LOG_FSYNC_INTERVAL,
+                                         'CLIENT_RATE_LIMIT': CLIENT_RATE_LIMIT,
+                                         'CLIENT_RATE_BURST': CLIENT_RATE_BURST,
+                                         'ADDRESS_RATE_LIMIT': ADDRESS_RATE_LIMIT,
+                                         'ADDRESS_RATE_BURST': ADDRESS_RATE_BURST,
+                                         'ACCEPT_RATE_LIMIT': ACCEPT_RATE_LIMIT,
+                                         'ACCEPT_RATE_BURST': ACCEPT_RATE_BURST,
+                                         'RATE_LIMIT_POLICY': RATE_LIMIT_POLICY,
+                                         'LOAD_SHED_HIGH_WATER': LOAD_SHED_HIGH_WATER})
+    else:
+        # Shut down on Ctrl+C, SIGTERM or the ESC key
+        install_signal_handlers()
+        listen_for_shutdown()
+        start_stats_server()
+        open_message_log()
+        open_multicast(server_ip)
 
-    # Start the server
-    start_server(server_ip, SERVER_PORT)
+        # Start the server
+        if SERVER_MODE == "asyncio":
+            start_async_server(server_ip, SERVER_PORT, SERVER_BACKLOG, SERVER_MAX_CONNECTIONS,
+                               OUTBOUND_QUEUE_SIZE, SLOW_CONSUMER_POLICY)
+        else:
+            start_server(server_ip, SERVER_PORT, SERVER_BACKLOG, SERVER_MAX_CONNECTIONS,
+                         OUTBOUND_QUEUE_SIZE, SLOW_CONSUMER_POLICY)
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from cw_audio import TONE_SEARCH_SECONDS, decode_chunks, synthesize, wav_chunks
+
+
+def decode(path, **kwargs):
+    sample_rate, chunks = wav_chunks(str(path))
+    return decode_chunks(sample_rate, chunks, **kwargs)
+
+
+@pytest.mark.parametrize('text', ['SOS', 'PARIS PARIS', 'CQ CQ DE W1AW'])
+def test_short_recording_decodes_exactly(tmp_path, text):
+    path = tmp_path / 'cw.wav'
+    synthesize(text, str(path), wpm=20, noise=0.1)
+    assert decode(path, frequency=700).text == text
+
+
+def test_recording_shorter_than_tone_search(tmp_path):
+    path = tmp_path / 'cw.wav'
+    seconds = synthesize('EE', str(path), wpm=20, frequency=650)
+    assert seconds < TONE_SEARCH_SECONDS
+    decoder = decode(path)
+    assert decoder.text == 'EE'
+    assert decoder.frequency == pytest.approx(650, abs=20)
+
+
+def test_silence_finds_no_tone(tmp_path):
+    path = tmp_path / 'cw.wav'
+    synthesize('', str(path))
+    decoder = decode(path)
+    assert decoder.text.strip('_ ') == ''
@@ -0,0 +1,52 @@
+import pytest
+
+from framing import FrameDecoder, FrameError, ReceiveBuffer, encode_frame
+
+PAYLOADS = [b'... --- ...', b'', b'x' * 5000, b'-.-. --.-']
+
+
+class TrickleSocket:
+    """Serves a byte stream through recv_into(), read_size bytes at a time."""
+
+    def __init__(self, data, read_size):
+        self.data = memoryview(data)
+        self.read_size = read_size
+        self.offset = 0
+
+    def recv_into(self, buffer):
+        size = min(len(buffer), self.read_size, len(self.data) - self.offset)
+        buffer[:size] = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return size
+
+
+@pytest.mark.parametrize('chunk', [1, 3, 4096])
+def test_decoder_reassembles_partial_frames(chunk):
+    stream = b''.join(map(encode_frame, PAYLOADS))
+    decoder = FrameDecoder()
+    frames = []
+    for start in range(0, len(stream), chunk):
+        frames += decoder.feed(stream[start:start + chunk])
+    assert frames == PAYLOADS
+    assert decoder.pending() == 0
+
+
+@pytest.mark.parametrize('read_size', [1, 7, 65536])
+def test_receive_buffer_reassembles_partial_frames(read_size):
+    sock = TrickleSocket(b''.join(map(encode_frame, PAYLOADS)), read_size)
+    receiver = ReceiveBuffer(size=64)
+    frames = []
+    while receiver.recv_into(sock):
+        frames += [bytes(frame) for frame in receiver.frames()]
+    assert frames == PAYLOADS
+    assert receiver.pending() == 0
+    receiver.release()
+
+
+def test_oversized_frame_is_rejected():
+    with pytest.raises(FrameError):
+        FrameDecoder(max_frame_size=16).feed(encode_frame(b'x' * 17))
+    receiver = ReceiveBuffer(size=64, max_frame_size=16)
+    receiver.recv_into(TrickleSocket(encode_frame(b'x' * 17), 64))
+    with pytest.raises(FrameError):
+        receiver.frames()
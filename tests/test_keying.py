@@ -0,0 +1,85 @@
+import pytest
+
+from keying import (KEY_DOWN, KEY_UP, KEYING_PREFIX, PARIS_UNIT, WORD_BREAK, AdaptiveKeyer,
+                    pack_events, unpack_events)
+from morse_dict import morse_to_text, text_to_morse
+
+
+def key_events(text, wpm):
+    """Perfectly timed key events for text at wpm."""
+    unit = PARIS_UNIT / wpm
+    events = []
+    now = 0.0
+    for symbol in text_to_morse(text).replace(' / ', '/'):
+        if symbol in '.-':
+            events.append((KEY_DOWN, now))
+            now += unit if symbol == '.' else 3 * unit
+            events.append((KEY_UP, now))
+            now += unit
+        else:
+            # The element gap after the last mark is already counted
+            now += (2 if symbol == ' ' else 6) * unit
+    return events
+
+
+def decode(events, keyer=None):
+    keyer = keyer or AdaptiveKeyer()
+    return morse_to_text(keyer.feed_events(events) + keyer.end_message())
+
+
+@pytest.mark.parametrize('text, wpm', [
+    ('CQ', 25),
+    ('PARIS', 30),
+    ('SOS', 35),
+    ('TEST', 40),
+    ('MO', 20),
+    ('EEE', 30),
+    ('CQ DE W1AW', 6),
+    ('E', 12),
+])
+def test_short_message_decodes_exactly(text, wpm):
+    assert decode(key_events(text, wpm)) == text
+
+
+def test_held_symbols_come_out_together():
+    keyer = AdaptiveKeyer()
+    events = key_events('CQ', 25)
+    # The first dash alone can't be told from a dot at an unknown speed
+    assert keyer.feed_events(events[:2]) == ''
+    assert keyer.feed_events(events[2:4]) == '-.'
+    assert keyer.feed_events(events[4:]) + keyer.end_message() == '-. --.-'
+    assert 24 < keyer.wpm < 26
+
+
+def test_speed_carries_over_to_the_next_message():
+    keyer = AdaptiveKeyer()
+    assert decode(key_events('PARIS', 30), keyer) == 'PARIS'
+    assert decode(key_events('T', 30), keyer) == 'T'
+
+
+def test_explicit_word_break_while_seeding():
+    keyer = AdaptiveKeyer()
+    events = key_events('E', 30) + [(WORD_BREAK, 1.0)]
+    events += [(kind, timestamp + 2.0) for kind, timestamp in key_events('T', 30)]
+    assert decode(events, keyer) == 'E T'
+
+
+@pytest.mark.parametrize('events', [
+    # A single zero-length mark, as sent by pack_events([(1, 1.0), (0, 1.0)])
+    unpack_events(pack_events([(KEY_DOWN, 1.0), (KEY_UP, 1.0)])[len(KEYING_PREFIX):]),
+    [(KEY_DOWN, 1.0), (KEY_UP, 1.0), (KEY_DOWN, 1.1), (KEY_UP, 1.4)],
+    [(KEY_DOWN, 1.0), (KEY_UP, 0.5), (KEY_DOWN, 0.2), (KEY_UP, 0.3)],
+])
+def test_non_positive_durations(events):
+    keyer = AdaptiveKeyer()
+    symbols = keyer.feed_events(events) + keyer.end_message()
+    assert symbols.replace(' ', '') and set(symbols) <= set('.- /')
+    assert keyer.wpm > 0
+
+
+def test_word_breaks_while_seeding_are_bounded():
+    keyer = AdaptiveKeyer()
+    keyer.feed_events([(KEY_DOWN, 0.0), (KEY_UP, 0.1)])
+    assert keyer.feed_events([(WORD_BREAK, 0.2)] * 100000) == ''
+    assert len(keyer.held) == 2
+    assert keyer.end_message() == '. / '
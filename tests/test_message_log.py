@@ -0,0 +1,59 @@
+import os
+
+from message_log import (INDEX_ENTRY, MAX_RECENT_MESSAGE_LENGTH, LogReader, MessageLog, encode_record,
+                         list_segments)
+
+
+def test_recent_ring_is_bounded(tmp_path):
+    log = MessageLog(str(tmp_path), recent_size=3, recent_chars=100)
+    for index in range(5):
+        log.append('main', None, f"SOS {index}")
+    assert log.recent_messages('main') == ['SOS 2', 'SOS 3', 'SOS 4']
+    log.append('main', None, 'E' * (MAX_RECENT_MESSAGE_LENGTH + 1))
+    assert log.recent_messages('main') == ['SOS 2', 'SOS 3', 'SOS 4']
+    for index in range(20):
+        log.append(f"room {index}", None, 'T' * 10)
+    assert log.stats()['recent_chars'] <= 100
+    assert log.recent_messages('main') == []
+    assert log.recent_messages('room 19') == ['T' * 10]
+    log.close()
+
+
+def write_log(directory, messages, **kwargs):
+    log = MessageLog(str(directory), **kwargs).start()
+    for room, message in messages:
+        log.append(room, ('127.0.0.1', 5555), message)
+    log.close()
+
+
+def test_tail_by_room_and_segment_rollover(tmp_path):
+    write_log(tmp_path, [('main' if index % 3 else 'ops', f"MSG {index}") for index in range(30)],
+              segment_size=200)
+    assert len(list_segments(str(tmp_path))) > 1
+    reader = LogReader(str(tmp_path))
+    assert [record.message for record in reader.tail(2, 'ops')] == ['MSG 24', 'MSG 27']
+    records = list(reader.records(25))
+    assert [record.sequence for record in records] == [25, 26, 27, 28, 29]
+    assert records[0].sender == '127.0.0.1:5555'
+
+
+def test_torn_record_is_cut_off_on_restart(tmp_path):
+    write_log(tmp_path, [('main', 'SOS'), ('main', 'CQ')])
+    _, segment_path, index_path = list_segments(str(tmp_path))[-1]
+    size = os.path.getsize(segment_path)
+    # A crash in the middle of a write: half a record, and its index entry
+    with open(segment_path, 'ab') as segment:
+        segment.write(encode_record('main', None, 'TORN')[:10])
+    with open(index_path, 'ab') as index:
+        index.write(INDEX_ENTRY.pack(size))
+    assert [record.message for record in LogReader(str(tmp_path)).tail(5)] == ['SOS', 'CQ']
+
+    log = MessageLog(str(tmp_path))
+    assert log.next_sequence == 2
+    assert os.path.getsize(segment_path) == size
+    assert log.recent_messages('main') == ['SOS', 'CQ']
+    log.start()
+    log.append('main', None, 'AR')
+    log.close()
+    records = LogReader(str(tmp_path)).tail(5)
+    assert [(record.sequence, record.message) for record in records] == [(0, 'SOS'), (1, 'CQ'), (2, 'AR')]
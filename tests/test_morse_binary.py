@@ -0,0 +1,27 @@
+import random
+import threading
+
+import morse_binary
+from morse_binary import binary_to_text, pack_morse, unpack_morse
+from morse_dict import TEXT_TO_MORSE_DICT, morse_to_text, text_to_morse
+
+
+def test_binary_to_text_matches_the_text_decoder():
+    rng = random.Random(1)
+    alphabet = sorted(set(TEXT_TO_MORSE_DICT) - {' '})
+    for _ in range(2000):
+        words = [''.join(rng.choices(alphabet, k=rng.randint(1, 8))) for _ in range(rng.randint(1, 4))]
+        payload = pack_morse(text_to_morse(' '.join(words)))
+        assert binary_to_text(payload) == morse_to_text(unpack_morse(payload))
+
+
+def test_tables_are_built_once_under_concurrent_first_use(monkeypatch):
+    monkeypatch.setattr(morse_binary, '_byte_steps', None)
+    payload = pack_morse('... --- ... / -.-. --.-')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(binary_to_text(payload))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['SOS CQ'] * 8
@@ -0,0 +1,18 @@
+import random
+
+from morse_dict import TEXT_TO_MORSE_DICT, iter_text_to_morse, morse_to_text, text_to_morse
+
+
+def random_text(rng, length):
+    alphabet = sorted(TEXT_TO_MORSE_DICT)
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+def test_round_trip():
+    rng = random.Random(1)
+    for _ in range(2000):
+        text = random_text(rng, rng.randint(1, 40))
+        morse = text_to_morse(text)
+        assert morse_to_text(morse) == text.upper(), (text, morse)
+        chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+        assert ''.join(iter_text_to_morse(chunks)) == morse, text
@@ -0,0 +1,65 @@
+import pytest
+
+from multicast import (DATA, HEARTBEAT, MULTICAST_LOST, MULTICAST_RETRANSMIT, MulticastPublisher,
+                       MulticastSubscriber, encode_datagram, parse_range)
+
+STREAM = 7
+
+
+@pytest.fixture
+def subscriber():
+    delivered, nacks = [], []
+    subscriber = MulticastSubscriber('127.0.0.1', 0, 2, STREAM, 0,
+                                     lambda room, message: delivered.append(message),
+                                     lambda first, last: nacks.append((first, last)))
+    subscriber.delivered, subscriber.nacks = delivered, nacks
+    yield subscriber
+    subscriber.close()
+
+
+def datagram(sequence, message='', sender=1, kind=DATA, stream=STREAM):
+    return encode_datagram(kind, stream, sequence, sender, 'main', message.encode('utf-8'))
+
+
+def test_reordered_datagrams_are_delivered_in_order(subscriber):
+    subscriber.handle_datagram(datagram(1, 'B'), retransmit=False)
+    subscriber.handle_datagram(datagram(2, 'C'), retransmit=False)
+    assert subscriber.delivered == []
+    assert subscriber.nacks == [(0, 0)]
+    subscriber.handle_datagram(datagram(0, 'A'))
+    subscriber.handle_datagram(datagram(1, 'B'), retransmit=False)
+    assert subscriber.delivered == ['A', 'B', 'C']
+    assert subscriber.stats()['duplicates'] == 1
+
+
+def test_own_messages_and_other_streams_are_skipped(subscriber):
+    subscriber.handle_datagram(datagram(0, 'MINE', sender=2), retransmit=False)
+    subscriber.handle_datagram(datagram(1, 'OLD', stream=STREAM + 1), retransmit=False)
+    subscriber.handle_datagram(datagram(1, 'THEIRS'), retransmit=False)
+    assert subscriber.delivered == ['THEIRS']
+
+
+def test_heartbeat_reveals_a_lost_tail(subscriber):
+    subscriber.handle_datagram(datagram(0, 'A'), retransmit=False)
+    subscriber.handle_datagram(datagram(3, kind=HEARTBEAT), retransmit=False)
+    assert subscriber.nacks == [(1, 2)]
+    subscriber.skip(1, 2)
+    subscriber.handle_datagram(datagram(3, 'D'), retransmit=False)
+    assert subscriber.delivered == ['A', 'D']
+    assert subscriber.stats()['lost'] == 2
+
+
+def test_publisher_answers_nacks_from_its_ring(subscriber):
+    publisher = MulticastPublisher('127.0.0.1', port=9, history=4)
+    publisher.stream = subscriber.stream
+    for index in range(6):
+        publisher.publish('main', 1, f"MSG {index}")
+    payloads = publisher.retransmit(0, 5)
+    publisher.close()
+    assert payloads[0].startswith(MULTICAST_LOST)
+    assert parse_range(payloads[0][len(MULTICAST_LOST):]) == (0, 1)
+    subscriber.skip(0, 1)
+    for payload in reversed(payloads[1:]):
+        assert payload.startswith(MULTICAST_RETRANSMIT)
+        subscriber.handle_datagram(payload[len(MULTICAST_RETRANSMIT):])
+    assert subscriber.delivered == ['MSG 2', 'MSG 3', 'MSG 4', 'MSG 5']
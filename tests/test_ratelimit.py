@@ -0,0 +1,32 @@
+import time
+
+from ratelimit import AddressBuckets, TokenBucket
+
+
+def test_bucket_allows_a_burst_then_the_rate():
+    bucket = TokenBucket(rate=10, burst=3)
+    bucket.updated = 0.0
+    assert [bucket.consume(0.0) for _ in range(4)] == [True, True, True, False]
+    assert not bucket.consume(0.05)
+    assert bucket.consume(0.1)
+    assert not bucket.consume(0.1)
+    # A long pause refills only up to the burst
+    assert [bucket.consume(100.0) for _ in range(4)] == [True, True, True, False]
+
+
+def test_default_burst_is_one_second_and_at_least_one():
+    assert TokenBucket(rate=50).burst == 50
+    assert TokenBucket(rate=0.5).burst == 1
+
+
+def test_address_buckets_are_shared_and_bounded():
+    buckets = AddressBuckets(rate=1, burst=2, max_addresses=2)
+    now = time.monotonic()
+    assert buckets.consume('10.0.0.1', now)
+    assert buckets.consume('10.0.0.1', now)
+    assert not buckets.consume('10.0.0.1', now)
+    assert buckets.consume('10.0.0.2', now)
+    assert buckets.consume('10.0.0.3', now)
+    assert len(buckets) == 2
+    # The least recently seen address was forgotten and starts over
+    assert buckets.consume('10.0.0.1', now)
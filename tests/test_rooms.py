@@ -0,0 +1,44 @@
+from rooms import (DEFAULT_ROOM, REPLAY_PREFIX, RoomRegistry, parse_replay, parse_room_name,
+                   replay_frame_payload)
+
+
+def test_replay_payload_round_trip():
+    payload = replay_frame_payload('ops', 'SOS DE W1AW')
+    assert payload.startswith(REPLAY_PREFIX)
+    assert parse_replay(payload) == ('ops', 'SOS DE W1AW')
+    assert parse_replay(memoryview(payload)) == ('ops', 'SOS DE W1AW')
+    assert parse_replay(REPLAY_PREFIX + b'ops') is None
+
+
+def test_broadcast_snapshots_are_per_room():
+    registry = RoomRegistry()
+    for connection in 'abc':
+        registry.join(connection)
+    assert registry.join('c', 'ops') == DEFAULT_ROOM
+    assert registry.members(DEFAULT_ROOM) == ('a', 'b')
+    assert registry.members('ops') == ('c',)
+    registry.join('b', 'ops')
+    assert registry.members(DEFAULT_ROOM) == ('a',)
+    assert registry.members('ops') == ('c', 'b')
+    assert registry.leave('a') == DEFAULT_ROOM
+    assert registry.members(DEFAULT_ROOM) == ()
+    assert registry.stats() == {'rooms': 1, 'largest': 2}
+
+
+def test_muted_members_stay_in_their_room():
+    registry = RoomRegistry()
+    registry.join('a', 'ops')
+    registry.join('b', 'ops')
+    registry.mute('a')
+    assert registry.members('ops') == ('b',)
+    assert registry.room_of('a') == 'ops'
+    registry.unmute('a')
+    assert registry.members('ops') == ('a', 'b')
+
+
+def test_room_names_are_validated():
+    assert parse_room_name(b' ops ') == 'ops'
+    assert parse_room_name(b'') is None
+    assert parse_room_name(b'x' * 65) is None
+    assert parse_room_name(b'a\x00b') is None
+    assert parse_room_name(b'\xff') is None
@@ -0,0 +1,126 @@
+"""Bounded cache in front of morse_to_text for repeated traffic.
+
+Operators send the same things over and over (canned phrases, SOS, call
+signs), so the server keeps the most recent full-message translations and
+per-word translations. Both caches are bounded and evict in LRU (default)
+or FIFO order. Only short keys are cached: a frame may be up to a
+megabyte, and a client sending large unique frames must not be able to
+fill memory with them, so the entry limits also bound the bytes held.
+All operations take one lock, so the cache is safe to share between
+handler threads and is equally safe to call from the event loop.
+"""
+import threading
+from collections import OrderedDict
+
+from morse_binary import binary_to_text
+from morse_dict import morse_word_to_text
+
+EVICTION_POLICIES = ('lru', 'fifo')
+DEFAULT_MESSAGE_CACHE_SIZE = 4096
+DEFAULT_WORD_CACHE_SIZE = 16384
+# Longer messages and words (in Morse characters, or bytes for binary
+# payloads) are translated without being cached; real traffic is far shorter
+MAX_CACHED_MESSAGE_LENGTH = 1024
+MAX_CACHED_WORD_LENGTH = 128
+
+
+class BoundedCache:
+    """A size-limited mapping with LRU or FIFO eviction and hit/miss counters.
+
+    Keys longer than max_key_length are never stored (and not counted as
+    misses). Not locked by itself; TranslationCache serializes access.
+    """
+
+    def __init__(self, max_size, policy='lru', max_key_length=None):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.max_size = max_size
+        self.policy = policy
+        self.max_key_length = max_key_length
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncached = 0
+
+    def cacheable(self, key):
+        return self.max_key_length is None or len(key) <= self.max_key_length
+
+    def get(self, key):
+        if not self.cacheable(key):
+            self.uncached += 1
+            return None
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == 'lru':
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if self.max_size <= 0 or not self.cacheable(key):
+            return
+        self.data[key] = value
+        if len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.data),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'uncached': self.uncached,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class TranslationCache:
+    """Caches full-message and per-word translations; translate() matches morse_to_text."""
+
+    def __init__(self, message_size=DEFAULT_MESSAGE_CACHE_SIZE, word_size=DEFAULT_WORD_CACHE_SIZE,
+                 policy='lru'):
+        self.messages = BoundedCache(message_size, policy, MAX_CACHED_MESSAGE_LENGTH)
+        self.words = BoundedCache(word_size, policy, MAX_CACHED_WORD_LENGTH)
+        self.lock = threading.Lock()
+
+    def translate(self, morse_code):
+        return self._translate(morse_code, morse_code)
+
+    def translate_binary(self, payload):
+        """translate() for a packed binary payload.
+
+        Messages are cached under the payload bytes. A miss is decoded
+        straight from the packed elements, which is cheaper than the
+        word cache, so binary words are not cached.
+        """
+        return self._translate(payload, None)
+
+    def _translate(self, key, morse_code):
+        with self.lock:
+            translated = self.messages.get(key)
+            if translated is not None:
+                return translated
+            if morse_code is None:
+                translated = binary_to_text(key)
+                self.messages.put(key, translated)
+                return translated
+            words = []
+            for word in morse_code.strip().split(' / '):
+                translated_word = self.words.get(word)
+                if translated_word is None:
+                    translated_word = morse_word_to_text(word)
+                    self.words.put(word, translated_word)
+                words.append(translated_word)
+            translated = ' '.join(words)
+            self.messages.put(key, translated)
+            return translated
+
+    def stats(self):
+        with self.lock:
+            return {'messages': self.messages.stats(), 'words': self.words.stats(), 'policy': self.messages.policy}
@@ -0,0 +1,212 @@
+"""Multi-process server mode.
+
+Runs N worker processes that all accept on the same port with SO_REUSEPORT,
+so translation and broadcast use every core instead of a single GIL-bound
+process. Each worker connects to a local message bus hosted by the master
+process (a Unix socket where available, loopback TCP otherwise). Every
+broadcast is published to the bus and relayed to the other workers, so a
+message from a client on worker A reaches the clients on worker B.
+Bus messages carry the room name, so each worker delivers them to its
+own members of that room only.
+"""
+import multiprocessing
+import os
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+
+import server
+from framing import FrameDecoder, encode_frame
+
+BUS_RECV_SIZE = 65536
+DEFAULT_BUS_QUEUE_SIZE = 65536
+
+
+def bus_endpoint():
+    """Pick the address family and address for the local message bus."""
+    if hasattr(socket, 'AF_UNIX'):
+        directory = tempfile.mkdtemp(prefix='morse-bus-')
+        return socket.AF_UNIX, os.path.join(directory, 'bus.sock')
+    return socket.AF_INET, ('127.0.0.1', 0)
+
+
+class BusHub:
+    """Runs in the master process and relays each published message to every other worker."""
+
+    def __init__(self, family, address):
+        self.family = family
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.bind(address)
+        self.sock.listen()
+        self.address = self.sock.getsockname()
+        self.links = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def accept_loop(self):
+        while True:
+            try:
+                link, _ = self.sock.accept()
+            except OSError:
+                return
+            with self.lock:
+                self.links.append(link)
+            threading.Thread(target=self.relay, args=(link,), daemon=True).start()
+
+    def relay(self, link):
+        decoder = FrameDecoder()
+        while True:
+            try:
+                data = link.recv(BUS_RECV_SIZE)
+            except OSError:
+                break
+            if not data:
+                break
+            frames = b''.join(encode_frame(payload) for payload in decoder.feed(data))
+            if not frames:
+                continue
+            # One lock for all sends keeps frames from different relays
+            # from interleaving on the same worker link
+            with self.lock:
+                for other in self.links:
+                    if other is not link:
+                        try:
+                            other.sendall(frames)
+                        except OSError:
+                            pass
+        with self.lock:
+            if link in self.links:
+                self.links.remove(link)
+        link.close()
+
+    def close(self):
+        self.sock.close()
+        with self.lock:
+            for link in self.links:
+                link.close()
+        if self.family == getattr(socket, 'AF_UNIX', None):
+            shutil.rmtree(os.path.dirname(self.address), ignore_errors=True)
+
+
+class MessageBus:
+    """A worker's link to the hub: publishes local broadcasts, delivers remote ones."""
+
+    def __init__(self, family, address, queue_size=DEFAULT_BUS_QUEUE_SIZE):
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(address)
+        self.outbound = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def start(self):
+        threading.Thread(target=self.write_loop, daemon=True).start()
+        threading.Thread(target=self.read_loop, daemon=True).start()
+
+    def publish(self, room, message):
+        """Queue a translated message for the other workers without blocking."""
+        try:
+            # Translations never contain NUL, so it separates the room name
+            self.outbound.put_nowait(f"{room}\x00{message}")
+        except queue.Full:
+            self.dropped += 1
+
+    def write_loop(self):
+        while True:
+            messages = [self.outbound.get()]
+            while True:
+                try:
+                    messages.append(self.outbound.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.sock.sendall(b''.join(encode_frame(message) for message in messages))
+            except OSError:
+                return
+
+    def read_loop(self):
+        decoder = FrameDecoder()
+        while True:
+            try:
+                data = self.sock.recv(BUS_RECV_SIZE)
+            except OSError:
+                return
+            if not data:
+                return
+            for payload in decoder.feed(data):
+                room, _, message = payload.decode('utf-8').partition('\x00')
+                server.deliver_remote(room, message)
+
+
+def run_worker(worker_id, host, port, bus_family, bus_address, mode, options, overrides):
+    """Entry point of a worker process."""
+    for name, value in overrides.items():
+        setattr(server, name, value)
+    server.setup_logging()
+    server.apply_settings()
+    server.REUSE_PORT = True
+    server.message_bus = MessageBus(bus_family, bus_address)
+    server.message_bus.start()
+    server.install_signal_handlers()
+    server.logger.info("Worker %d started with pid %d", worker_id, os.getpid())
+    if server.STATS_PORT:
+        # Every worker reports its own numbers on the next port up
+        server.start_stats_server(server.STATS_PORT + worker_id)
+    if server.MESSAGE_LOG_DIR:
+        # Every worker sees every broadcast, so each keeps a complete log of its own
+        server.open_message_log(os.path.join(server.MESSAGE_LOG_DIR, f"worker-{worker_id}"))
+    try:
+        if mode == 'asyncio':
+            server.start_async_server(host, port, **options)
+        else:
+            server.start_server(host, port, **options)
+    finally:
+        # Worker processes exit without running atexit handlers
+        server.close_message_log()
+        server.stop_logging()
+
+
+def start_workers(host, port, workers, mode='asyncio', options=None, overrides=None):
+    """Start `workers` server processes on one port and relay broadcasts between them.
+
+    options are keyword arguments for start_server/start_async_server and
+    overrides are module-level server settings (e.g. SHUTDOWN_DRAIN_TIMEOUT)
+    applied inside every worker. Blocks until shutdown is requested.
+    """
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise RuntimeError("Multi-worker mode needs SO_REUSEPORT, which this platform does not support.")
+    options = options or {}
+    overrides = overrides or {}
+
+    hub = BusHub(*bus_endpoint())
+    hub.start()
+    processes = [
+        multiprocessing.Process(target=run_worker, name=f"morse-worker-{worker_id}",
+                                args=(worker_id, host, port, hub.family, hub.address, mode, options, overrides))
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    server.logger.info("%d %s workers are listening on %s:%s", workers, mode, host, port)
+
+    stop = threading.Event()
+    server.shutdown_hooks.append(stop.set)
+    server.install_signal_handlers()
+    server.listen_for_shutdown()
+    try:
+        while not stop.is_set() and any(process.is_alive() for process in processes):
+            stop.wait(0.5)
+    finally:
+        server.shutdown_hooks.remove(stop.set)
+        # Workers drain their own clients on SIGTERM
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(server.SHUTDOWN_DRAIN_TIMEOUT + 2)
+            if process.is_alive():
+                process.kill()
+        hub.close()
+        server.logger.info("All workers stopped.")